@@ -1,4 +1,4 @@
-CREATE VIEW vw_pessoa_localizacao AS
+CREATE OR REPLACE VIEW vw_pessoa_localizacao AS
 SELECT 
     p.id AS pessoa_id,
     p.sexo,
@@ -7,9 +7,9 @@ SELECT
     l.estado,
     l.cidade
 FROM Pessoa p
-JOIN Localizacao l ON p.id = l.id;
+JOIN Localizacao l ON l.pessoa_id = p.id;
 
-CREATE VIEW vw_pessoa_esporte AS
+CREATE OR REPLACE VIEW vw_pessoa_esporte AS
 SELECT 
     p.id AS pessoa_id,
     p.sexo,
@@ -20,9 +20,9 @@ SELECT
     e.possui_bolsa,
     e.paar
 FROM Pessoa p
-JOIN Esporte e ON p.id = e.id;
+JOIN Esporte e ON e.pessoa_id = p.id;
 
-CREATE VIEW vw_esporte AS
+CREATE OR REPLACE VIEW vw_esporte AS
 SELECT 
     e.id AS esporte_id,
     e.modalidade,
@@ -33,19 +33,13 @@ FROM Esporte e;
 
 DELIMITER //
 
+-- As modalidades válidas ficam em Ref_modalidade, gravada por criar_tabelas()
+-- a partir de referencia.py (a mesma lista usada pela carga do CSV e pelo CRUD)
 CREATE TRIGGER trg_validate_modalidade
 BEFORE INSERT ON Esporte
 FOR EACH ROW
 BEGIN
-    IF NEW.modalidade NOT IN (
-        'Apneia', 'Atletismo', 'Basquete', 'Boxe', 'Canoagem Slalom', 
-        'Canoagem Velocidade', 'Ciclismo MTB', 'Escalada Esportiva', 'Esgrima', 
-        'Futebol', 'Ginastica Artistica', 'Golfe', 'Judo', 'Levantamento de Peso', 
-        'Lifesaving', 'Lutas Associadas (Wrestling)', 'Maratona', 'Maratonas Aquaticas', 
-        'Nado Sincronizado', 'Natacao', 'Orientacao', 'Paraquedismo', 'Pentatlo Militar', 
-        'Pentatlo Moderno', 'Pentatlo Naval', 'Pesca Submarina', 'Taekwondo', 'Tiro', 
-        'Tiro com Arco', 'Triatlo', 'Vela', 'Voleibol', 'Volei de Praia'
-    ) THEN
+    IF NOT EXISTS (SELECT 1 FROM Ref_modalidade WHERE valor = NEW.modalidade) THEN
         SIGNAL SQLSTATE '45000' 
         SET MESSAGE_TEXT = 'Modalidade inválida. Insira uma modalidade válida!';
     END IF;
@@ -59,5 +53,5 @@ SELECT * FROM vw_pessoa_localizacao;
 SELECT * FROM vw_esporte;
 SELECT * FROM vw_pessoa_esporte;
 
-INSERT INTO Esporte (modalidade, possui_medalha, possui_bolsa, paar)
-VALUES ('Xadrez', 'Não', 'Não', 'Não'); -- Deve falhar
+INSERT INTO Esporte (pessoa_id, modalidade, possui_medalha, possui_bolsa, paar)
+VALUES (1, 'Xadrez', 'Não', 'Não', 'Não'); -- Deve falhar
@@ -0,0 +1,279 @@
+"""
+Camada de acesso assíncrona do sistema PAAR, para servir consultas a muitos clientes
+concorrentes em um único event loop (ver servidor.py).
+
+As leituras (registro por id, listagens por modalidade e por estado, relatórios)
+usam um driver assíncrono (aiosqlite ou aiomysql, conforme DB_BACKEND) e um pool de
+conexões próprio, o PoolAssincrono. As escritas (novo_elemento, atualizar_elemento,
+remover_elemento) chamam as funções síncronas do main em uma thread
+(asyncio.to_thread), para que a manutenção dos resumos, a checagem de versão e a
+invalidação do cache continuem em um lugar só. O cache de consultas do main é
+compartilhado: o que uma escrita invalida deixa de ser servido aqui também.
+
+Requer aiosqlite (SQLite) ou aiomysql (MySQL).
+"""
+
+import asyncio
+import contextlib
+import time
+
+try:
+    import aiosqlite
+except ImportError:  # Sem aiosqlite, o backend SQLite assíncrono fica indisponível
+    aiosqlite = None
+
+try:
+    import aiomysql
+except ImportError:  # Sem aiomysql, o backend MySQL assíncrono fica indisponível
+    aiomysql = None
+
+import main
+import metricas
+import referencia
+
+# Registros de uma modalidade, em páginas por faixa de pessoa_id (índice (modalidade, pessoa_id))
+LISTAGEM_MODALIDADE = """
+    SELECT e.pessoa_id, p.sexo, p.forca, p.posto_graduacao,
+           e.modalidade, e.possui_medalha, e.possui_bolsa, e.paar
+    FROM Esporte e
+    JOIN Pessoa p ON p.id = e.pessoa_id
+    WHERE e.modalidade = %s AND e.pessoa_id > %s
+    ORDER BY e.pessoa_id
+    LIMIT %s
+"""
+
+# O índice (estado, cidade, pessoa_id) atende o filtro; as linhas do estado são ordenadas por pessoa_id
+LISTAGEM_ESTADO = """
+    SELECT l.pessoa_id, p.sexo, p.forca, p.posto_graduacao, l.estado, l.cidade
+    FROM Localizacao l
+    JOIN Pessoa p ON p.id = l.pessoa_id
+    WHERE l.estado = %s AND l.pessoa_id > %s
+    ORDER BY l.pessoa_id
+    LIMIT %s
+"""
+
+# No esquema compacto o filtro é pelo código do dicionário (índices de INDICES_COMPACTO);
+# o valor filtrado volta como parâmetro, na mesma posição das colunas textuais
+LISTAGEM_MODALIDADE_COMPACTO = """
+    SELECT e.pessoa_id, p.sexo,
+           (SELECT valor FROM Dim_forca WHERE id = p.forca_id) AS forca,
+           (SELECT valor FROM Dim_posto_graduacao WHERE id = p.posto_graduacao_id) AS posto_graduacao,
+           d.valor AS modalidade,
+           CASE WHEN e.possui_medalha THEN 'Sim' ELSE 'Não' END AS possui_medalha,
+           CASE WHEN e.possui_bolsa THEN 'Sim' ELSE 'Não' END AS possui_bolsa,
+           CASE WHEN e.paar THEN 'Sim' ELSE 'Não' END AS paar
+    FROM Dim_modalidade d
+    JOIN EsporteC e ON e.modalidade_id = d.id
+    JOIN PessoaC p ON p.id = e.pessoa_id
+    WHERE d.valor = %s AND e.pessoa_id > %s
+    ORDER BY e.pessoa_id
+    LIMIT %s
+"""
+
+LISTAGEM_ESTADO_COMPACTO = """
+    SELECT l.pessoa_id, p.sexo,
+           (SELECT valor FROM Dim_forca WHERE id = p.forca_id) AS forca,
+           (SELECT valor FROM Dim_posto_graduacao WHERE id = p.posto_graduacao_id) AS posto_graduacao,
+           d.valor AS estado,
+           (SELECT valor FROM Dim_cidade WHERE id = l.cidade_id) AS cidade
+    FROM Dim_estado d
+    JOIN LocalizacaoC l ON l.estado_id = d.id
+    JOIN PessoaC p ON p.id = l.pessoa_id
+    WHERE d.valor = %s AND l.pessoa_id > %s
+    ORDER BY l.pessoa_id
+    LIMIT %s
+"""
+
+COLUNAS_MODALIDADE = ("id", "sexo", "forca", "posto_graduacao", "modalidade", "possui_medalha", "possui_bolsa", "paar")
+COLUNAS_ESTADO = ("id", "sexo", "forca", "posto_graduacao", "estado", "cidade")
+
+# Maior página aceita nas listagens
+LIMITE_MAXIMO = 1000
+
+
+class BackendSQLiteAssincrono:
+    """Arquivo SQLite via aiosqlite (cada conexão tem a sua thread de trabalho)."""
+
+    nome = "sqlite"
+
+    async def conectar(self):
+        if aiosqlite is None:
+            raise main.ErroConexao("aiosqlite não está instalado (pip install aiosqlite).")
+        config = main.SQLITE_CONFIG
+        conn = await aiosqlite.connect(config["caminho"], timeout=30)
+        for pragma in ("journal_mode = WAL", "synchronous = NORMAL", "foreign_keys = ON",
+                       "temp_store = MEMORY", f"cache_size = -{config['cache_kb']}",
+                       f"mmap_size = {config['mmap_bytes']}"):
+            await conn.execute(f"PRAGMA {pragma}")
+        return conn
+
+    async def consultar(self, conn, sql, parametros=()):
+        async with conn.execute(sql.replace("%s", "?"), parametros) as cursor:
+            return await cursor.fetchall()
+
+    async def fechar(self, conn):
+        await conn.close()
+
+
+class BackendMySQLAssincrono:
+    """Servidor MySQL/MariaDB via aiomysql, com as credenciais de DB_CONFIG."""
+
+    nome = "mysql"
+
+    async def conectar(self):
+        if aiomysql is None:
+            raise main.ErroConexao("aiomysql não está instalado (pip install aiomysql).")
+        config = main.DB_CONFIG
+        # autocommit: cada leitura enxerga as escritas já confirmadas por outras conexões
+        return await aiomysql.connect(host=config["host"], user=config["user"], password=config["password"],
+                                      db=config["database"], autocommit=True)
+
+    async def consultar(self, conn, sql, parametros=()):
+        async with conn.cursor() as cursor:
+            await cursor.execute(sql, parametros or None)
+            return await cursor.fetchall()
+
+    async def fechar(self, conn):
+        conn.close()
+
+
+def criar_backend(nome):
+    if nome == "mysql":
+        return BackendMySQLAssincrono()
+    if nome == "sqlite":
+        return BackendSQLiteAssincrono()
+    raise ValueError(f"Backend desconhecido: {nome!r} (use 'mysql' ou 'sqlite').")
+
+
+class PoolAssincrono:
+    """
+    Conexões assíncronas reaproveitadas entre as corrotinas. No máximo tamanho conexões
+    ficam abertas; quem chega com todas em uso espera até tempo_espera segundos.
+    Uma conexão que falhou durante o uso é fechada em vez de voltar ao pool.
+    """
+
+    def __init__(self, backend, tamanho, tempo_espera):
+        self.backend = backend
+        self.tamanho = tamanho
+        self.tempo_espera = tempo_espera
+        self._livres = []
+        self._vagas = asyncio.Semaphore(tamanho)
+
+    @contextlib.asynccontextmanager
+    async def conexao(self):
+        try:
+            await asyncio.wait_for(self._vagas.acquire(), self.tempo_espera)
+        except asyncio.TimeoutError:
+            raise main.ErroConexao(f"Nenhuma conexão livre no pool após {self.tempo_espera}s.") from None
+
+        conn = None
+        try:
+            if self._livres:
+                conn = self._livres.pop()
+            else:
+                with metricas.cronometrar("async.conexao.abrir"):
+                    conn = await self.backend.conectar()
+            yield conn
+        except BaseException:
+            if conn is not None:
+                with contextlib.suppress(Exception):
+                    await self.backend.fechar(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._livres.append(conn)
+            self._vagas.release()
+
+    async def consultar(self, sql, parametros=()):
+        async with self.conexao() as conn:
+            inicio = time.perf_counter()
+            linhas = await self.backend.consultar(conn, sql, parametros)
+            metricas.registrar("async.sql.SELECT", time.perf_counter() - inicio, len(linhas))
+            return linhas
+
+    async def fechar_todas(self):
+        livres, self._livres = self._livres, []
+        for conn in livres:
+            with contextlib.suppress(Exception):
+                await self.backend.fechar(conn)
+
+
+_pool = None
+
+
+def obter_pool():
+    """Pool do event loop atual, criado no primeiro uso com o backend de main.DB_BACKEND."""
+    global _pool
+    if _pool is None:
+        _pool = PoolAssincrono(criar_backend(main.DB_BACKEND), main.POOL_CONFIG["tamanho"],
+                               main.POOL_CONFIG["tempo_espera"])
+    return _pool
+
+
+async def fechar_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.fechar_todas()
+        _pool = None
+
+
+async def buscar_elemento(id):
+    """Registro (sexo, forca, ..., paar) de id, ou None; leituras repetidas vêm do cache do main."""
+    async def carregar():
+        linhas = await obter_pool().consultar(main.CONSULTA_ELEMENTO, (id,))
+        return tuple(linhas[0]) if linhas else None
+
+    return await main._cache_consultas.obter_assincrono(("elemento", int(id)), carregar)
+
+
+async def _listar(consulta, consulta_compacta, valor, apos_id, limite):
+    limite = max(1, min(int(limite), LIMITE_MAXIMO))
+    consulta = consulta_compacta if main.SCHEMA_COMPACTO else consulta
+    parametros = (valor, int(apos_id), limite)
+
+    async def carregar():
+        return tuple(tuple(linha) for linha in await obter_pool().consultar(consulta, parametros))
+
+    return await main._cache_consultas.obter_assincrono(main._chave_consulta(consulta, parametros), carregar)
+
+
+async def listar_modalidade(modalidade, apos_id=0, limite=100):
+    """Até limite registros da modalidade com id maior que apos_id, em ordem de id."""
+    return await _listar(LISTAGEM_MODALIDADE, LISTAGEM_MODALIDADE_COMPACTO, modalidade, apos_id, limite)
+
+
+async def listar_estado(estado, apos_id=0, limite=100):
+    """Até limite registros do estado com id maior que apos_id, em ordem de id."""
+    return await _listar(LISTAGEM_ESTADO, LISTAGEM_ESTADO_COMPACTO, estado, apos_id, limite)
+
+
+async def gerar_relatorio(nome):
+    """(colunas, linhas) do relatório nome, lido da tabela de resumo como main.gerar_relatorio."""
+    tabela = main.RELATORIOS[nome]
+    resumo = main.RESUMOS[tabela]
+    colunas = list(resumo["grupo"] + resumo["contadores"])
+    consulta = f"SELECT {', '.join(colunas)} FROM {tabela}"
+
+    async def carregar():
+        return tuple(tuple(linha) for linha in await obter_pool().consultar(consulta))
+
+    linhas = await main._cache_consultas.obter_assincrono(main._chave_consulta(consulta), carregar)
+    return main._formatar_relatorio(resumo, colunas, [list(linha) for linha in linhas])
+
+
+async def novo_elemento(lista_elementos):
+    """Inclui o registro (validado por referencia) e retorna o id, ou None se os valores forem inválidos."""
+    validos, _ = referencia.validar_lote([lista_elementos])
+    if not validos:
+        return None
+    return await asyncio.to_thread(main.novo_elemento, validos[0])
+
+
+async def atualizar_elemento(id, lista_elementos, versao=None):
+    """Grava o registro id (validado por main.atualizar_elemento); ValueError se um campo alterado for inválido."""
+    return await asyncio.to_thread(main.atualizar_elemento, id, lista_elementos, versao)
+
+
+async def remover_elemento(id):
+    return await asyncio.to_thread(main.remover_elemento, id)
@@ -0,0 +1,228 @@
+"""
+Benchmark dos caminhos de carga, consulta e CRUD do sistema PAAR.
+
+Gera conjuntos sintéticos no formato de paar_set_2024.csv (mesmo cabeçalho, mesmo
+delimitador e valores sorteados a partir dos que aparecem em cada coluna do arquivo
+real), carrega cada um em um banco descartável e mede carregar_csv_para_banco,
+consultar_tabela, buscar_elemento, atualizar_elemento e remover_elemento. O resultado
+é gravado em JSON e em Markdown.
+
+O backend padrão é o SQLite, que não precisa de servidor; com --backend mysql a
+medição usa um banco MySQL/MariaDB descartável configurado pelas variáveis DB_*.
+
+Uso:
+    python benchmark.py --tamanhos 1000,100000,1000000
+    python benchmark.py --backend mysql --banco paar_benchmark
+
+ATENÇÃO: o banco informado em --banco é esvaziado antes de cada tamanho.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import main
+
+ARQUIVO_REFERENCIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paar_set_2024.csv")
+
+
+def carregar_vocabulario(arquivo=ARQUIVO_REFERENCIA):
+    """Lê o CSV real e devolve o cabeçalho e a lista de valores de cada coluna."""
+    with open(arquivo, mode='r', encoding='latin-1', newline='') as f:
+        leitor = csv.reader(f, delimiter=';')
+        cabecalho = next(leitor)
+        colunas = [[] for _ in cabecalho]
+        for linha in leitor:
+            for i, valor in enumerate(linha[:len(cabecalho)]):
+                colunas[i].append(valor)
+    return cabecalho, colunas
+
+
+def gerar_csv(caminho, linhas, semente=42):
+    """
+    Grava um CSV sintético com o cabeçalho do arquivo real. Cada coluna é sorteada
+    com a mesma distribuição de valores observada no arquivo de referência.
+    """
+    cabecalho, colunas = carregar_vocabulario()
+    aleatorio = random.Random(semente)
+
+    with open(caminho, mode='w', encoding='latin-1', newline='') as f:
+        escritor = csv.writer(f, delimiter=';')
+        escritor.writerow(cabecalho)
+        for _ in range(linhas):
+            escritor.writerow([aleatorio.choice(valores) for valores in colunas])
+
+
+def percentis(amostras):
+    """Resumo de latência em milissegundos."""
+    if not amostras:
+        return {}
+    ms = sorted(a * 1000 for a in amostras)
+    if len(ms) == 1:
+        p50 = p95 = p99 = ms[0]
+    else:
+        cortes = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p95, p99 = cortes[49], cortes[94], cortes[98]
+    return {
+        "amostras": len(ms),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(ms[-1], 3),
+        "ops_por_s": round(len(ms) / (sum(ms) / 1000), 1) if sum(ms) else None
+    }
+
+
+@contextlib.contextmanager
+def silencioso():
+    """As funções do sistema imprimem no terminal; durante a medição a saída é descartada."""
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        yield
+
+
+def medir(funcao, argumentos):
+    amostras = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcao(*args)
+        amostras.append(time.perf_counter() - inicio)
+    return amostras
+
+
+def contar_pessoas():
+    with main.conectar() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*), COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM Pessoa")
+            return cursor.fetchone()
+
+
+def preparar_banco(backend, nome_banco):
+    """Cria o banco descartável (se preciso) e aponta o sistema para ele."""
+    if backend == "sqlite":
+        main.definir_backend("sqlite", caminho_sqlite=nome_banco)
+        return
+
+    import mysql.connector
+
+    config = {k: v for k, v in main.DB_CONFIG.items() if k != "database"}
+    conn = mysql.connector.connect(**config)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{nome_banco}`")
+    finally:
+        conn.close()
+
+    main.DB_CONFIG["database"] = nome_banco
+    main.definir_backend("mysql")
+
+
+def executar_tamanho(linhas, operacoes, repeticoes_tabela, semente):
+    aleatorio = random.Random(semente)
+    resultado = {"linhas": linhas}
+
+    with tempfile.TemporaryDirectory(prefix="paar_bench_") as pasta:
+        arquivo = os.path.join(pasta, f"paar_sintetico_{linhas}.csv")
+        inicio = time.perf_counter()
+        gerar_csv(arquivo, linhas, semente)
+        resultado["geracao_s"] = round(time.perf_counter() - inicio, 3)
+
+        with silencioso():
+            main.criar_tabelas()
+            main.limpar_tabelas()
+
+            inicio = time.perf_counter()
+            main.carregar_csv_para_banco(arquivo)
+            duracao = time.perf_counter() - inicio
+
+    carregados, menor_id, maior_id = contar_pessoas()
+    resultado["carga"] = {
+        "registros": carregados,
+        "duracao_s": round(duracao, 3),
+        "linhas_por_s": round(carregados / duracao, 1) if duracao else None
+    }
+    if not carregados:
+        return resultado
+
+    ids = [aleatorio.randint(menor_id, maior_id) for _ in range(operacoes)]
+    _, colunas = carregar_vocabulario()
+    novos = [[main.normalizar_celula(aleatorio.choice(colunas[i])) or "N/A" for i in (0, 3, 4, 1, 2, 6)]
+             + ["Sim", "Não", "Sim"] for _ in range(operacoes)]
+
+    with silencioso():
+        resultado["consultar_tabela"] = percentis(
+            medir(main.consultar_tabela, [("Pessoa",)] * repeticoes_tabela))
+        resultado["consultar_elemento"] = percentis(
+            medir(main.buscar_elemento, [(i,) for i in ids]))
+        resultado["alterar_elemento"] = percentis(
+            medir(main.atualizar_elemento, list(zip(ids, novos))))
+        resultado["excluir_elemento"] = percentis(
+            medir(main.remover_elemento, [(i,) for i in sorted(set(ids))]))
+
+    return resultado
+
+
+def relatorio_markdown(resultados, backend):
+    linhas = [f"# Benchmark PAAR ({backend})", ""]
+    for r in resultados:
+        carga = r["carga"]
+        linhas += [
+            f"## {r['linhas']} linhas",
+            "",
+            f"Carga: {carga['registros']} registros em {carga['duracao_s']}s ({carga['linhas_por_s']} linhas/s)",
+            "",
+            "| Operação | Amostras | p50 (ms) | p95 (ms) | p99 (ms) | máx (ms) | ops/s |",
+            "|---|---|---|---|---|---|---|"
+        ]
+        for operacao in ("consultar_tabela", "consultar_elemento", "alterar_elemento", "excluir_elemento"):
+            p = r.get(operacao)
+            if p:
+                linhas.append(f"| {operacao} | {p['amostras']} | {p['p50_ms']} | {p['p95_ms']} | "
+                              f"{p['p99_ms']} | {p['max_ms']} | {p['ops_por_s']} |")
+        linhas.append("")
+    return "\n".join(linhas)
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark de carga, consulta e CRUD do sistema PAAR.")
+    parser.add_argument("--tamanhos", default="1000,100000,1000000",
+                        help="quantidades de linhas separadas por vírgula (padrão: 1000,100000,1000000)")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite",
+                        help="backend de armazenamento medido (padrão: sqlite)")
+    parser.add_argument("--banco", default=None,
+                        help="banco descartável usado na medição; será esvaziado "
+                             "(padrão: paar_benchmark.db no SQLite, paar_benchmark no MySQL)")
+    parser.add_argument("--operacoes", type=int, default=200,
+                        help="operações de CRUD medidas por tamanho (padrão: 200)")
+    parser.add_argument("--repeticoes-tabela", type=int, default=3,
+                        help="varreduras completas medidas em consultar_tabela (padrão: 3)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default="benchmark_paar",
+                        help="prefixo dos relatórios .json e .md (padrão: benchmark_paar)")
+    args = parser.parse_args()
+
+    nome_banco = args.banco or ("paar_benchmark.db" if args.backend == "sqlite" else "paar_benchmark")
+    preparar_banco(args.backend, nome_banco)
+
+    resultados = []
+    for tamanho in (int(t) for t in args.tamanhos.split(",") if t.strip()):
+        print(f"Executando benchmark com {tamanho} linhas...")
+        resultados.append(executar_tamanho(tamanho, args.operacoes, args.repeticoes_tabela, args.semente))
+
+    with open(args.saida + ".json", "w", encoding="utf-8") as f:
+        json.dump({"backend": args.backend, "resultados": resultados}, f, ensure_ascii=False, indent=2)
+
+    markdown = relatorio_markdown(resultados, args.backend)
+    with open(args.saida + ".md", "w", encoding="utf-8") as f:
+        f.write(markdown)
+
+    print(markdown)
+
+
+if __name__ == "__main__":
+    main_benchmark()
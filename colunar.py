@@ -0,0 +1,222 @@
+"""
+Snapshot colunar do conjunto PAAR (Pessoa + Localizacao + Esporte) para análises fora do banco.
+
+Cada snapshot é uma pasta com um arquivo .npy por coluna e um manifesto.json:
+- id.npy: id de Pessoa de cada registro (int64);
+- sexo, forca, posto_graduacao, estado, cidade, modalidade: códigos de dicionário
+  (uint8, uint16 ou uint32, conforme a quantidade de valores distintos); os valores
+  ficam no manifesto, e o código de None marca o registro sem Localizacao ou Esporte;
+- possui_medalha, possui_bolsa, paar: um bit por registro (Sim = 1), em bytes
+  empacotados com numpy.packbits.
+
+Os arquivos são abertos com mmap (numpy.load(mmap_mode="r")), então abrir um snapshot
+não lê os dados; filtros e agrupamentos trabalham direto sobre os códigos. O manifesto
+é gravado por último e marca o snapshot como completo.
+
+Requer numpy.
+"""
+
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:  # Sem numpy o snapshot colunar fica indisponível
+    np = None
+
+FORMATO = 1
+MANIFESTO = "manifesto.json"
+
+CATEGORICAS = ("sexo", "forca", "posto_graduacao", "estado", "cidade", "modalidade")
+FLAGS = ("possui_medalha", "possui_bolsa", "paar")
+
+# Ordem dos campos de cada registro (igual a CAMPOS_ELEMENTO do main)
+CAMPOS = CATEGORICAS + FLAGS
+
+# Campo cujo valor None indica que o registro não tem a linha dependente da flag
+_PRESENCA_FLAGS = "modalidade"
+
+# Até esse número de combinações de grupo, agrupar conta direto em um vetor denso
+_LIMITE_CONTAGEM_DIRETA = 1 << 22
+
+
+def _exigir_numpy():
+    if np is None:
+        raise RuntimeError("O snapshot colunar requer numpy (pip install numpy).")
+
+
+def _tipo_codigo(distintos):
+    for tipo in (np.uint8, np.uint16):
+        if distintos <= np.iinfo(tipo).max + 1:
+            return tipo
+    return np.uint32
+
+
+class EscritorSnapshot:
+    """
+    Recebe os registros em blocos de (id, sexo, ..., paar) e grava o snapshot em pasta.
+    Os dicionários crescem conforme os valores aparecem, então a ordem dos códigos é a
+    ordem da primeira ocorrência.
+    """
+
+    def __init__(self, pasta):
+        _exigir_numpy()
+        self.pasta = pasta
+        self.total = 0
+        self._ids = []
+        self._codigos = {campo: [] for campo in CATEGORICAS}
+        self._dicionarios = {campo: {} for campo in CATEGORICAS}
+        self._flags = {campo: [] for campo in FLAGS}
+
+    def adicionar(self, registros):
+        if not registros:
+            return
+
+        self._ids.append(np.fromiter((r[0] for r in registros), dtype=np.int64, count=len(registros)))
+        for i, campo in enumerate(CAMPOS, start=1):
+            if campo in self._flags:
+                self._flags[campo].append(np.fromiter((r[i] == "Sim" for r in registros), dtype=bool,
+                                                      count=len(registros)))
+            else:
+                dicionario = self._dicionarios[campo]
+                # setdefault devolve o código já atribuído ou atribui o próximo
+                self._codigos[campo].append(np.fromiter((dicionario.setdefault(r[i], len(dicionario))
+                                                         for r in registros), dtype=np.uint32,
+                                                        count=len(registros)))
+        self.total += len(registros)
+
+    def fechar(self):
+        """Grava as colunas e, por fim, o manifesto. Retorna o total de registros."""
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho_manifesto = os.path.join(self.pasta, MANIFESTO)
+        if os.path.exists(caminho_manifesto):
+            os.remove(caminho_manifesto)
+
+        np.save(os.path.join(self.pasta, "id.npy"), np.concatenate(self._ids) if self._ids
+                else np.empty(0, dtype=np.int64))
+
+        dicionarios = {}
+        for campo in CATEGORICAS:
+            valores = list(self._dicionarios[campo])
+            codigos = np.concatenate(self._codigos[campo]) if self._codigos[campo] else np.empty(0, np.uint32)
+            np.save(os.path.join(self.pasta, f"{campo}.npy"), codigos.astype(_tipo_codigo(len(valores))))
+            dicionarios[campo] = valores
+
+        for campo in FLAGS:
+            bits = np.concatenate(self._flags[campo]) if self._flags[campo] else np.empty(0, dtype=bool)
+            np.save(os.path.join(self.pasta, f"{campo}.npy"), np.packbits(bits))
+
+        with open(caminho_manifesto, "w", encoding="utf-8") as f:
+            json.dump({"formato": FORMATO, "total": self.total, "dicionarios": dicionarios},
+                      f, ensure_ascii=False)
+        return self.total
+
+
+class Snapshot:
+    """Snapshot aberto com mmap; filtros e agrupamentos operam sobre os códigos."""
+
+    def __init__(self, pasta):
+        _exigir_numpy()
+        with open(os.path.join(pasta, MANIFESTO), encoding="utf-8") as f:
+            manifesto = json.load(f)
+        if manifesto.get("formato") != FORMATO:
+            raise ValueError(f"Formato de snapshot não suportado: {manifesto.get('formato')!r}")
+
+        self.pasta = pasta
+        self.total = manifesto["total"]
+        self.dicionarios = manifesto["dicionarios"]
+        self._indices = {campo: {v: c for c, v in enumerate(valores)} for campo, valores in self.dicionarios.items()}
+        self.ids = np.load(os.path.join(pasta, "id.npy"), mmap_mode="r")
+        self.codigos = {campo: np.load(os.path.join(pasta, f"{campo}.npy"), mmap_mode="r")
+                        for campo in CATEGORICAS}
+        self._bits = {campo: np.load(os.path.join(pasta, f"{campo}.npy"), mmap_mode="r") for campo in FLAGS}
+        self._flags = {}
+
+    def flag(self, campo):
+        """Coluna booleana da flag (desempacotada uma vez e mantida em memória)."""
+        if campo not in self._flags:
+            self._flags[campo] = np.unpackbits(self._bits[campo], count=self.total).view(bool)
+        return self._flags[campo]
+
+    def presentes(self, campo):
+        """Máscara dos registros em que campo não é None (tem a linha dependente)."""
+        codigo = self._indices[campo].get(None)
+        if codigo is None:
+            return np.ones(self.total, dtype=bool)
+        return self.codigos[campo] != codigo
+
+    def mascara(self, filtros=None):
+        """
+        Máscara booleana dos registros que atendem a filtros, um dicionário campo -> valor
+        ou lista de valores (qualquer um serve). Flags aceitam "Sim"/"Não" e só casam com
+        registros que têm Esporte.
+        """
+        mascara = np.ones(self.total, dtype=bool)
+        for campo, valores in (filtros or {}).items():
+            valores = [valores] if isinstance(valores, str) or valores is None else list(valores)
+            if campo in FLAGS:
+                aceitos = {v == "Sim" for v in valores if v in ("Sim", "Não")}
+                if len(aceitos) == 1:
+                    mascara &= self.flag(campo) == aceitos.pop()
+                elif not aceitos:
+                    mascara[:] = False
+                mascara &= self.presentes(_PRESENCA_FLAGS)
+            elif campo in self.codigos:
+                codigos = [self._indices[campo][v] for v in valores if v in self._indices[campo]]
+                mascara &= np.isin(self.codigos[campo], codigos)
+            else:
+                raise ValueError(f"Campo desconhecido no snapshot: {campo!r}")
+        return mascara
+
+    def agrupar(self, grupo, somas=(), mascara=None):
+        """
+        Agrupa os registros selecionados por mascara pelos campos de grupo. Retorna uma
+        linha por combinação presente: valores do grupo (None vira ''), quantidade de
+        registros e a soma de cada flag de somas.
+        """
+        selecionar = (lambda coluna: coluna) if mascara is None else (lambda coluna: coluna[mascara])
+
+        # Combina os códigos dos campos do grupo em uma chave inteira por registro
+        dimensoes = tuple(max(len(self.dicionarios[c]), 1) for c in grupo)
+        chaves = selecionar(self.codigos[grupo[0]]).astype(np.intp)
+        for c, tamanho in zip(grupo[1:], dimensoes[1:]):
+            chaves *= tamanho
+            chaves += selecionar(self.codigos[c])
+
+        combinacoes = int(np.prod(dimensoes))
+        if combinacoes <= _LIMITE_CONTAGEM_DIRETA:
+            # Poucas combinações possíveis: contagem direta, sem ordenar as chaves
+            contagens = np.bincount(chaves, minlength=combinacoes)
+            unicas = np.flatnonzero(contagens)
+            contagens = contagens[unicas]
+            totais = [np.bincount(chaves, weights=selecionar(self.flag(c)), minlength=combinacoes)[unicas]
+                      for c in somas]
+        else:
+            unicas, inverso = np.unique(chaves, return_inverse=True)
+            contagens = np.bincount(inverso, minlength=len(unicas))
+            totais = [np.bincount(inverso, weights=selecionar(self.flag(c)), minlength=len(unicas)) for c in somas]
+
+        linhas = []
+        for posicao, codigos in enumerate(zip(*np.unravel_index(unicas, dimensoes))):
+            valores = tuple(self.dicionarios[c][int(k)] or '' for c, k in zip(grupo, codigos))
+            linhas.append(valores + (int(contagens[posicao]),) + tuple(int(t[posicao]) for t in totais))
+        return linhas
+
+    def registros(self, tamanho_bloco=50000, mascara=None):
+        """Gera blocos de listas de elementos (sexo, ..., paar) decodificados, na ordem do snapshot."""
+        posicoes = np.flatnonzero(mascara) if mascara is not None else None
+        total = len(posicoes) if posicoes is not None else self.total
+        esporte = self.presentes(_PRESENCA_FLAGS)
+        tabelas = {c: np.array(self.dicionarios[c] or [None], dtype=object) for c in CATEGORICAS}
+        sim_nao = np.array(["Não", "Sim", None], dtype=object)  # índice 2: registro sem Esporte
+
+        for inicio in range(0, total, tamanho_bloco):
+            fatia = posicoes[inicio:inicio + tamanho_bloco] if posicoes is not None \
+                else slice(inicio, inicio + tamanho_bloco)
+            colunas = [tabelas[c][self.codigos[c][fatia]].tolist() for c in CATEGORICAS]
+            ausentes = ~esporte[fatia]
+            for c in FLAGS:
+                indices = self.flag(c)[fatia].astype(np.int8)
+                indices[ausentes] = 2
+                colunas.append(sim_nao[indices].tolist())
+            yield [list(linha) for linha in zip(*colunas)]
@@ -1,12 +1,44 @@
 
 import os
+import argparse
 import csv
+import atexit
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import glob
+import gzip
+import hashlib
+import itertools
+import json
 import re
+import sys
 import unicodedata
 import logging
-import mysql.connector
-from mysql.connector import Error
-import pandas as pd
+import queue
+import time
+import tempfile
+import threading
+import sqlite3
+
+try:
+    import mysql.connector
+    from mysql.connector import Error as ErroMySQL
+except ImportError:  # Sem o conector, apenas o backend SQLite fica disponível
+    mysql = None
+
+    class ErroMySQL(Exception):
+        errno = None
+
+try:
+    import pandas as pd
+except ImportError:  # Sem pandas, a carga vetorizada recorre à carga em lotes
+    pd = None
+
+import colunar
+import metricas
+import referencia
 
 # Configuração do log
 logging.basicConfig(filename='sistema_gestao.log', level=logging.INFO, 
@@ -20,298 +52,3204 @@ DB_CONFIG = {
     "database": os.environ.get("DB_NAME", "database_name")
 }
 
-def process_csv(input_file, output_file):
+# Backend de armazenamento: "mysql" (padrão) ou "sqlite" (arquivo local, sem servidor)
+DB_BACKEND = os.environ.get("DB_BACKEND", "mysql").lower()
+
+SQLITE_CONFIG = {
+    "caminho": os.environ.get("DB_SQLITE_PATH", "paar.db"),
+    "cache_kb": int(os.environ.get("DB_SQLITE_CACHE_KB", 65536)),
+    "mmap_bytes": int(os.environ.get("DB_SQLITE_MMAP_BYTES", 268435456))
+}
+
+# Esquema compacto: colunas categóricas em tabelas de dicionário e Sim/Não como booleanos.
+# Pessoa, Localizacao e Esporte passam a ser views com as colunas textuais de sempre.
+SCHEMA_COMPACTO = os.environ.get("DB_COMPACT_SCHEMA", "0").lower() in ("1", "sim", "true")
+
+# Configurações do pool de conexões
+POOL_CONFIG = {
+    "tamanho": int(os.environ.get("DB_POOL_SIZE", 5)),
+    "tempo_ocioso": float(os.environ.get("DB_POOL_IDLE_TIMEOUT", 300)),
+    "intervalo_ping": float(os.environ.get("DB_POOL_PING_INTERVAL", 30)),
+    "tempo_espera": float(os.environ.get("DB_POOL_WAIT_TIMEOUT", 30))
+}
+
+# Colunas gravadas nos arquivos de LOAD DATA LOCAL INFILE, por tabela
+COLUNAS_LOAD_DATA = {
+    "Pessoa": ("id", "sexo", "forca", "posto_graduacao"),
+    "Localizacao": ("pessoa_id", "estado", "cidade"),
+    "Esporte": ("pessoa_id", "modalidade", "possui_medalha", "possui_bolsa", "paar")
+}
+
+# Erros de local infile desabilitado: 1148 (servidor), 3948 (servidor, 8.0) e 2068 (cliente)
+ERROS_LOCAL_INFILE = (1148, 2068, 3948)
+
+# Linhas lidas por fetchmany/página nas consultas de tabela
+TAMANHO_PAGINA_PADRAO = int(os.environ.get("DB_PAGE_SIZE", 500))
+
+# Nomes de tabelas e colunas aceitos em SQL montado dinamicamente
+IDENTIFICADOR_SQL = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Padrão de tag HTML removido das células do CSV
+TAG_HTML = re.compile(r'<[^>]*>')
+
+# Quantidade máxima de valores distintos de célula memorizados pela normalização
+TAMANHO_CACHE_NORMALIZACAO = int(os.environ.get("CSV_NORMALIZE_CACHE_SIZE", 4096))
+
+# Cache de leitura de buscar_elemento e dos relatórios: entradas mantidas e validade em segundos
+# (capacidade 0 desliga o cache)
+CACHE_CONSULTAS_CONFIG = {
+    "capacidade": int(os.environ.get("DB_QUERY_CACHE_SIZE", 1024)),
+    "validade": float(os.environ.get("DB_QUERY_CACHE_TTL", 60))
+}
+
+# Quantidade de linhas do CSV enviadas ao banco por INSERT/commit
+TAMANHO_LOTE_PADRAO = int(os.environ.get("CSV_BATCH_SIZE", 1000))
+
+# Linhas lidas por bloco na carga vetorizada (pandas); blocos grandes diluem o custo fixo de cada operação
+TAMANHO_BLOCO_PANDAS = int(os.environ.get("CSV_PANDAS_CHUNK_SIZE", 50000))
+
+def remove_html_tags(text):
+    """Remove tags HTML de uma string."""
+    if '<' not in text:
+        return text
+    return TAG_HTML.sub('', text)
+
+
+def normalize_text(text):
+    """Remove acentuações e substitui 'ç' por 'c'."""
+    if not text:
+        return None
+    # Texto ASCII não tem acentos nem 'ç': dispensa a decomposição Unicode
+    if text.isascii():
+        return text
+    normalized = unicodedata.normalize('NFD', text)
+    without_accents = ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
+    return without_accents.replace('ç', 'c').replace('Ç', 'C')
+
+
+@functools.lru_cache(maxsize=TAMANHO_CACHE_NORMALIZACAO)
+def normalizar_celula(cell):
     """
-    Processa um arquivo CSV, remove tags HTML, normaliza texto (acentuação, 'ç' para 'c') 
-    e ajusta delimitadores (de ponto e vírgula para o delimitador desejado).
+    Normaliza uma célula crua do CSV (sem tags HTML e sem acentuação). Os dados do
+    PAAR têm poucos valores distintos por coluna, então o resultado é memorizado
+    pelo valor cru e as repetições custam apenas uma consulta ao cache.
     """
-    def remove_html_tags(text):
-        """Remove tags HTML de uma string."""
-        return re.sub(r'<[^>]*>', '', text)
-
-    def normalize_text(text):
-        """Remove acentuações e substitui 'ç' por 'c'."""
-        if not text:
-            return None
-        normalized = unicodedata.normalize('NFD', text)
-        without_accents = ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
-        return without_accents.replace('ç', 'c').replace('Ç', 'C')
+    return normalize_text(remove_html_tags(cell))
 
-    def converter_para_utf8(nome_arquivo):
-        """Converte um arquivo CSV para UTF-8."""
-        arquivo_normalizado = os.path.join(os.getcwd(), "normalized_" + nome_arquivo)
 
-        try:
-            dados = pd.read_csv(nome_arquivo, sep=";", encoding="latin1")
-            # Normalizar colunas
-            dados.columns = dados.columns.str.strip().str.replace(r'\s+', ' ', regex=True)
-            dados.to_csv(arquivo_normalizado, index=False, encoding="utf-8")
-            logging.info(f"Arquivo '{nome_arquivo}' convertido para UTF-8 com sucesso.")
-            return arquivo_normalizado
-        except Exception as e:
-            logging.error(f"Erro ao converter arquivo: {e}")
-            raise
+def estatisticas_normalizacao():
+    """Acertos, faltas e ocupação do cache de normalizar_celula neste processo."""
+    info = normalizar_celula.cache_info()
+    return {"acertos": info.hits, "faltas": info.misses, "tamanho": info.currsize, "limite": info.maxsize}
 
-    # Converter o arquivo original para UTF-8
-    converter_para_utf8(input_file)
 
-    # Processar e salvar o arquivo normalizado
-    with open(input_file, mode='r', encoding='latin-1') as infile, \
-         open(output_file, mode='w', encoding='utf-8', newline='') as outfile:
-        
+def normalizar_linhas_csv(input_file, output_file=None):
+    """
+    Lê o CSV original (latin-1) uma única vez e produz, linha a linha, as células
+    sem tags HTML e sem acentuação. O consumo de memória não depende do tamanho do
+    arquivo. Se output_file for informado, a cópia normalizada também é gravada.
+    """
+    with contextlib.ExitStack() as pilha:
+        infile = pilha.enter_context(open(input_file, mode='r', encoding='latin-1', newline=''))
         reader = csv.reader(infile, delimiter=';')  # Ajuste para ponto e vírgula no CSV original
-        writer = csv.writer(outfile, delimiter=';')  # Preserva o delimitador na saída
-        
-        # Processar linha por linha
+
+        writer = None
+        if output_file:
+            outfile = pilha.enter_context(open(output_file, mode='w', encoding='utf-8', newline=''))
+            writer = csv.writer(outfile, delimiter=';')  # Preserva o delimitador na saída
+
         for row in reader:
             # Normalizar o conteúdo de cada célula
-            cleaned_row = [normalize_text(remove_html_tags(cell)) for cell in row]
-            writer.writerow(cleaned_row)
+            cleaned_row = [normalizar_celula(cell) for cell in row]
+            if writer:
+                writer.writerow(cleaned_row)
+            yield cleaned_row
+
+    if output_file:
+        logging.info(f"Arquivo '{input_file}' processado e salvo como '{output_file}'.")
+
+
+@metricas.cronometrado("csv.normalizar_arquivo")
+def process_csv(input_file, output_file):
+    """
+    Processa um arquivo CSV, remove tags HTML, normaliza texto (acentuação, 'ç' para 'c') 
+    e grava o resultado em output_file, preservando o delimitador ponto e vírgula.
+    """
+    for _ in normalizar_linhas_csv(input_file, output_file):
+        pass
+
+
+def ler_registros_csv(nome_arquivo, arquivo_normalizado=None):
+    """
+    Produz cada linha normalizada do CSV como um dicionário indexado pelo cabeçalho,
+    no mesmo formato de csv.DictReader, sem arquivo intermediário em disco.
+    """
+    linhas = normalizar_linhas_csv(nome_arquivo, arquivo_normalizado)
+    cabecalho = [coluna or '' for coluna in next(linhas, [])]
+
+    # Verificar se as chaves estão corretas
+    print("Cabeçalhos do CSV:", cabecalho)
+
+    for valores in linhas:
+        yield dict(zip(cabecalho, (valor or '' for valor in valores)))
+
+
+# Modos de limpar_tabelas
+MODOS_LIMPEZA = {
+    "estatisticas": "esvazia as tabelas e mostra a quantidade de linhas estimada pelas estatísticas do banco",
+    "rapido": "esvazia as tabelas sem contar linhas",
+    "troca": "troca as tabelas por cópias vazias e descarta as antigas em segundo plano"
+}
 
-    logging.info(f"Arquivo '{input_file}' processado e salvo como '{output_file}'.")
 
 # Função para limpar as tabelas excluindo suas linhas
-def limpar_tabelas():
+def limpar_tabelas(modo="estatisticas"):
+    """
+    Esvazia as tabelas do banco, mantendo os dados de referência (Ref_*). As quantidades
+    exibidas vêm das estatísticas do banco, sem COUNT(*) (que varre a tabela inteira);
+    no modo "rapido" nada é contado. O modo "troca" (limpar_por_troca) não prende as
+    tabelas enquanto as linhas antigas são apagadas.
+    """
+    if modo == "troca":
+        limpar_por_troca()
+        return
+
+    backend = obter_backend()
     try:
         with conectar() as conn:
             with conn.cursor() as cursor:
                 # Desabilitar checagem de chave estrangeira temporariamente
-                cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
-                
-                # Obter as tabelas do banco de dados
-                cursor.execute("SHOW TABLES;")
-                tabelas = cursor.fetchall()
-             
-                tabelas = [t for t in tabelas if not t[0].startswith('vw')]
+                backend.checar_chaves_estrangeiras(cursor, False)
+                try:
+                    # Obter as tabelas do banco de dados (os dados de referência são mantidos)
+                    tabelas = [t for t in _nomes_tabelas(cursor) if not t.startswith("Ref_")]
 
+                    if tabelas:
+                        estimativas = backend.estimar_linhas(cursor) if modo == "estatisticas" else {}
+                        for tabela_nome in tabelas:
+                            if modo == "estatisticas":
+                                estimativa = estimativas.get(tabela_nome)
+                                print(f"Limpando dados da tabela: {tabela_nome} "
+                                      f"({'sem estatística' if estimativa is None else f'cerca de {estimativa} registros'})")
+                            else:
+                                print(f"Limpando dados da tabela: {tabela_nome}")
 
-                if tabelas:
-                    for tabela in tabelas:
-                        print()
-                        tabela_nome = tabela[0]
-                        print(f"Limpando dados da tabela: {tabela_nome}")
-                        
-                        # Verificar a quantidade de registros antes da exclusão
-                        cursor.execute(f"SELECT COUNT(*) FROM {tabela_nome};")
-                        count_before = cursor.fetchone()[0]
-                        print(f"Quantidade de registros antes da exclusão: {count_before}")
-
-                        # Limpar os dados da tabela (usando TRUNCATE para maior eficiência)
-                        cursor.execute(f"TRUNCATE TABLE {tabela_nome};")
-
-                        # Verificar a quantidade de registros depois da exclusão
-                        cursor.execute(f"SELECT COUNT(*) FROM {tabela_nome};")
-                        count_after = cursor.fetchone()[0]
-                        print(f"Quantidade de registros depois da exclusão: {count_after}")
-
-                    # Comitar as mudanças
-                    conn.commit()
-                else:
-                    print("Nenhuma tabela encontrada no banco de dados.")
-                
-                # Reabilitar a checagem de chave estrangeira
-                cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+                            # Limpar os dados da tabela (TRUNCATE no MySQL, para maior eficiência)
+                            backend.esvaziar_tabela(cursor, tabela_nome)
+
+                        if not backend.esvaziar_confirma:
+                            conn.commit()
+                    else:
+                        print("Nenhuma tabela encontrada no banco de dados.")
+                finally:
+                    # Reabilitar a checagem de chave estrangeira (também quando a limpeza falha)
+                    backend.checar_chaves_estrangeiras(cursor, True)
+
+                # Os dicionários do esquema compacto e o cache de consultas também foram esvaziados
+                _dicionarios.limpar()
+                _cache_consultas.invalidar()
                 print()
                 print("Limpeza concluída com sucesso.")
     
-    except Error as err:
+    except ErroBanco as err:
         logging.error(f"Erro ao limpar tabelas: {err}")
         print(f"Erro ao limpar tabelas: {err}")
 
 
-# Função para conectar ao banco de dados
-def conectar():
-    print()
+# Sufixos das tabelas paralelas da troca atômica: as recém-criadas, as da recarga
+# (recarregar_csv) e as que saíram de uso
+SUFIXO_NOVA = "_novo"
+SUFIXO_STAGING = "_staging"
+SUFIXO_ANTIGA = "_antigo"
+
+# Thread que descarta as tabelas antigas da última troca
+_descarte_pendente = None
+
+
+# Tabelas trocadas de uma vez: as do registro (Pessoa primeiro), as de resumo e as da
+# sincronização incremental, cuja chave estrangeira acompanha Pessoa. Os dicionários
+# do esquema compacto e os dados de referência ficam.
+def _tabelas_troca():
+    return [tabela for tabela, _, _ in _tabelas_registro()] + list(RESUMOS) + ["Carga_impressao", "Carga_arquivo"]
+
+
+def _nomes_troca(sufixo):
+    return [f"{tabela}{sufixo}" for tabela in _tabelas_troca()]
+
+
+# Views que citam as tabelas trocadas, na ordem de criação
+def _views_ativas():
+    return {**VIEWS_COMPATIBILIDADE, **VIEWS} if SCHEMA_COMPACTO else VIEWS
+
+
+# Exclui as tabelas (dependentes antes de Pessoa) sem checar as chaves estrangeiras
+def _descartar_tabelas(cursor, tabelas):
+    backend = obter_backend()
+    backend.checar_chaves_estrangeiras(cursor, False)
     try:
-        return mysql.connector.connect(**DB_CONFIG)
-    except Error as err:
-        logging.error(f"Erro ao conectar ao banco de dados: {err}")
-        raise
+        for tabela in reversed(tabelas):
+            cursor.execute(f"DROP TABLE IF EXISTS {tabela}")
+    finally:
+        backend.checar_chaves_estrangeiras(cursor, True)
 
 
-# Criação de tabelas no banco
-def criar_tabelas():
-    queries = [
-        """
-        CREATE TABLE IF NOT EXISTS Pessoa (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            sexo VARCHAR(10),
-            forca VARCHAR(5),
-            posto_graduacao VARCHAR(50)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS Localizacao (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            estado VARCHAR(30),
-            cidade VARCHAR(50)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS Esporte (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            modalidade VARCHAR(50),
-            possui_medalha VARCHAR(5),
-            possui_bolsa VARCHAR(5),
-            paar VARCHAR(5)
-        )
-        """
-    ]
+def _criar_tabelas_paralelas(cursor, sufixo):
+    """
+    Cria vazias, com o sufixo no nome, as tabelas de _tabelas_troca(), ligadas entre si
+    pelas chaves estrangeiras e sem os índices secundários (criados na troca). Sobras de
+    uma troca interrompida são descartadas antes.
+    """
+    backend = obter_backend()
+    _aguardar_descarte()
+    _descartar_tabelas(cursor, _nomes_troca(sufixo) + _nomes_troca(SUFIXO_ANTIGA))
+
+    ddl = backend.ddl_compacto(sufixo) if SCHEMA_COMPACTO else backend.ddl_tabelas(sufixo)
+    ddl += [backend.ddl_resumo(f"{tabela}{sufixo}", resumo["grupo"], resumo["contadores"])
+            for tabela, resumo in RESUMOS.items()]
+    ddl += backend.ddl_carga(_tabela_pessoa(), sufixo)
+    for query in ddl:
+        cursor.execute(query)
+
+
+# Promove as tabelas com o sufixo no lugar das atuais, que ficam com SUFIXO_ANTIGA
+def _promover_tabelas(cursor, sufixo):
+    trocas = [(tabela, f"{tabela}{sufixo}", f"{tabela}{SUFIXO_ANTIGA}") for tabela in _tabelas_troca()]
+    obter_backend().trocar_tabelas(cursor, trocas, _indices_ativos(), _views_ativas())
+
+
+def _descartar_em_segundo_plano(tabelas):
+    """Exclui tabelas em uma thread, com conexão própria; a saída do programa espera por ela."""
+    global _descarte_pendente
+
+    def descartar():
+        inicio = time.perf_counter()
+        # Direto do pool, sem o conectar(), que escreve na tela
+        pool = obter_pool()
+        try:
+            conn = pool.obter()
+            try:
+                with conn.cursor() as cursor:
+                    _descartar_tabelas(cursor, tabelas)
+                conn.commit()
+            finally:
+                pool.devolver(conn)
+            metricas.registrar("limpeza.descartar_antigas", time.perf_counter() - inicio)
+            logging.info(f"Tabelas antigas descartadas em {time.perf_counter() - inicio:.2f}s: {', '.join(tabelas)}")
+        except ErroBanco as err:
+            logging.error(f"Erro ao descartar as tabelas antigas: {err}")
+
+    _descarte_pendente = threading.Thread(target=descartar, name="descarte-tabelas")
+    _descarte_pendente.start()
+
 
+# Espera o descarte da troca anterior, para que duas trocas não disputem as mesmas tabelas
+def _aguardar_descarte():
+    if _descarte_pendente is not None:
+        _descarte_pendente.join()
+
+
+@metricas.cronometrado("limpeza.troca")
+def limpar_por_troca():
+    """
+    Limpeza sem bloqueio longo: cria cópias vazias das tabelas, troca-as pelas atuais
+    de uma vez (_promover_tabelas) e exclui as antigas em segundo plano. As consultas
+    veem os dados anteriores até a troca e as tabelas vazias logo depois, sem esperar
+    que as linhas antigas sejam apagadas.
+    """
     try:
         with conectar() as conn:
             with conn.cursor() as cursor:
-                for query in queries:
-                    cursor.execute(query)
+                _criar_tabelas_paralelas(cursor, SUFIXO_NOVA)
+                _promover_tabelas(cursor, SUFIXO_NOVA)
             conn.commit()
-            logging.info("Tabelas criadas com sucesso.")
-            print("Tabelas criadas com sucesso.")
-    except Error as err:
-        logging.error(f"Erro ao criar tabelas: {err}")
-        print(f"Erro ao criar tabelas: {err}")
+    except ErroBanco as err:
+        logging.error(f"Erro ao limpar tabelas por troca: {err}")
+        print(f"Erro ao limpar tabelas por troca: {err}")
+        print("Confira se as tabelas do sistema existem (opção Criar tabelas).")
+        return
 
+    _cache_consultas.invalidar()
+    _descartar_em_segundo_plano(_nomes_troca(SUFIXO_ANTIGA))
+    print(f"Tabelas trocadas por cópias vazias: {', '.join(_tabelas_troca())}.")
+    print("As tabelas antigas estão sendo excluídas em segundo plano.")
 
-# Carrega o CSV para o banco de dados
-def carregar_csv_para_banco(nome_arquivo):
-    arquivo_normalizado = "normalized_" + nome_arquivo
-    process_csv(nome_arquivo, arquivo_normalizado)  # Normalizar o arquivo
 
-    try:
-        with conectar() as conn:
-            with conn.cursor() as cursor:
-                with open(arquivo_normalizado, mode='r', encoding='utf-8') as arquivo:
-                    leitor = csv.DictReader(arquivo, delimiter=';')  # Ajuste para ponto e vírgula no CSV
-        
-
-                    # Verificar se as chaves estão corretas
-                    print("Cabeçalhos do CSV:", leitor.fieldnames)  # Verificar se os cabeçalhos estão corretos
-                    for linha in leitor:
-                        
-                        if linha.get('Sexo') and linha.get('Modalidade'):
-                            sexo = linha.get('Sexo', '').strip()
-                            estado = linha.get('Estado', '').strip()
-                            cidade = linha.get('Cidade', '').strip()
-                            forca = linha.get('Forca', '').strip()
-                            posto_graduacao = linha.get('Posto Graduacao', '').strip()
-                            possui_medalha = linha.get('Possui Medalha de  Merito Desportivo Militar', 'Nao').strip() == 'Sim'
-                            modalidade = linha.get('Modalidade', '').strip()
-                            possui_bolsa = linha.get('Possui Bolsa Atleta', 'Nao').strip() == 'Sim'
-                            paar = linha.get('PAAR', 'Nao').strip() == 'Sim'
-                            
-                            if (estado == ""):
-                                estado = "N/A"
-                            
-                            if (cidade == ""):
-                                cidade = "N/A"
-
-                            if (possui_bolsa):
-                                possui_bolsa = "Sim"
-                            else:
-                                possui_bolsa = "Não"
+class ErroConexao(Exception):
+    """Falha do próprio sistema ao fornecer uma conexão (ex.: pool esgotado)."""
 
-                            if (possui_medalha):
-                                possui_medalha = "Sim"
-                            else:  
-                                possui_medalha = "Não"
 
-                            if (paar):
-                                paar = "Sim"
-                            else:
-                                paar = "Não"
+class ErroDicionario(Exception):
+    """Valor do esquema compacto que ficou sem código no dicionário."""
+
+
+# Erros de banco tratados pelas funções do sistema, de qualquer backend
+ErroBanco = (ErroMySQL, sqlite3.Error, ErroConexao, ErroDicionario)
+
+
+# Corpo das views do sistema; o mesmo SQL vale para MySQL e SQLite
+VIEWS = {
+    "vw_pessoa_localizacao": """
+        SELECT 
+            p.id AS pessoa_id,
+            p.sexo,
+            p.forca,
+            p.posto_graduacao,
+            l.estado,
+            l.cidade
+        FROM Pessoa p
+        JOIN Localizacao l ON l.pessoa_id = p.id
+    """,
+    "vw_pessoa_esporte": """
+        SELECT 
+            p.id AS pessoa_id,
+            p.sexo,
+            p.forca,
+            p.posto_graduacao,
+            e.modalidade,
+            e.possui_medalha,
+            e.possui_bolsa,
+            e.paar
+        FROM Pessoa p
+        JOIN Esporte e ON e.pessoa_id = p.id
+    """,
+    "vw_esporte": """
+        SELECT 
+            e.id AS esporte_id,
+            e.modalidade,
+            e.possui_medalha,
+            e.possui_bolsa,
+            e.paar
+        FROM Esporte e
+    """
+}
+
+
+# Índices secundários, alinhados aos joins (pessoa_id) e filtros das views:
+# força/posto, modalidade e PAAR, estado/cidade
+INDICES = {
+    "idx_pessoa_forca_posto": ("Pessoa", ("forca", "posto_graduacao")),
+    "idx_esporte_modalidade": ("Esporte", ("modalidade", "pessoa_id")),
+    "idx_esporte_paar_modalidade": ("Esporte", ("paar", "modalidade")),
+    "idx_localizacao_estado_cidade": ("Localizacao", ("estado", "cidade", "pessoa_id"))
+}
+
+# Colunas categóricas do esquema compacto e a tabela de dicionário de cada uma
+DIMENSOES = {
+    "forca": "Dim_forca",
+    "posto_graduacao": "Dim_posto_graduacao",
+    "modalidade": "Dim_modalidade",
+    "estado": "Dim_estado",
+    "cidade": "Dim_cidade"
+}
+
+# Views que apresentam o esquema compacto com as colunas textuais originais
+VIEWS_COMPATIBILIDADE = {
+    # Subconsultas escalares em vez de LEFT JOIN: a view continua sendo de uma tabela só
+    # e o otimizador consegue fundi-la na consulta externa (busca por id sem varredura)
+    "Pessoa": """
+        SELECT p.id, p.sexo,
+               (SELECT valor FROM Dim_forca WHERE id = p.forca_id) AS forca,
+               (SELECT valor FROM Dim_posto_graduacao WHERE id = p.posto_graduacao_id) AS posto_graduacao,
+               p.versao
+        FROM PessoaC p
+    """,
+    "Localizacao": """
+        SELECT l.id, l.pessoa_id,
+               (SELECT valor FROM Dim_estado WHERE id = l.estado_id) AS estado,
+               (SELECT valor FROM Dim_cidade WHERE id = l.cidade_id) AS cidade
+        FROM LocalizacaoC l
+    """,
+    "Esporte": """
+        SELECT e.id, e.pessoa_id,
+               (SELECT valor FROM Dim_modalidade WHERE id = e.modalidade_id) AS modalidade,
+               CASE WHEN e.possui_medalha THEN 'Sim' ELSE 'Não' END AS possui_medalha,
+               CASE WHEN e.possui_bolsa THEN 'Sim' ELSE 'Não' END AS possui_bolsa,
+               CASE WHEN e.paar THEN 'Sim' ELSE 'Não' END AS paar
+        FROM EsporteC e
+    """
+}
+
+# Equivalentes de INDICES sobre as tabelas do esquema compacto
+INDICES_COMPACTO = {
+    "idx_pessoac_forca_posto": ("PessoaC", ("forca_id", "posto_graduacao_id")),
+    "idx_esportec_modalidade": ("EsporteC", ("modalidade_id", "pessoa_id")),
+    "idx_esportec_paar_modalidade": ("EsporteC", ("paar", "modalidade_id")),
+    "idx_localizacaoc_estado_cidade": ("LocalizacaoC", ("estado_id", "cidade_id", "pessoa_id"))
+}
+
+# Consultas típicas do sistema, usadas pelo consultor de índices
+CONSULTAS_PADRAO = {
+    "elemento_por_id": """
+        SELECT p.sexo, p.forca, p.posto_graduacao, l.estado, l.cidade,
+               e.modalidade, e.possui_medalha, e.possui_bolsa, e.paar
+        FROM Pessoa p
+        LEFT JOIN Esporte e ON e.pessoa_id = p.id
+        LEFT JOIN Localizacao l ON l.pessoa_id = p.id
+        WHERE p.id = 1
+    """,
+    "por_modalidade": "SELECT * FROM vw_pessoa_esporte WHERE modalidade = 'Judo'",
+    "paar_por_modalidade": "SELECT * FROM vw_pessoa_esporte WHERE paar = 'Sim' AND modalidade = 'Vela'",
+    "por_forca_posto": "SELECT * FROM vw_pessoa_esporte WHERE forca = 'MB' AND posto_graduacao = 'Terceiro Sargento'",
+    "por_estado": "SELECT * FROM vw_pessoa_localizacao WHERE estado = 'SP'",
+    "por_estado_cidade": "SELECT * FROM vw_pessoa_localizacao WHERE estado = 'RJ' AND cidade = 'Rio de Janeiro'"
+}
+
+# No esquema compacto os filtros por valor são feitos pelo código do dicionário,
+# que é o que os índices de INDICES_COMPACTO cobrem
+CONSULTAS_COMPACTO = {
+    "elemento_por_id": CONSULTAS_PADRAO["elemento_por_id"],
+    "por_modalidade": """
+        SELECT p.id, p.sexo, e.possui_medalha, e.possui_bolsa, e.paar
+        FROM EsporteC e JOIN PessoaC p ON p.id = e.pessoa_id
+        WHERE e.modalidade_id = (SELECT id FROM Dim_modalidade WHERE valor = 'Judo')
+    """,
+    "paar_por_modalidade": """
+        SELECT p.id, p.sexo, e.possui_medalha, e.possui_bolsa
+        FROM EsporteC e JOIN PessoaC p ON p.id = e.pessoa_id
+        WHERE e.paar = TRUE AND e.modalidade_id = (SELECT id FROM Dim_modalidade WHERE valor = 'Vela')
+    """,
+    "por_forca_posto": """
+        SELECT p.id, p.sexo, e.modalidade_id
+        FROM PessoaC p JOIN EsporteC e ON e.pessoa_id = p.id
+        WHERE p.forca_id = (SELECT id FROM Dim_forca WHERE valor = 'MB')
+          AND p.posto_graduacao_id = (SELECT id FROM Dim_posto_graduacao WHERE valor = 'Terceiro Sargento')
+    """,
+    "por_estado": """
+        SELECT p.id, p.sexo, l.cidade_id
+        FROM LocalizacaoC l JOIN PessoaC p ON p.id = l.pessoa_id
+        WHERE l.estado_id = (SELECT id FROM Dim_estado WHERE valor = 'SP')
+    """,
+    "por_estado_cidade": """
+        SELECT p.id, p.sexo
+        FROM LocalizacaoC l JOIN PessoaC p ON p.id = l.pessoa_id
+        WHERE l.estado_id = (SELECT id FROM Dim_estado WHERE valor = 'RJ')
+          AND l.cidade_id = (SELECT id FROM Dim_cidade WHERE valor = 'Rio de Janeiro')
+    """
+}
+
+
+class BackendMySQL:
+    """Servidor MySQL/MariaDB configurado por DB_CONFIG."""
+
+    nome = "mysql"
+
+    def conectar(self, **opcoes):
+        if mysql is None:
+            raise ErroConexao("mysql-connector-python não está instalado; use DB_BACKEND=sqlite.")
+        return mysql.connector.connect(**DB_CONFIG, **opcoes)
+
+    def ativa(self, conn):
+        return conn.is_connected()
+
+    def ping(self, conn):
+        conn.ping(reconnect=False)
+
+    def ddl_tabelas(self, sufixo=""):
+        # Nas tabelas paralelas (sufixo) a chave estrangeira fica com o nome gerado pelo
+        # InnoDB (<tabela>_ibfk_N), que o RENAME TABLE acompanha; nomes fixos colidiriam
+        restricao = (lambda nome: "") if sufixo else (lambda nome: f"CONSTRAINT {nome} ")
+        return [
+            f"""
+            CREATE TABLE IF NOT EXISTS Pessoa{sufixo} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                sexo VARCHAR(10),
+                forca VARCHAR(5),
+                posto_graduacao VARCHAR(50),
+                versao INT NOT NULL DEFAULT 0
+            ) ENGINE=InnoDB
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS Localizacao{sufixo} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                pessoa_id INT NOT NULL,
+                estado VARCHAR(30),
+                cidade VARCHAR(50),
+                UNIQUE KEY uq_localizacao_pessoa (pessoa_id),
+                {restricao('fk_localizacao_pessoa')}FOREIGN KEY (pessoa_id)
+                    REFERENCES Pessoa{sufixo}(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS Esporte{sufixo} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                pessoa_id INT NOT NULL,
+                modalidade VARCHAR(50),
+                possui_medalha VARCHAR(5),
+                possui_bolsa VARCHAR(5),
+                paar VARCHAR(5),
+                UNIQUE KEY uq_esporte_pessoa (pessoa_id),
+                {restricao('fk_esporte_pessoa')}FOREIGN KEY (pessoa_id)
+                    REFERENCES Pessoa{sufixo}(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB
+            """
+        ]
+
+    def ddl_compacto(self, sufixo=""):
+        # As tabelas paralelas (sufixo) usam os mesmos dicionários. A colação binária faz de
+        # cada grafia ("Santos", "santos") um valor próprio, como no esquema textual
+        dimensoes = [] if sufixo else [f"""
+            CREATE TABLE IF NOT EXISTS {tabela} (
+                id SMALLINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+                valor VARCHAR(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+                UNIQUE KEY uq_{tabela.lower()}_valor (valor)
+            ) ENGINE=InnoDB
+            """ for tabela in DIMENSOES.values()]
+
+        return dimensoes + [
+            f"""
+            CREATE TABLE IF NOT EXISTS PessoaC{sufixo} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                sexo VARCHAR(10),
+                forca_id SMALLINT UNSIGNED,
+                posto_graduacao_id SMALLINT UNSIGNED,
+                versao INT NOT NULL DEFAULT 0,
+                FOREIGN KEY (forca_id) REFERENCES Dim_forca(id),
+                FOREIGN KEY (posto_graduacao_id) REFERENCES Dim_posto_graduacao(id)
+            ) ENGINE=InnoDB
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS LocalizacaoC{sufixo} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                pessoa_id INT NOT NULL,
+                estado_id SMALLINT UNSIGNED,
+                cidade_id SMALLINT UNSIGNED,
+                UNIQUE KEY uq_localizacaoc_pessoa (pessoa_id),
+                FOREIGN KEY (pessoa_id) REFERENCES PessoaC{sufixo}(id) ON DELETE CASCADE,
+                FOREIGN KEY (estado_id) REFERENCES Dim_estado(id),
+                FOREIGN KEY (cidade_id) REFERENCES Dim_cidade(id)
+            ) ENGINE=InnoDB
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS EsporteC{sufixo} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                pessoa_id INT NOT NULL,
+                modalidade_id SMALLINT UNSIGNED,
+                possui_medalha BOOLEAN NOT NULL DEFAULT FALSE,
+                possui_bolsa BOOLEAN NOT NULL DEFAULT FALSE,
+                paar BOOLEAN NOT NULL DEFAULT FALSE,
+                UNIQUE KEY uq_esportec_pessoa (pessoa_id),
+                FOREIGN KEY (pessoa_id) REFERENCES PessoaC{sufixo}(id) ON DELETE CASCADE,
+                FOREIGN KEY (modalidade_id) REFERENCES Dim_modalidade(id)
+            ) ENGINE=InnoDB
+            """
+        ]
+
+    def ddl_view(self, nome, consulta):
+        return f"CREATE OR REPLACE VIEW {nome} AS {consulta}"
+
+    def tipo_objeto(self, cursor, nome):
+        """'table', 'view' ou None, conforme o que existe no banco com esse nome."""
+        cursor.execute("""
+            SELECT TABLE_TYPE FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (nome,))
+        linha = cursor.fetchone()
+        if linha is None:
+            return None
+        return "view" if linha[0] == "VIEW" else "table"
+
+    def inserir_ignorando(self, tabela, colunas):
+        return f"INSERT IGNORE INTO {tabela} ({', '.join(colunas)})"
+
+    def migrar(self, cursor):
+        # Bancos criados com o esquema antigo são convertidos no lugar
+        _migrar_para_chave_estrangeira(cursor)
+
+    def migrar_compacto(self, cursor):
+        # Dicionários criados com a colação padrão (sem distinção de caixa e acento)
+        # juntavam grafias diferentes em um só valor
+        for tabela in DIMENSOES.values():
+            cursor.execute("""
+                SELECT COLLATION_NAME FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'valor'
+            """, (tabela,))
+            linha = cursor.fetchone()
+            if linha and linha[0] != "utf8mb4_bin":
+                cursor.execute(f"""
+                    ALTER TABLE {tabela}
+                    MODIFY valor VARCHAR(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL
+                """)
+
+    def valor_binario(self, expressao):
+        """expressao comparada byte a byte (as colunas textuais usam a colação padrão)."""
+        return f"CAST({expressao} AS BINARY)"
+
+    def adicionar_coluna(self, cursor, tabela, coluna, definicao):
+        cursor.execute("""
+            SELECT 1 FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (tabela, coluna))
+        if cursor.fetchone() is None:
+            cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+
+    def listar_tabelas(self, cursor):
+        # Apenas tabelas: no esquema compacto Pessoa, Localizacao e Esporte são views
+        cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE';")
+        return [t[0] for t in cursor.fetchall()]
+
+    def checar_chaves_estrangeiras(self, cursor, ativas):
+        cursor.execute(f"SET FOREIGN_KEY_CHECKS = {1 if ativas else 0};")
+
+    def esvaziar_tabela(self, cursor, tabela):
+        cursor.execute(f"TRUNCATE TABLE {tabela};")
+
+    # O TRUNCATE é DDL e se confirma sozinho; não precisa de commit depois
+    esvaziar_confirma = True
+
+    def estimar_linhas(self, cursor):
+        """Quantidade aproximada de linhas por tabela, das estatísticas do InnoDB (sem varrer as tabelas)."""
+        cursor.execute("""
+            SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+        """)
+        return dict(cursor.fetchall())
+
+    def trocar_tabelas(self, cursor, trocas, indices, views):
+        """
+        Para cada (atual, nova, antiga) de trocas, atual passa a se chamar antiga e nova
+        assume o nome atual. Um único RENAME TABLE faz todas as trocas de forma atômica:
+        as consultas veem só as tabelas antigas ou só as novas. As chaves estrangeiras
+        acompanham a tabela renomeada e as views resolvem os nomes a cada consulta,
+        então views não precisa ser recriado.
+
+        Os gatilhos também acompanhariam a tabela renomeada e seriam descartados com a
+        antiga (ex.: trg_validate_modalidade do Paar.sql). Como o nome de um gatilho é
+        único no banco, cada um sai da atual e é recriado na nova logo antes do RENAME;
+        o que for gravado na atual nesse intervalo fica na antiga de qualquer forma.
+        """
+        # Nomes de índice são por tabela: os índices são criados nas novas antes da troca
+        novas = {atual: nova for atual, nova, _ in trocas}
+        for nome, (tabela, colunas) in indices.items():
+            self.criar_indice(cursor, nome, novas.get(tabela, tabela), colunas)
+
+        for atual, nova, _ in trocas:
+            cursor.execute("""
+                SELECT TRIGGER_NAME, ACTION_TIMING, EVENT_MANIPULATION, ACTION_STATEMENT
+                FROM information_schema.TRIGGERS
+                WHERE TRIGGER_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE = %s
+                ORDER BY ACTION_ORDER
+            """, (atual,))
+            for nome, momento, evento, corpo in cursor.fetchall():
+                cursor.execute(f"DROP TRIGGER {nome}")
+                cursor.execute(f"CREATE TRIGGER {nome} {momento} {evento} ON {nova} FOR EACH ROW {corpo}")
+
+        pares = [f"{atual} TO {antiga}" for atual, _, antiga in trocas] + \
+                [f"{nova} TO {atual}" for atual, nova, _ in trocas]
+        cursor.execute(f"RENAME TABLE {', '.join(pares)}")
+
+    def reservar_ids(self, cursor, tabela, n):
+        """
+        Reserva n ids avançando o AUTO_INCREMENT de tabela, sem reaproveitar ids excluídos
+        e sem prender a tabela até o commit. O LOCK TABLES e o ALTER TABLE confirmam a
+        transação em andamento: use antes de começar a gravar (como carregar_csv_load_data).
+        """
+        cursor.execute(f"LOCK TABLES {tabela} WRITE")
+        try:
+            # No 8.0 o information_schema guarda o AUTO_INCREMENT em cache; com 0 ele lê o contador
+            try:
+                cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+            except ErroMySQL:
+                pass  # Versões sem o cache (5.7)
+            cursor.execute("""
+                SELECT AUTO_INCREMENT FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            """, (tabela,))
+            primeiro = cursor.fetchone()[0] or 1
+            cursor.execute(f"ALTER TABLE {tabela} AUTO_INCREMENT = {primeiro + n}")
+        finally:
+            cursor.execute("UNLOCK TABLES")
+        return range(primeiro, primeiro + n)
+
+    def inserir_numerando(self, cursor, tabela, colunas, linhas):
+        """
+        Insere as linhas deixando o id com o AUTO_INCREMENT e devolve os ids gerados. O
+        executemany vira um único INSERT de várias linhas, que o InnoDB numera em sequência
+        (de auto_increment_increment em auto_increment_increment) e sem prender o
+        contador até o commit, então cargas concorrentes não esperam umas pelas outras.
+        """
+        self.inserir_em_massa(cursor, tabela, colunas, linhas)
+        cursor.execute("SELECT LAST_INSERT_ID(), @@auto_increment_increment")
+        primeiro, passo = cursor.fetchone()
+        return range(primeiro, primeiro + passo * len(linhas), passo)
+
+    def inserir_em_massa(self, cursor, tabela, colunas, linhas):
+        # O conector reescreve o executemany de um INSERT em um único INSERT de várias linhas
+        marcadores = ", ".join(["%s"] * len(colunas))
+        cursor.executemany(f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({marcadores})", linhas)
+
+    def cursor_streaming(self, conn):
+        return conn.cursor(buffered=False)
+
+    def criar_indice(self, cursor, nome, tabela, colunas):
+        # O MySQL não tem CREATE INDEX IF NOT EXISTS
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """, (tabela, nome))
+        if not cursor.fetchone()[0]:
+            cursor.execute(f"CREATE INDEX {nome} ON {tabela} ({', '.join(colunas)})")
+
+    def explicar(self, cursor, consulta):
+        """Plano de execução como lista de (tabela, índice usado, é varredura completa)."""
+        cursor.execute(f"EXPLAIN {consulta}")
+        nomes = [d[0].lower() for d in cursor.description]
+        plano = []
+        for linha in cursor.fetchall():
+            valores = dict(zip(nomes, linha))
+            plano.append((valores.get("table"), valores.get("key"), valores.get("type") in ("ALL", "index")))
+        return plano
+
+    def indices_sem_uso(self, cursor):
+        # Estatísticas de uso do performance_schema, quando disponíveis
+        try:
+            cursor.execute("""
+                SELECT object_name, index_name FROM sys.schema_unused_indexes
+                WHERE object_schema = DATABASE()
+            """)
+            return [f"{tabela}.{indice}" for tabela, indice in cursor.fetchall()]
+        except ErroBanco:
+            return None
+
+    def ddl_resumo(self, tabela, grupo, contadores):
+        colunas = [f"{c} VARCHAR(50) NOT NULL" for c in grupo] + [f"{c} INT NOT NULL DEFAULT 0" for c in contadores]
+        return f"""
+            CREATE TABLE IF NOT EXISTS {tabela} (
+                {", ".join(colunas)},
+                PRIMARY KEY ({", ".join(grupo)})
+            ) ENGINE=InnoDB
+        """
+
+    def somar_contadores(self, cursor, tabela, grupo, contadores, linhas):
+        colunas = grupo + contadores
+        marcadores = ", ".join(["%s"] * len(colunas))
+        somas = ", ".join(f"{c} = {c} + VALUES({c})" for c in contadores)
+        cursor.executemany(f"""
+            INSERT INTO {tabela} ({", ".join(colunas)}) VALUES ({marcadores})
+            ON DUPLICATE KEY UPDATE {somas}
+        """, linhas)
+
+    def substituir(self, cursor, tabela, chave, colunas, linhas):
+        marcadores = ", ".join(["%s"] * len(colunas))
+        valores = ", ".join(f"{c} = VALUES({c})" for c in colunas if c not in chave)
+        cursor.executemany(f"""
+            INSERT INTO {tabela} ({", ".join(colunas)}) VALUES ({marcadores})
+            ON DUPLICATE KEY UPDATE {valores}
+        """, linhas)
+
+    def ddl_referencia(self, tabela):
+        return f"CREATE TABLE IF NOT EXISTS {tabela} (valor VARCHAR(50) PRIMARY KEY) ENGINE=InnoDB"
+
+    def tabela_temporaria(self, cursor, nome, tabela, colunas):
+        # Mesmos tipos das colunas de origem, sem nenhuma linha
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {nome}")
+        cursor.execute(f"CREATE TEMPORARY TABLE {nome} AS SELECT {', '.join(colunas)} FROM {tabela} WHERE 1 = 0")
+
+    def descartar_temporaria(self, cursor, nome):
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {nome}")
+
+    def atualizar_de(self, cursor, tabela, temporaria, chave, colunas, condicao=""):
+        atribuicoes = ", ".join(f"t.{c} = s.{c}" for c in colunas)
+        cursor.execute(f"""
+            UPDATE {tabela} t JOIN {temporaria} s ON t.{chave} = s.{chave}
+            SET {atribuicoes}
+            {f"WHERE {condicao}" if condicao else ""}
+        """)
+        return cursor.rowcount
+
+    def ddl_carga(self, tabela_pessoa, sufixo=""):
+        return [
+            f"""
+            CREATE TABLE IF NOT EXISTS Carga_impressao{sufixo} (
+                arquivo VARCHAR(255) NOT NULL,
+                impressao BINARY(20) NOT NULL,
+                pessoa_id INT NOT NULL,
+                ausente BOOLEAN NOT NULL DEFAULT FALSE,
+                PRIMARY KEY (arquivo, impressao),
+                UNIQUE KEY uq_carga_impressao_pessoa (pessoa_id),
+                FOREIGN KEY (pessoa_id) REFERENCES {tabela_pessoa}{sufixo}(id) ON DELETE CASCADE
+            ) ENGINE=InnoDB
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS Carga_arquivo{sufixo} (
+                arquivo VARCHAR(255) PRIMARY KEY,
+                checksum CHAR(64) NOT NULL,
+                registros INT NOT NULL,
+                carregado_em DATETIME NOT NULL
+            ) ENGINE=InnoDB
+            """
+        ]
+
+
+class _CursorSQLite:
+    """
+    Cursor do sqlite3 com a interface usada pelo sistema: aceita os marcadores %s
+    do MySQL e pode ser usado em bloco with.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql, parametros=()):
+        return self._cursor.execute(sql.replace("%s", "?"), parametros)
+
+    def executemany(self, sql, parametros):
+        return self._cursor.executemany(sql.replace("%s", "?"), parametros)
+
+
+class _ConexaoSQLite:
+    """Conexão sqlite3 com os métodos de conexão do mysql.connector usados pelo sistema."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def cursor(self, **opcoes):
+        return _CursorSQLite(self._conn.cursor())
+
+
+class BackendSQLite:
+    """
+    Arquivo SQLite local (SQLITE_CONFIG), para análises e testes sem servidor. Usa
+    WAL, que permite leituras concorrentes com uma escrita, e pragmas ajustados para
+    carga em massa e leitura.
+    """
+
+    nome = "sqlite"
+
+    def __init__(self, caminho, cache_kb, mmap_bytes):
+        self.caminho = caminho
+        self.cache_kb = cache_kb
+        self.mmap_bytes = mmap_bytes
+
+    def conectar(self, **opcoes):
+        conn = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA cache_size = -{self.cache_kb}")
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_bytes}")
+        return _ConexaoSQLite(conn)
+
+    def ativa(self, conn):
+        return True
+
+    def ping(self, conn):
+        conn.execute("SELECT 1")
+
+    def ddl_tabelas(self, sufixo=""):
+        return [
+            f"""
+            CREATE TABLE IF NOT EXISTS Pessoa{sufixo} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sexo TEXT,
+                forca TEXT,
+                posto_graduacao TEXT,
+                versao INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS Localizacao{sufixo} (
+                id INTEGER PRIMARY KEY,
+                pessoa_id INTEGER NOT NULL UNIQUE REFERENCES Pessoa{sufixo}(id) ON DELETE CASCADE,
+                estado TEXT,
+                cidade TEXT
+            )
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS Esporte{sufixo} (
+                id INTEGER PRIMARY KEY,
+                pessoa_id INTEGER NOT NULL UNIQUE REFERENCES Pessoa{sufixo}(id) ON DELETE CASCADE,
+                modalidade TEXT,
+                possui_medalha TEXT,
+                possui_bolsa TEXT,
+                paar TEXT
+            )
+            """
+        ]
+
+    def ddl_compacto(self, sufixo=""):
+        # As tabelas paralelas (sufixo) usam os mesmos dicionários
+        dimensoes = [] if sufixo else [f"""
+            CREATE TABLE IF NOT EXISTS {tabela} (
+                id INTEGER PRIMARY KEY,
+                valor TEXT NOT NULL UNIQUE
+            )
+            """ for tabela in DIMENSOES.values()]
+
+        return dimensoes + [
+            f"""
+            CREATE TABLE IF NOT EXISTS PessoaC{sufixo} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sexo TEXT,
+                forca_id INTEGER REFERENCES Dim_forca(id),
+                posto_graduacao_id INTEGER REFERENCES Dim_posto_graduacao(id),
+                versao INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS LocalizacaoC{sufixo} (
+                id INTEGER PRIMARY KEY,
+                pessoa_id INTEGER NOT NULL UNIQUE REFERENCES PessoaC{sufixo}(id) ON DELETE CASCADE,
+                estado_id INTEGER REFERENCES Dim_estado(id),
+                cidade_id INTEGER REFERENCES Dim_cidade(id)
+            )
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS EsporteC{sufixo} (
+                id INTEGER PRIMARY KEY,
+                pessoa_id INTEGER NOT NULL UNIQUE REFERENCES PessoaC{sufixo}(id) ON DELETE CASCADE,
+                modalidade_id INTEGER REFERENCES Dim_modalidade(id),
+                possui_medalha INTEGER NOT NULL DEFAULT 0,
+                possui_bolsa INTEGER NOT NULL DEFAULT 0,
+                paar INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        ]
+
+    def ddl_view(self, nome, consulta):
+        return f"CREATE VIEW IF NOT EXISTS {nome} AS {consulta}"
+
+    def tipo_objeto(self, cursor, nome):
+        """'table', 'view' ou None, conforme o que existe no banco com esse nome."""
+        cursor.execute("SELECT type FROM sqlite_master WHERE name = %s", (nome,))
+        linha = cursor.fetchone()
+        return linha[0] if linha else None
+
+    def inserir_ignorando(self, tabela, colunas):
+        return f"INSERT OR IGNORE INTO {tabela} ({', '.join(colunas)})"
+
+    def migrar(self, cursor):
+        # O backend SQLite sempre foi criado com pessoa_id; falta só o AUTOINCREMENT de Pessoa
+        self._migrar_autoincremento(cursor, "Pessoa", self.ddl_tabelas)
+
+    def migrar_compacto(self, cursor):
+        # O TEXT do SQLite já compara byte a byte; falta só o AUTOINCREMENT de PessoaC
+        self._migrar_autoincremento(cursor, "PessoaC", self.ddl_compacto)
+
+    def _migrar_autoincremento(self, cursor, tabela, ddl):
+        """
+        Reconstrói a tabela de Pessoa criada sem AUTOINCREMENT, que reaproveitava o id do
+        último registro excluído. Segue o roteiro do SQLite para alterar uma tabela (cópia
+        com o esquema novo, DROP e RENAME) com as chaves estrangeiras desligadas, para o
+        DROP não apagar as linhas dependentes, e legacy_alter_table, para o RENAME não
+        conferir as views que citam a tabela. ddl(sufixo)[0] cria a cópia.
+        """
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", (tabela,))
+        linha = cursor.fetchone()
+        if linha is None or "AUTOINCREMENT" in linha[0].upper():
+            return
+
+        copia = f"{tabela}_autoincremento"
+        cursor.execute(f"PRAGMA table_info({tabela})")
+        colunas = ", ".join(c[1] for c in cursor.fetchall())
+
+        self.checar_chaves_estrangeiras(cursor, False)
+        cursor.execute("PRAGMA legacy_alter_table = ON")
+        try:
+            cursor.execute(f"DROP TABLE IF EXISTS {copia}")
+            cursor.execute(ddl("_autoincremento")[0])
+            # Os ids copiados iniciam a sequência no maior id atual
+            cursor.execute(f"INSERT INTO {copia} ({colunas}) SELECT {colunas} FROM {tabela}")
+            cursor.execute(f"DROP TABLE {tabela}")
+            cursor.execute(f"ALTER TABLE {copia} RENAME TO {tabela}")
+            cursor.connection.commit()
+        except BaseException:
+            # O PRAGMA foreign_keys só volta a valer fora de transação
+            cursor.connection.rollback()
+            raise
+        finally:
+            cursor.execute("PRAGMA legacy_alter_table = OFF")
+            self.checar_chaves_estrangeiras(cursor, True)
+
+    def valor_binario(self, expressao):
+        return expressao
+
+    def adicionar_coluna(self, cursor, tabela, coluna, definicao):
+        cursor.execute(f"PRAGMA table_info({tabela})")
+        if coluna not in [c[1] for c in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}")
+
+    def listar_tabelas(self, cursor):
+        # Apenas tabelas: no esquema compacto Pessoa, Localizacao e Esporte são views
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%'
+            ORDER BY name
+        """)
+        return [t[0] for t in cursor.fetchall()]
+
+    def checar_chaves_estrangeiras(self, cursor, ativas):
+        # Só tem efeito fora de transação, como no TRUNCATE do MySQL
+        cursor.execute(f"PRAGMA foreign_keys = {'ON' if ativas else 'OFF'}")
+
+    def esvaziar_tabela(self, cursor, tabela):
+        cursor.execute(f"DELETE FROM {tabela}")
+
+    # O DELETE só vale depois do commit
+    esvaziar_confirma = False
+
+    def estimar_linhas(self, cursor):
+        """
+        Quantidade aproximada de linhas por tabela, lida de sqlite_stat1 (primeiro número
+        de cada estatística). Só existe depois de um ANALYZE; sem ela, nenhuma estimativa.
+        """
+        if self.tipo_objeto(cursor, "sqlite_stat1") != "table":
+            return {}
+        cursor.execute("SELECT tbl, stat FROM sqlite_stat1")
+        estimativas = {}
+        for tabela, estatistica in cursor.fetchall():
+            estimativas[tabela] = max(estimativas.get(tabela, 0), int(estatistica.split()[0]))
+        return estimativas
+
+    def trocar_tabelas(self, cursor, trocas, indices, views):
+        """
+        Para cada (atual, nova, antiga) de trocas, atual passa a se chamar antiga e nova
+        assume o nome atual, tudo em uma transação (o DDL do SQLite é transacional): em
+        WAL, as leituras em andamento continuam vendo as tabelas antigas até o commit,
+        que fica com o chamador.
+
+        O RENAME do SQLite reescreve as views que citam a tabela (elas seguiriam a antiga)
+        e os nomes de índice são globais, então as views são removidas e recriadas, e os
+        índices passam das tabelas antigas para as novas dentro da mesma transação.
+        """
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        for nome in reversed(list(views)):
+            cursor.execute(f"DROP VIEW IF EXISTS {nome}")
+        for atual, _, antiga in trocas:
+            cursor.execute(f"ALTER TABLE {atual} RENAME TO {antiga}")
+        for nome in indices:
+            cursor.execute(f"DROP INDEX IF EXISTS {nome}")
+        for atual, nova, _ in trocas:
+            cursor.execute(f"ALTER TABLE {nova} RENAME TO {atual}")
+        for nome, (tabela, colunas) in indices.items():
+            self.criar_indice(cursor, nome, tabela, colunas)
+        for nome, consulta in views.items():
+            cursor.execute(self.ddl_view(nome, consulta))
+
+    def reservar_ids(self, cursor, tabela, n):
+        """
+        Faixa de n ids a partir da sequência do AUTOINCREMENT (sqlite_sequence), como o
+        AUTO_INCREMENT do MySQL: o id de um registro excluído não volta a ser usado. Os
+        ids gravados acima da sequência a avançam no INSERT.
+        """
+        # BEGIN IMMEDIATE reserva a escrita do arquivo até o commit: ninguém mais usa a faixa
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        linha = None
+        if self.tipo_objeto(cursor, "sqlite_sequence"):  # Banco antigo, ainda sem AUTOINCREMENT
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", (tabela,))
+            linha = cursor.fetchone()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}")
+        primeiro = max(linha[0] if linha else 0, cursor.fetchone()[0]) + 1
+        return range(primeiro, primeiro + n)
+
+    def inserir_numerando(self, cursor, tabela, colunas, linhas):
+        # O SQLite tem um único escritor: a faixa reservada vale até o commit
+        ids = self.reservar_ids(cursor, tabela, len(linhas))
+        self.inserir_em_massa(cursor, tabela, ("id",) + tuple(colunas), [(i,) + tuple(l) for i, l in zip(ids, linhas)])
+        return ids
+
+    def inserir_em_massa(self, cursor, tabela, colunas, linhas):
+        marcadores = ", ".join(["?"] * len(colunas))
+        cursor.executemany(f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({marcadores})", linhas)
+
+    def cursor_streaming(self, conn):
+        # O cursor do sqlite3 já lê as linhas sob demanda
+        return conn.cursor()
+
+    def criar_indice(self, cursor, nome, tabela, colunas):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} ({', '.join(colunas)})")
+
+    def explicar(self, cursor, consulta):
+        """Plano de execução como lista de (tabela, índice usado, é varredura completa)."""
+        cursor.execute(f"EXPLAIN QUERY PLAN {consulta}")
+        plano = []
+        for linha in cursor.fetchall():
+            detalhe = linha[-1]
+            partes = detalhe.split()
+            if partes[0] not in ("SCAN", "SEARCH"):
+                continue
+            indice = re.search(r'USING (?:COVERING )?INDEX (\w+)', detalhe)
+            if indice:
+                indice = indice.group(1)
+            elif "INTEGER PRIMARY KEY" in detalhe:
+                indice = "PRIMARY"
+            plano.append((partes[1], indice, partes[0] == "SCAN"))
+        return plano
+
+    def indices_sem_uso(self, cursor):
+        return None  # O SQLite não registra estatísticas de uso de índices
+
+    def ddl_resumo(self, tabela, grupo, contadores):
+        colunas = [f"{c} TEXT NOT NULL" for c in grupo] + [f"{c} INTEGER NOT NULL DEFAULT 0" for c in contadores]
+        return f"""
+            CREATE TABLE IF NOT EXISTS {tabela} (
+                {", ".join(colunas)},
+                PRIMARY KEY ({", ".join(grupo)})
+            )
+        """
+
+    def somar_contadores(self, cursor, tabela, grupo, contadores, linhas):
+        colunas = grupo + contadores
+        marcadores = ", ".join(["?"] * len(colunas))
+        somas = ", ".join(f"{c} = {c} + excluded.{c}" for c in contadores)
+        cursor.executemany(f"""
+            INSERT INTO {tabela} ({", ".join(colunas)}) VALUES ({marcadores})
+            ON CONFLICT ({", ".join(grupo)}) DO UPDATE SET {somas}
+        """, linhas)
+
+    def substituir(self, cursor, tabela, chave, colunas, linhas):
+        marcadores = ", ".join(["?"] * len(colunas))
+        valores = ", ".join(f"{c} = excluded.{c}" for c in colunas if c not in chave)
+        cursor.executemany(f"""
+            INSERT INTO {tabela} ({", ".join(colunas)}) VALUES ({marcadores})
+            ON CONFLICT ({", ".join(chave)}) DO UPDATE SET {valores}
+        """, linhas)
+
+    def ddl_referencia(self, tabela):
+        return f"CREATE TABLE IF NOT EXISTS {tabela} (valor TEXT PRIMARY KEY) WITHOUT ROWID"
+
+    def tabela_temporaria(self, cursor, nome, tabela, colunas):
+        # Mesmos tipos das colunas de origem, sem nenhuma linha
+        cursor.execute(f"DROP TABLE IF EXISTS temp.{nome}")
+        cursor.execute(f"CREATE TEMP TABLE {nome} AS SELECT {', '.join(colunas)} FROM {tabela} WHERE 1 = 0")
+
+    def descartar_temporaria(self, cursor, nome):
+        cursor.execute(f"DROP TABLE IF EXISTS temp.{nome}")
+
+    def atualizar_de(self, cursor, tabela, temporaria, chave, colunas, condicao=""):
+        # UPDATE ... FROM existe a partir do SQLite 3.33
+        atribuicoes = ", ".join(f"{c} = s.{c}" for c in colunas)
+        cursor.execute(f"""
+            UPDATE {tabela} AS t
+            SET {atribuicoes}
+            FROM {temporaria} AS s
+            WHERE t.{chave} = s.{chave} {f"AND {condicao}" if condicao else ""}
+        """)
+        return cursor.rowcount
+
+    def ddl_carga(self, tabela_pessoa, sufixo=""):
+        return [
+            f"""
+            CREATE TABLE IF NOT EXISTS Carga_impressao{sufixo} (
+                arquivo TEXT NOT NULL,
+                impressao BLOB NOT NULL,
+                pessoa_id INTEGER NOT NULL UNIQUE REFERENCES {tabela_pessoa}{sufixo}(id) ON DELETE CASCADE,
+                ausente INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (arquivo, impressao)
+            ) WITHOUT ROWID
+            """,
+            f"""
+            CREATE TABLE IF NOT EXISTS Carga_arquivo{sufixo} (
+                arquivo TEXT PRIMARY KEY,
+                checksum TEXT NOT NULL,
+                registros INTEGER NOT NULL,
+                carregado_em TEXT NOT NULL
+            )
+            """
+        ]
+
+
+def criar_backend(nome):
+    if nome == "mysql":
+        return BackendMySQL()
+    if nome == "sqlite":
+        return BackendSQLite(**SQLITE_CONFIG)
+    raise ValueError(f"Backend desconhecido: {nome!r} (use 'mysql' ou 'sqlite').")
+
+
+class PoolConexoes:
+    """
+    Mantém conexões abertas com o banco para que cada operação reutilize uma
+    conexão já autenticada em vez de pagar um novo connect. Conexões ociosas há
+    mais de tempo_ocioso segundos são descartadas, e as ociosas há mais de
+    intervalo_ping segundos são verificadas com ping antes de serem entregues.
+    """
+
+    def __init__(self, backend, tamanho, tempo_ocioso, intervalo_ping, tempo_espera):
+        self.backend = backend
+        self.tamanho = tamanho
+        self.tempo_ocioso = tempo_ocioso
+        self.intervalo_ping = intervalo_ping
+        self.tempo_espera = tempo_espera
+        self._livres = collections.deque()  # pares (conexão, instante do último uso)
+        self._vagas = threading.BoundedSemaphore(tamanho)
+        self._trava = threading.Lock()
+
+    def obter(self):
+        if not self._vagas.acquire(timeout=self.tempo_espera):
+            raise ErroConexao(f"Nenhuma conexão livre no pool após {self.tempo_espera}s.")
+
+        try:
+            while True:
+                with self._trava:
+                    item = self._livres.pop() if self._livres else None
+
+                if item is None:
+                    with metricas.cronometrar("conexao.abrir"):
+                        return self.backend.conectar()
+
+                conn, ultimo_uso = item
+                ocioso = time.monotonic() - ultimo_uso
+
+                if ocioso > self.tempo_ocioso:
+                    self._fechar(conn)
+                    continue
+
+                if ocioso > self.intervalo_ping:
+                    try:
+                        self.backend.ping(conn)
+                    except ErroBanco:
+                        self._fechar(conn)
+                        continue
+
+                return conn
+        except BaseException:
+            self._vagas.release()
+            raise
+
+    def devolver(self, conn, falhou=False):
+        """
+        Devolve conn ao pool. A conexão de um bloco que falhou é fechada: o estado da
+        sessão (ex.: FOREIGN_KEY_CHECKS desligado) pode ter ficado pela metade.
+        """
+        try:
+            # Descarta qualquer transação não confirmada, como fazia o close()
+            if not falhou and self.backend.ativa(conn):
+                if conn.in_transaction:
+                    conn.rollback()
+                with self._trava:
+                    self._livres.append((conn, time.monotonic()))
+            else:
+                self._fechar(conn)
+        except ErroBanco:
+            self._fechar(conn)
+        finally:
+            self._vagas.release()
+
+    def fechar_todas(self):
+        with self._trava:
+            livres, self._livres = list(self._livres), collections.deque()
+
+        for conn, _ in livres:
+            self._fechar(conn)
+
+    @staticmethod
+    def _fechar(conn):
+        try:
+            conn.close()
+        except ErroBanco:
+            pass
+
+
+_backend = None
+_pool = None
+_trava_pool = threading.Lock()
+
+
+def obter_backend():
+    global _backend
+
+    with _trava_pool:
+        if _backend is None:
+            _backend = criar_backend(DB_BACKEND)
+        return _backend
+
+
+def definir_backend(nome, caminho_sqlite=None):
+    """Troca o backend em uso (ex.: benchmark ou testes), fechando o pool atual."""
+    global _backend, _pool, DB_BACKEND
+
+    if caminho_sqlite:
+        SQLITE_CONFIG["caminho"] = caminho_sqlite
+
+    with _trava_pool:
+        if _pool is not None:
+            _pool.fechar_todas()
+        DB_BACKEND = nome
+        _backend = criar_backend(nome)
+        _pool = None
+
+    _dicionarios.limpar()
+    _cache_consultas.invalidar()
+
+
+def obter_pool():
+    global _pool
+
+    backend = obter_backend()
+    with _trava_pool:
+        if _pool is None:
+            _pool = PoolConexoes(backend, **POOL_CONFIG)
+            atexit.register(_pool.fechar_todas)
+        return _pool
+
+
+# Função para conectar ao banco de dados (empresta uma conexão do pool)
+@contextlib.contextmanager
+def conectar():
+    print()
+    try:
+        pool = obter_pool()
+        with metricas.cronometrar("conexao.obter"):
+            conn = pool.obter()
+    except ErroBanco as err:
+        logging.error(f"Erro ao conectar ao banco de dados: {err}")
+        raise
+
+    falhou = False
+    try:
+        # O pool recebe de volta a conexão original, não o invólucro de medição
+        yield metricas.medir_conexao(conn)
+    except BaseException:
+        falhou = True
+        raise
+    finally:
+        # Transação deixada aberta é desfeita pelo pool e os códigos de dicionário gravados nela deixam de valer
+        if falhou or conn.in_transaction:
+            _dicionarios.limpar()
+        pool.devolver(conn, falhou)
+
+
+# Desfaz a transação de conn; os códigos de dicionário gravados nela deixam de valer
+def _desfazer(conn):
+    conn.rollback()
+    _dicionarios.limpar()
+
+
+# Retorna os nomes das tabelas do banco, ignorando as views (vw_*)
+def _nomes_tabelas(cursor):
+    return [t for t in obter_backend().listar_tabelas(cursor) if not t.startswith('vw')]
+
+
+# Criação de tabelas no banco
+def criar_tabelas():
+    backend = obter_backend()
+
+    try:
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                tipo_pessoa = backend.tipo_objeto(cursor, "Pessoa")
+
+                # No esquema compacto as tabelas textuais só existem para serem convertidas
+                if not SCHEMA_COMPACTO or tipo_pessoa == "table":
+                    for query in backend.ddl_tabelas():
+                        cursor.execute(query)
+
+                    backend.migrar(cursor)
+                    backend.adicionar_coluna(cursor, "Pessoa", "versao", "INT NOT NULL DEFAULT 0")
+
+                if SCHEMA_COMPACTO:
+                    for query in backend.ddl_compacto():
+                        cursor.execute(query)
+                    backend.migrar_compacto(cursor)
+                    backend.adicionar_coluna(cursor, "PessoaC", "versao", "INT NOT NULL DEFAULT 0")
+
+                    if tipo_pessoa == "table":
+                        _converter_para_compacto(cursor)
+
+                    for nome, consulta in VIEWS_COMPATIBILIDADE.items():
+                        cursor.execute(backend.ddl_view(nome, consulta))
+
+                for nome, (tabela, colunas) in _indices_ativos().items():
+                    backend.criar_indice(cursor, nome, tabela, colunas)
+
+                for nome, consulta in VIEWS.items():
+                    cursor.execute(backend.ddl_view(nome, consulta))
+
+                for tabela, resumo in RESUMOS.items():
+                    cursor.execute(backend.ddl_resumo(tabela, resumo["grupo"], resumo["contadores"]))
+
+                # Valores válidos lidos pelo gatilho do Paar.sql, regravados a partir de referencia.py
+                for tabela, valores in referencia.TABELAS_REFERENCIA.items():
+                    cursor.execute(backend.ddl_referencia(tabela))
+                    cursor.execute(f"DELETE FROM {tabela}")
+                    backend.inserir_em_massa(cursor, tabela, ("valor",), [(v,) for v in valores])
+
+                # Impressões das linhas e manifesto dos arquivos da sincronização incremental
+                for query in backend.ddl_carga(_tabela_pessoa()):
+                    cursor.execute(query)
+
+                if backend.tipo_objeto(cursor, "Carga_impressao_conversao") == "table":
+                    cursor.execute("""
+                        INSERT INTO Carga_impressao (arquivo, impressao, pessoa_id, ausente)
+                        SELECT arquivo, impressao, pessoa_id, ausente FROM Carga_impressao_conversao
+                    """)
+                    cursor.execute("DROP TABLE Carga_impressao_conversao")
+
+                # Garante que os resumos reflitam os dados que já estavam no banco
+                _recalcular_resumos(cursor)
+            conn.commit()
+            _cache_consultas.invalidar()
+            logging.info("Tabelas criadas com sucesso.")
+            print("Tabelas criadas com sucesso.")
+    except ErroBanco as err:
+        logging.error(f"Erro ao criar tabelas: {err}")
+        print(f"Erro ao criar tabelas: {err}")
+
+
+def _indices_ativos():
+    return INDICES_COMPACTO if SCHEMA_COMPACTO else INDICES
+
+
+def _consultas_ativas():
+    return CONSULTAS_COMPACTO if SCHEMA_COMPACTO else CONSULTAS_PADRAO
+
+
+def _converter_para_compacto(cursor):
+    """
+    Copia os dados das tabelas textuais Pessoa, Localizacao e Esporte para o esquema
+    compacto, preservando os ids, e remove as tabelas antigas para que as views de
+    compatibilidade ocupem seus nomes.
+    """
+    backend = obter_backend()
+    print("Convertendo os dados para o esquema compacto...")
+
+    for coluna, dimensao in DIMENSOES.items():
+        tabela = "Pessoa" if coluna in ("forca", "posto_graduacao") else \
+                 "Localizacao" if coluna in ("estado", "cidade") else "Esporte"
+        cursor.execute(f"""
+            {backend.inserir_ignorando(dimensao, ("valor",))}
+            SELECT DISTINCT {backend.valor_binario(coluna)} FROM {tabela} WHERE {coluna} IS NOT NULL
+        """)
+
+    binario = backend.valor_binario
+    cursor.execute(f"""
+        INSERT INTO PessoaC (id, sexo, forca_id, posto_graduacao_id, versao)
+        SELECT p.id, p.sexo, f.id, g.id, p.versao
+        FROM Pessoa p
+        LEFT JOIN Dim_forca f ON {binario("f.valor")} = {binario("p.forca")}
+        LEFT JOIN Dim_posto_graduacao g ON {binario("g.valor")} = {binario("p.posto_graduacao")}
+    """)
+    cursor.execute(f"""
+        INSERT INTO LocalizacaoC (id, pessoa_id, estado_id, cidade_id)
+        SELECT l.id, l.pessoa_id, de.id, dc.id
+        FROM Localizacao l
+        LEFT JOIN Dim_estado de ON {binario("de.valor")} = {binario("l.estado")}
+        LEFT JOIN Dim_cidade dc ON {binario("dc.valor")} = {binario("l.cidade")}
+    """)
+    cursor.execute(f"""
+        INSERT INTO EsporteC (id, pessoa_id, modalidade_id, possui_medalha, possui_bolsa, paar)
+        SELECT e.id, e.pessoa_id, m.id,
+               COALESCE(e.possui_medalha = 'Sim', FALSE),
+               COALESCE(e.possui_bolsa = 'Sim', FALSE),
+               COALESCE(e.paar = 'Sim', FALSE)
+        FROM Esporte e
+        LEFT JOIN Dim_modalidade m ON {binario("m.valor")} = {binario("e.modalidade")}
+    """)
+
+    # As impressões da sincronização incremental têm chave estrangeira para a Pessoa
+    # antiga; ficam numa cópia e voltam depois que Carga_impressao for recriada
+    if backend.tipo_objeto(cursor, "Carga_impressao") == "table":
+        cursor.execute("""
+            CREATE TABLE Carga_impressao_conversao AS
+            SELECT arquivo, impressao, pessoa_id, ausente FROM Carga_impressao
+        """)
+        cursor.execute("DROP TABLE Carga_impressao")
+
+    for tabela in ("Localizacao", "Esporte", "Pessoa"):
+        cursor.execute(f"DROP TABLE {tabela}")
+
+    _dicionarios.limpar()
+    logging.info("Dados convertidos para o esquema compacto.")
+
+
+class CacheDicionarios:
+    """
+    Guarda em memória o código de cada valor das tabelas de dicionário do esquema
+    compacto. Valores novos são gravados pelo cursor de quem pede os códigos, na mesma
+    transação da escrita que os usa. Um rollback pode invalidar esses códigos, então
+    quem desfaz uma transação esvazia o cache (_desfazer e conectar).
+    """
+
+    def __init__(self):
+        self._codigos = {coluna: {} for coluna in DIMENSOES}
+        self._trava = threading.Lock()
+
+    def limpar(self):
+        with self._trava:
+            self._codigos = {coluna: {} for coluna in DIMENSOES}
+
+    def codificar(self, cursor, coluna, valores):
+        """
+        Dicionário valor -> código para os valores informados (None não é codificado).
+        Levanta ErroDicionario se algum valor ficar sem código.
+        """
+        valores = {v for v in valores if v is not None}
+        with self._trava:
+            faltantes = valores - self._codigos[coluna].keys()
+
+        if faltantes:
+            self._carregar(cursor, coluna, faltantes)
+
+        with self._trava:
+            codigos = dict(self._codigos[coluna])
+
+        sem_codigo = valores - codigos.keys()
+        if sem_codigo:
+            raise ErroDicionario(f"Valores sem código em {DIMENSOES[coluna]}: {sorted(sem_codigo)}")
+        return codigos
+
+    def _carregar(self, cursor, coluna, valores):
+        backend = obter_backend()
+        tabela = DIMENSOES[coluna]
+        valores = sorted(valores)  # mesma ordem em todas as transações, contra deadlocks
+
+        cursor.executemany(f"{backend.inserir_ignorando(tabela, ('valor',))} VALUES (%s)", [(v,) for v in valores])
+        marcadores = ", ".join(["%s"] * len(valores))
+        cursor.execute(f"SELECT valor, id FROM {tabela} WHERE valor IN ({marcadores})", valores)
+        encontrados = dict(cursor.fetchall())
+
+        with self._trava:
+            self._codigos[coluna].update(encontrados)
+
+
+_dicionarios = CacheDicionarios()
+
+
+def _tamanho_memoria(valor):
+    """Estimativa em bytes de valor, somando tuplas e listas aninhadas."""
+    tamanho = sys.getsizeof(valor)
+    if isinstance(valor, (tuple, list)):
+        tamanho += sum(_tamanho_memoria(v) for v in valor)
+    return tamanho
+
+
+class CacheConsultas:
+    """
+    Cache LRU com validade para leituras repetidas: registros por id ("elemento", id) e
+    resultados de consultas pelo texto normalizado ("consulta", sql, parâmetros). As
+    escritas feitas por este processo invalidam as entradas afetadas; escritas de outros
+    processos só aparecem quando a entrada vence (validade segundos).
+    Cada invalidação avança a geração do cache, e um resultado lido do banco só é
+    guardado se nenhuma invalidação aconteceu durante a leitura.
+    """
+
+    def __init__(self, capacidade, validade):
+        self.capacidade = capacidade
+        self.validade = validade
+        self._entradas = collections.OrderedDict()  # chave -> (valor, expira_em, bytes)
+        self._geracao = 0
+        self._bytes = 0
+        self._acertos = 0
+        self._falhas = 0
+        self._invalidacoes = 0
+        self._trava = threading.Lock()
+
+    def obter(self, chave, carregar):
+        """Valor de chave, chamando carregar() quando não está no cache. None não é guardado."""
+        if self.capacidade <= 0:
+            return carregar()
+
+        encontrado, valor, geracao = self._procurar(chave)
+        if encontrado:
+            return valor
+        valor = carregar()
+        self._guardar(chave, valor, geracao)
+        return valor
+
+    async def obter_assincrono(self, chave, carregar):
+        """Como obter, para leituras assíncronas: carregar() devolve um awaitable."""
+        if self.capacidade <= 0:
+            return await carregar()
+
+        encontrado, valor, geracao = self._procurar(chave)
+        if encontrado:
+            return valor
+        valor = await carregar()
+        self._guardar(chave, valor, geracao)
+        return valor
+
+    def _procurar(self, chave):
+        """(encontrado, valor, geração atual); conta o acerto ou a falha."""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[1] > time.monotonic():
+                self._entradas.move_to_end(chave)
+                self._acertos += 1
+                return True, entrada[0], self._geracao
+            if entrada is not None:
+                self._descartar(chave)
+            self._falhas += 1
+            return False, None, self._geracao
+
+    def _guardar(self, chave, valor, geracao):
+        """Guarda valor lido na geração informada, se nada foi invalidado desde então."""
+        if valor is None:
+            return
+
+        tamanho = _tamanho_memoria(valor)
+        with self._trava:
+            if geracao == self._geracao:
+                if chave in self._entradas:
+                    self._descartar(chave)
+                self._entradas[chave] = (valor, time.monotonic() + self.validade, tamanho)
+                self._bytes += tamanho
+                while len(self._entradas) > self.capacidade:
+                    self._descartar(next(iter(self._entradas)))
+
+    def invalidar(self, ids=None):
+        """
+        Sem ids, esvazia o cache. Com ids, remove esses registros e todos os resultados
+        de consultas (relatórios dependem de qualquer registro); ids=() remove só as consultas.
+        """
+        with self._trava:
+            self._geracao += 1
+            self._invalidacoes += 1
+            if ids is None:
+                self._entradas.clear()
+                self._bytes = 0
+                return
+
+            removidas = {("elemento", int(id)) for id in ids}
+            for chave in [c for c in self._entradas if c[0] == "consulta" or c in removidas]:
+                self._descartar(chave)
+
+    def _descartar(self, chave):
+        self._bytes -= self._entradas.pop(chave)[2]
+
+    def estatisticas(self):
+        with self._trava:
+            leituras = self._acertos + self._falhas
+            return {
+                "entradas": len(self._entradas),
+                "capacidade": self.capacidade,
+                "validade_s": self.validade,
+                "bytes": self._bytes,
+                "acertos": self._acertos,
+                "falhas": self._falhas,
+                "taxa_acerto_%": round(100 * self._acertos / leituras, 1) if leituras else 0.0,
+                "invalidacoes": self._invalidacoes
+            }
+
+    def exibir(self):
+        print("--- Cache de consultas ---")
+        for nome, valor in self.estatisticas().items():
+            print(f"{nome}: {valor}")
+
+
+_cache_consultas = CacheConsultas(**CACHE_CONSULTAS_CONFIG)
+
+
+def _invalida_cache(funcao):
+    """Decorador das operações de escrita em massa: esvazia o cache de consultas ao terminar, mesmo com erro."""
+    @functools.wraps(funcao)
+    def executar(*args, **kwargs):
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            _cache_consultas.invalidar()
+    return executar
+
+
+def _consultar_com_cache(consulta, parametros=None):
+    """Linhas de consulta (tupla de tuplas), lidas pelo cache com a chave do SQL normalizado."""
+    def carregar():
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                if parametros is None:
+                    cursor.execute(consulta)
+                else:
+                    cursor.execute(consulta, parametros)
+                return tuple(tuple(linha) for linha in cursor.fetchall())
+
+    return _cache_consultas.obter(_chave_consulta(consulta, parametros), carregar)
+
+
+def _chave_consulta(consulta, parametros=None):
+    """Chave de cache de uma consulta: texto SQL com espaços normalizados e parâmetros."""
+    return ("consulta", " ".join(consulta.split()), tuple(parametros or ()))
+
+
+def _codificar_lote(cursor, lote):
+    """Troca os valores categóricos de cada elemento pelos códigos dos dicionários."""
+    codigos = {coluna: _dicionarios.codificar(cursor, coluna, {e[CAMPOS_ELEMENTO.index(coluna)] for e in lote})
+               for coluna in DIMENSOES}
+
+    codificados = []
+    for e in lote:
+        c = list(e)
+        for coluna, mapa in codigos.items():
+            i = CAMPOS_ELEMENTO.index(coluna)
+            c[i] = None if e[i] is None else mapa[e[i]]
+        for i in (6, 7, 8):
+            c[i] = e[i] == "Sim"
+        codificados.append(c)
+    return codificados
+
+
+def _migrar_para_chave_estrangeira(cursor):
+    """
+    Converte Localizacao e Esporte do esquema antigo, em que o vínculo com Pessoa
+    era a posição do id, para o esquema com pessoa_id e ON DELETE CASCADE. Os dados
+    existentes são mantidos: cada linha passa a apontar para a Pessoa de mesmo id.
+    Tabelas que já possuem pessoa_id não são alteradas.
+    """
+    for tabela in ("Localizacao", "Esporte"):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'pessoa_id'
+        """, (tabela,))
+        if cursor.fetchone()[0]:
+            continue
+
+        print(f"Migrando a tabela {tabela} para chave estrangeira em pessoa_id...")
+        cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN pessoa_id INT NULL AFTER id")
+        cursor.execute(f"UPDATE {tabela} SET pessoa_id = id")
+
+        # Linhas sem Pessoa correspondente não podem receber a chave estrangeira
+        cursor.execute(f"""
+            DELETE t FROM {tabela} t
+            LEFT JOIN Pessoa p ON p.id = t.pessoa_id
+            WHERE p.id IS NULL
+        """)
+        if cursor.rowcount:
+            print(f"{cursor.rowcount} registro(s) órfão(s) removido(s) de {tabela}.")
+
+        sufixo = tabela.lower()
+        cursor.execute(f"""
+            ALTER TABLE {tabela}
+                MODIFY pessoa_id INT NOT NULL,
+                ADD UNIQUE KEY uq_{sufixo}_pessoa (pessoa_id),
+                ADD CONSTRAINT fk_{sufixo}_pessoa FOREIGN KEY (pessoa_id)
+                    REFERENCES Pessoa(id) ON DELETE CASCADE
+        """)
+        logging.info(f"Tabela {tabela} migrada para chave estrangeira em pessoa_id.")
+
+
+# Converte uma linha do CSV normalizado na lista de elementos usada nas inserções
+def _linha_para_elementos(linha):
+    if not (linha.get('Sexo') and linha.get('Modalidade')):
+        return None
+
+    sexo = linha.get('Sexo', '').strip()
+    estado = linha.get('Estado', '').strip()
+    cidade = linha.get('Cidade', '').strip()
+    forca = linha.get('Forca', '').strip()
+    posto_graduacao = linha.get('Posto Graduacao', '').strip()
+    possui_medalha = linha.get('Possui Medalha de  Merito Desportivo Militar', 'Nao').strip() == 'Sim'
+    modalidade = linha.get('Modalidade', '').strip()
+    possui_bolsa = linha.get('Possui Bolsa Atleta', 'Nao').strip() == 'Sim'
+    paar = linha.get('PAAR', 'Nao').strip() == 'Sim'
+
+    if (estado == ""):
+        estado = "N/A"
+
+    if (cidade == ""):
+        cidade = "N/A"
+
+    possui_medalha = "Sim" if possui_medalha else "Não"
+    possui_bolsa = "Sim" if possui_bolsa else "Não"
+    paar = "Sim" if paar else "Não"
+
+    return [sexo, forca, posto_graduacao, estado, cidade, modalidade, possui_medalha, possui_bolsa, paar]
+
+
+# Coluna do CSV normalizado de cada campo (as mesmas lidas por _linha_para_elementos)
+COLUNAS_CSV = {
+    "sexo": "Sexo",
+    "forca": "Forca",
+    "posto_graduacao": "Posto Graduacao",
+    "estado": "Estado",
+    "cidade": "Cidade",
+    "modalidade": "Modalidade",
+    "possui_medalha": "Possui Medalha de  Merito Desportivo Militar",
+    "possui_bolsa": "Possui Bolsa Atleta",
+    "paar": "PAAR"
+}
+
+
+# Agrupa as linhas do CSV em lotes de elementos validados por referencia.validar_lote.
+# As linhas recusadas vão para rejeitados como (número do registro no arquivo, {campo: valor}).
+# A leitura de cada lote é medida como "csv.ler", sem contar o tempo gasto por quem consome o lote.
+def _lotes_validados(linhas, rejeitados, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    lote, numeros = [], []
+    inicio = time.perf_counter()
+    for numero, linha in enumerate(linhas, start=1):
+        elementos = _linha_para_elementos(linha)
+        if elementos is None:
+            continue
+
+        lote.append(elementos)
+        numeros.append(numero)
+        if len(lote) >= tamanho_lote:
+            metricas.registrar("csv.ler", time.perf_counter() - inicio, len(lote))
+            yield _validar_lote(lote, numeros, rejeitados)
+            lote, numeros = [], []
+            inicio = time.perf_counter()
+
+    if lote:
+        metricas.registrar("csv.ler", time.perf_counter() - inicio, len(lote))
+        yield _validar_lote(lote, numeros, rejeitados)
+
+
+@metricas.cronometrado("csv.validar")
+def _validar_lote(lote, numeros, rejeitados):
+    validos, invalidos = referencia.validar_lote(lote)
+    rejeitados.extend((numeros[posicao], erros) for posicao, erros in invalidos)
+    return validos
+
+
+# Registra no log todos os registros recusados pela validação e exibe os primeiros
+def _relatar_rejeitados(nome_arquivo, rejeitados, limite=10):
+    if not rejeitados:
+        return
+
+    for numero, erros in rejeitados:
+        logging.warning(f"CSV '{nome_arquivo}', registro {numero} recusado: {erros}")
+
+    print()
+    print(f"{len(rejeitados)} registro(s) recusado(s) por valores inválidos:")
+    for numero, erros in rejeitados[:limite]:
+        print(f"  registro {numero}: " + ", ".join(f"{campo} = {valor!r}" for campo, valor in erros.items()))
+    if len(rejeitados) > limite:
+        print(f"  ... e mais {len(rejeitados) - limite} (detalhes no log).")
+
+
+# Reserva n ids consecutivos em Pessoa até o commit da transação atual
+def _reservar_ids_pessoa(cursor, n):
+    return obter_backend().reservar_ids(cursor, _tabela_pessoa(), n)
+
+
+# Tabela física de Pessoa: no esquema compacto, Pessoa é uma view sobre PessoaC
+def _tabela_pessoa():
+    return "PessoaC" if SCHEMA_COMPACTO else "Pessoa"
+
+
+# Tabelas físicas de um registro: nome, colunas e posição de cada coluna em lista_elementos.
+# A primeira é a de Pessoa; as demais são ligadas a ela por pessoa_id.
+def _tabelas_registro():
+    if SCHEMA_COMPACTO:
+        return [("PessoaC", ("sexo", "forca_id", "posto_graduacao_id"), (0, 1, 2)),
+                ("LocalizacaoC", ("estado_id", "cidade_id"), (3, 4)),
+                ("EsporteC", ("modalidade_id", "possui_medalha", "possui_bolsa", "paar"), (5, 6, 7, 8))]
+    return [("Pessoa", ("sexo", "forca", "posto_graduacao"), (0, 1, 2)),
+            ("Localizacao", ("estado", "cidade"), (3, 4)),
+            ("Esporte", ("modalidade", "possui_medalha", "possui_bolsa", "paar"), (5, 6, 7, 8))]
+
+
+# Valores gravados nas tabelas físicas (códigos dos dicionários no esquema compacto,
+# gravados na transação de cursor)
+def _valores_fisicos(cursor, lote):
+    return _codificar_lote(cursor, lote) if SCHEMA_COMPACTO else lote
+
+
+# Insere um lote de elementos com um INSERT de várias linhas por tabela
+@metricas.cronometrado("carga.inserir_lote")
+def inserir_lote(cursor, lote):
+    backend = obter_backend()
+    linhas = _valores_fisicos(cursor, lote)
+
+    # Os ids de Pessoa vêm do próprio INSERT e ligam as linhas das demais tabelas
+    (tabela_pessoa, colunas, posicoes), *dependentes = _tabelas_registro()
+    ids = backend.inserir_numerando(cursor, tabela_pessoa, colunas,
+                                    [tuple(l[p] for p in posicoes) for l in linhas])
+    for tabela, colunas, posicoes in dependentes:
+        backend.inserir_em_massa(cursor, tabela, ("pessoa_id",) + colunas,
+                                 [(i,) + tuple(l[p] for p in posicoes) for i, l in zip(ids, linhas)])
+
+    delta = DeltaResumos()
+    for e in lote:
+        delta.adicionar(e)
+    delta.gravar(cursor)
+
+    return ids
+
+
+# Índice de cada campo em lista_elementos
+CAMPOS_ELEMENTO = ("sexo", "forca", "posto_graduacao", "estado", "cidade",
+                   "modalidade", "possui_medalha", "possui_bolsa", "paar")
+
+# Valores assumidos para os campos de um registro sem Localizacao ou Esporte
+PADROES_ELEMENTO = ("", "N/A", "N/A", "N/A", "N/A", "N/A", "Não", "Não", "Não")
+
+# Contadores das tabelas de resumo: expressão SQL de agregação, valor de um registro
+# e flag somada no snapshot colunar (None: contagem de registros)
+CONTADORES_RESUMO = {
+    "atletas": ("COUNT(*)", lambda e: 1, None),
+    "medalhas": ("SUM(CASE WHEN possui_medalha = 'Sim' THEN 1 ELSE 0 END)", lambda e: int(e[6] == "Sim"),
+                 "possui_medalha"),
+    "bolsas": ("SUM(CASE WHEN possui_bolsa = 'Sim' THEN 1 ELSE 0 END)", lambda e: int(e[7] == "Sim"),
+               "possui_bolsa"),
+    "paar": ("SUM(CASE WHEN paar = 'Sim' THEN 1 ELSE 0 END)", lambda e: int(e[8] == "Sim"), "paar")
+}
+
+# Tabelas de resumo mantidas a cada escrita. Cada uma agrega uma view do sistema;
+# "requer" é o campo que só existe quando o registro aparece nessa view.
+RESUMOS = {
+    "Resumo_modalidade": {
+        "view": "vw_pessoa_esporte",
+        "grupo": ("modalidade",),
+        "contadores": ("atletas", "medalhas", "bolsas", "paar"),
+        "requer": "modalidade"
+    },
+    "Resumo_forca_posto": {
+        "view": "vw_pessoa_esporte",
+        "grupo": ("forca", "posto_graduacao"),
+        "contadores": ("atletas", "medalhas", "bolsas", "paar"),
+        "requer": "modalidade"
+    },
+    "Resumo_estado": {
+        "view": "vw_pessoa_localizacao",
+        "grupo": ("estado",),
+        "contadores": ("atletas",),
+        "requer": "estado"
+    }
+}
+
+# Relatórios disponíveis e a tabela de resumo de cada um
+RELATORIOS = {
+    "modalidade": "Resumo_modalidade",
+    "forca_posto": "Resumo_forca_posto",
+    "estado": "Resumo_estado"
+}
+
+
+class DeltaResumos:
+    """
+    Acumula a variação dos contadores das tabelas de resumo causada por um conjunto
+    de inclusões (sinal +1) e exclusões (sinal -1), e grava tudo com um upsert por
+    tabela. Assim os relatórios leem contagens prontas em vez de varrer as tabelas.
+    """
+
+    def __init__(self):
+        self.variacoes = {tabela: {} for tabela in RESUMOS}
+
+    def adicionar(self, elementos, sinal=1):
+        for tabela, resumo in RESUMOS.items():
+            if elementos[CAMPOS_ELEMENTO.index(resumo["requer"])] is None:
+                continue
+
+            chave = tuple(elementos[CAMPOS_ELEMENTO.index(c)] or '' for c in resumo["grupo"])
+            atual = self.variacoes[tabela].setdefault(chave, [0] * len(resumo["contadores"]))
+            for i, contador in enumerate(resumo["contadores"]):
+                atual[i] += sinal * CONTADORES_RESUMO[contador][1](elementos)
+
+    def gravar(self, cursor, sufixo=""):
+        """Soma as variações nas tabelas de resumo (com sufixo, nas tabelas paralelas de mesmo nome)."""
+        backend = obter_backend()
+        for tabela, variacoes in self.variacoes.items():
+            linhas = [chave + tuple(valores) for chave, valores in variacoes.items() if any(valores)]
+            if not linhas:
+                continue
+
+            resumo = RESUMOS[tabela]
+            backend.somar_contadores(cursor, f"{tabela}{sufixo}", list(resumo["grupo"]), list(resumo["contadores"]),
+                                     linhas)
+            if any(v < 0 for valores in variacoes.values() for v in valores):
+                cursor.execute(f"DELETE FROM {tabela}{sufixo} WHERE atletas <= 0")
+
+        self.variacoes = {tabela: {} for tabela in RESUMOS}
+
+
+def _consulta_agregada(resumo):
+    grupo = ", ".join(f"COALESCE({c}, '')" for c in resumo["grupo"])
+    contadores = ", ".join(CONTADORES_RESUMO[c][0] for c in resumo["contadores"])
+    return f"SELECT {grupo}, {contadores} FROM {resumo['view']} GROUP BY {grupo}"
+
+
+# Reconstrói todas as tabelas de resumo a partir das views (uma varredura por resumo)
+def _recalcular_resumos(cursor):
+    for tabela, resumo in RESUMOS.items():
+        cursor.execute(f"DELETE FROM {tabela}")
+        colunas = ", ".join(resumo["grupo"] + resumo["contadores"])
+        cursor.execute(f"INSERT INTO {tabela} ({colunas}) {_consulta_agregada(resumo)}")
+
+
+@_invalida_cache
+def recalcular_resumos():
+    try:
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                _recalcular_resumos(cursor)
+            conn.commit()
+            print("Resumos recalculados com sucesso.")
+    except ErroBanco as err:
+        logging.error(f"Erro ao recalcular resumos: {err}")
+        print(f"Erro ao recalcular resumos: {err}")
+
+
+@metricas.cronometrado("relatorio.gerar")
+def gerar_relatorio(nome, origem="resumo", snapshot=None, filtros=None):
+    """
+    Retorna (colunas, linhas) do relatório nome. Com origem="resumo" lê a tabela de
+    resumo mantida a cada escrita; com origem="views" agrega as views na hora; com
+    origem="snapshot" agrega o snapshot colunar da pasta snapshot, sem acessar o banco,
+    aplicando filtros ({campo: valor ou lista de valores}).
+    Relatórios com medalhas e bolsas trazem também as taxas em porcentagem.
+    """
+    tabela = RELATORIOS[nome]
+    resumo = RESUMOS[tabela]
+    colunas = list(resumo["grupo"] + resumo["contadores"])
+
+    if filtros and origem != "snapshot":
+        raise ValueError("Filtros só se aplicam a relatórios da origem snapshot.")
+
+    if origem == "snapshot":
+        linhas = _relatorio_snapshot(resumo, snapshot, filtros)
+    else:
+        if origem == "views":
+            consulta = _consulta_agregada(resumo)
+        else:
+            consulta = f"SELECT {', '.join(colunas)} FROM {tabela}"
+        linhas = [list(linha) for linha in _consultar_com_cache(consulta)]
+
+    return _formatar_relatorio(resumo, colunas, linhas)
+
+
+def _formatar_relatorio(resumo, colunas, linhas):
+    """Ordena as linhas por atletas e acrescenta as taxas de medalha e bolsa."""
+    posicao_atletas = colunas.index("atletas")
+    linhas.sort(key=lambda linha: (-linha[posicao_atletas], linha[:len(resumo["grupo"])]))
+
+    for taxa, contador in (("taxa_medalha_%", "medalhas"), ("taxa_bolsa_%", "bolsas")):
+        if contador in colunas:
+            posicao = colunas.index(contador)
+            for linha in linhas:
+                linha.append(round(100 * linha[posicao] / linha[posicao_atletas], 1) if linha[posicao_atletas] else 0.0)
+            colunas.append(taxa)
+
+    return colunas, linhas
+
+
+def exibir_relatorio(nome, origem="resumo", snapshot=None, filtros=None):
+    try:
+        colunas, linhas = gerar_relatorio(nome, origem, snapshot, filtros)
+    except ErroBanco + (OSError, ValueError, RuntimeError) as err:
+        logging.error(f"Erro ao gerar relatório {nome}: {err}")
+        print(f"Erro ao gerar relatório {nome}: {err}")
+        return
+
+    print(f"--- Relatório por {nome} ---")
+    if not linhas:
+        print("Nenhum dado para o relatório.")
+        return
+
+    larguras = [max(len(str(c)), *(len(str(linha[i])) for linha in linhas)) for i, c in enumerate(colunas)]
+    print("  ".join(str(c).ljust(larguras[i]) for i, c in enumerate(colunas)))
+    for linha in linhas:
+        print("  ".join(str(v).ljust(larguras[i]) for i, v in enumerate(linha)))
+
+
+# Registros completos na ordem de id, para o snapshot colunar
+CONSULTA_SNAPSHOT = """
+    SELECT 
+        Pessoa.id,
+        Pessoa.sexo, 
+        Pessoa.forca, 
+        Pessoa.posto_graduacao, 
+        Localizacao.estado, 
+        Localizacao.cidade, 
+        Esporte.modalidade, 
+        Esporte.possui_medalha, 
+        Esporte.possui_bolsa, 
+        Esporte.paar
+    FROM 
+        Pessoa
+    LEFT JOIN 
+        Esporte ON Esporte.pessoa_id = Pessoa.id
+    LEFT JOIN 
+        Localizacao ON Localizacao.pessoa_id = Pessoa.id
+    ORDER BY 
+        Pessoa.id
+"""
+
+# Snapshots abertos, por pasta: (instante de gravação do manifesto, colunar.Snapshot)
+_snapshots = {}
+
+
+def _abrir_snapshot(pasta):
+    """Snapshot da pasta, reaberto só quando o manifesto muda (nova exportação)."""
+    if not pasta:
+        raise ValueError("Informe a pasta do snapshot.")
+    gravado = os.path.getmtime(os.path.join(pasta, colunar.MANIFESTO))
+    aberto = _snapshots.get(pasta)
+    if aberto is None or aberto[0] != gravado:
+        aberto = _snapshots[pasta] = (gravado, colunar.Snapshot(pasta))
+    return aberto[1]
+
+
+def _relatorio_snapshot(resumo, pasta, filtros=None):
+    """Linhas do resumo calculadas sobre o snapshot, como as agregações das views."""
+    snapshot = _abrir_snapshot(pasta)
+    mascara = snapshot.mascara(filtros) & snapshot.presentes(resumo["requer"])
+    somas = [CONTADORES_RESUMO[c][2] for c in resumo["contadores"] if CONTADORES_RESUMO[c][2]]
+    return [list(linha) for linha in snapshot.agrupar(resumo["grupo"], somas, mascara)]
+
+
+@metricas.cronometrado("snapshot.exportar")
+def exportar_snapshot(pasta, tamanho_pagina=TAMANHO_BLOCO_PANDAS):
+    """Grava em pasta o snapshot colunar de todos os registros, lidos em páginas de tamanho_pagina."""
+    inicio = time.perf_counter()
+    try:
+        escritor = colunar.EscritorSnapshot(pasta)
+        with conectar() as conn:
+            with obter_backend().cursor_streaming(conn) as cursor:
+                cursor.execute(CONSULTA_SNAPSHOT)
+                while True:
+                    bloco = cursor.fetchmany(tamanho_pagina)
+                    if not bloco:
+                        break
+                    escritor.adicionar(bloco)
+        total = escritor.fechar()
+    except ErroBanco + (OSError, RuntimeError) as err:
+        logging.error(f"Erro ao exportar snapshot para {pasta}: {err}")
+        print(f"Erro ao exportar snapshot: {err}")
+        return None
+
+    duracao = time.perf_counter() - inicio
+    logging.info(f"Snapshot com {total} registros exportado para '{pasta}' em {duracao:.2f}s.")
+    print(f"Snapshot com {total} registros exportado para '{pasta}' em {duracao:.2f}s.")
+    return total
+
+
+@metricas.cronometrado("snapshot.importar")
+@_invalida_cache
+def importar_snapshot(pasta, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Insere os registros do snapshot como registros novos (ids atribuídos pelo banco),
+    validados como na carga do CSV, tamanho_lote linhas por commit.
+    """
+    total = lidos = 0
+    rejeitados = []
+    inicio = time.perf_counter()
+
+    try:
+        snapshot = _abrir_snapshot(pasta)
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                for bloco in snapshot.registros(tamanho_lote):
+                    lote = _validar_lote(bloco, range(lidos + 1, lidos + len(bloco) + 1), rejeitados)
+                    lidos += len(bloco)
+                    if lote:
+                        inserir_lote(cursor, lote)
+                        conn.commit()
+                        total += len(lote)
+
+        duracao = time.perf_counter() - inicio
+        logging.info(f"Snapshot '{pasta}' importado: {total} registros em {duracao:.2f}s.")
+        print(f"{total} registros importados do snapshot em {duracao:.2f}s.")
+        _relatar_rejeitados(pasta, rejeitados)
+    except (OSError, ValueError, RuntimeError) as err:
+        logging.error(f"Erro ao abrir snapshot {pasta}: {err}")
+        print(f"Erro ao abrir snapshot: {err}")
+    except ErroBanco as err:
+        print()
+        logging.error(f"Erro ao importar snapshot após {total} registros: {err}")
+        print(f"Erro ao importar snapshot: {err}")
+        print(f"Registros confirmados antes do erro: {total}")
+
+
+def consultor_indices():
+    """
+    Executa EXPLAIN nas consultas padrão do sistema e aponta as que fazem varredura
+    completa de alguma tabela, além dos índices de INDICES que nenhuma delas usa (e,
+    no MySQL, os que o performance_schema registra como nunca usados).
+    """
+    backend = obter_backend()
+
+    try:
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                usados = set()
+                varreduras = 0
+
+                print("--- Planos das consultas padrão ---")
+                for nome, consulta in _consultas_ativas().items():
+                    plano = backend.explicar(cursor, consulta)
+                    usados.update(indice for _, indice, _ in plano if indice)
+
+                    for tabela, indice, varredura in plano:
+                        situacao = "VARREDURA COMPLETA" if varredura else "ok"
+                        print(f"{nome}: tabela {tabela}, índice {indice or '-'} -> {situacao}")
+                        varreduras += varredura
+
+                sem_uso = [nome for nome in _indices_ativos() if nome not in usados]
+                sem_uso_servidor = backend.indices_sem_uso(cursor)
+
+        print()
+        if varreduras:
+            print(f"{varreduras} varredura(s) completa(s) nas consultas padrão.")
+        else:
+            print("Nenhuma varredura completa nas consultas padrão.")
+
+        if sem_uso:
+            print("Índices não usados pelas consultas padrão: " + ", ".join(sem_uso))
+        if sem_uso_servidor:
+            print("Índices sem uso registrado pelo servidor: " + ", ".join(sem_uso_servidor))
+    except ErroBanco as err:
+        logging.error(f"Erro no consultor de índices: {err}")
+        print(f"Erro no consultor de índices: {err}")
+
+
+# Exibe e registra no log o total carregado e a vazão em linhas por segundo
+def _relatar_carga(nome_arquivo, total, inicio):
+    duracao = time.perf_counter() - inicio
+    taxa = total / duracao if duracao > 0 else float(total)
+    cache = estatisticas_normalizacao()
+    logging.info(f"CSV '{nome_arquivo}' carregado: {total} registros em {duracao:.2f}s ({taxa:.0f} linhas/s); "
+                 f"cache de normalização: {cache['acertos']} acertos, {cache['faltas']} faltas.")
+    print()
+    print("Dados carregados com sucesso.")
+    print(f"{total} registros em {duracao:.2f}s ({taxa:.0f} linhas/s).")
+
+
+# Carrega o CSV para o banco de dados em lotes, usando uma única conexão
+@metricas.cronometrado("carga.csv")
+@_invalida_cache
+def carregar_csv_para_banco(nome_arquivo, tamanho_lote=TAMANHO_LOTE_PADRAO, salvar_normalizado=False):
+    arquivo_normalizado = None
+    if salvar_normalizado:
+        pasta, nome = os.path.split(nome_arquivo)
+        arquivo_normalizado = os.path.join(pasta, "normalized_" + nome)
+
+    total = 0
+    rejeitados = []
+    inicio = time.perf_counter()
+
+    try:
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                # Cada lote é validado inteiro antes do INSERT
+                for lote in _lotes_validados(ler_registros_csv(nome_arquivo, arquivo_normalizado),
+                                             rejeitados, tamanho_lote):
+                    if lote:
+                        inserir_lote(cursor, lote)
+                        conn.commit()
+                        total += len(lote)
+
+        _relatar_carga(nome_arquivo, total, inicio)
+        _relatar_rejeitados(nome_arquivo, rejeitados)
+    except ErroBanco as err:
+        print()
+        logging.error(f"Erro ao carregar CSV após {total} registros: {err}")
+        print(f"Erro ao carregar CSV: {err}")
+        print(f"Registros confirmados antes do erro: {total}")
+
+
+# Insere um lote nas tabelas de staging com os ids informados (sem reserva nem resumos)
+def _inserir_lote_staging(cursor, lote, ids):
+    backend = obter_backend()
+    linhas = _valores_fisicos(cursor, lote)
+    for posicao, (tabela, colunas, posicoes) in enumerate(_tabelas_registro()):
+        chave = ("pessoa_id",) if posicao else ("id",)
+        backend.inserir_em_massa(cursor, f"{tabela}{SUFIXO_STAGING}", chave + colunas,
+                                 [(i,) + tuple(l[p] for p in posicoes) for i, l in zip(ids, linhas)])
+
+
+# Problemas que impedem a troca: cada tabela do registro em staging deve ter uma linha por registro carregado
+def _validar_staging(cursor, total):
+    if not total:
+        return ["nenhum registro válido foi carregado"]
+
+    problemas = []
+    for tabela, _, _ in _tabelas_registro():
+        cursor.execute(f"SELECT COUNT(*) FROM {tabela}{SUFIXO_STAGING}")
+        linhas = cursor.fetchone()[0]
+        if linhas != total:
+            problemas.append(f"{tabela}{SUFIXO_STAGING} tem {linhas} linhas; esperadas {total}")
+    return problemas
+
+
+@metricas.cronometrado("carga.staging")
+@_invalida_cache
+def recarregar_csv(nome_arquivo, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Recarga completa sem janela de dados parciais. O CSV é gravado nas tabelas de
+    staging (Pessoa_staging, Localizacao_staging, Esporte_staging ou as do esquema
+    compacto, mais resumos e manifesto da sincronização), sem índices secundários e sem
+    checagem de chave estrangeira; os resumos são somados durante a leitura. Com as
+    quantidades de linhas conferidas, _promover_tabelas cria os índices e troca as
+    tabelas de uma vez, e as antigas são excluídas em segundo plano.
+
+    Até a troca, as consultas leem os dados anteriores; se a carga falhar, eles ficam
+    como estavam. Alterações feitas nas tabelas atuais durante a carga se perdem na
+    troca, e o manifesto da sincronização incremental recomeça vazio.
+    """
+    backend = obter_backend()
+    total = 0
+    rejeitados = []
+    delta = DeltaResumos()
+    promovidas = False
+    inicio = time.perf_counter()
+
+    try:
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                _criar_tabelas_paralelas(cursor, SUFIXO_STAGING)
+
+                # Ninguém lê o staging antes da troca e os ids são atribuídos aqui em sequência
+                backend.checar_chaves_estrangeiras(cursor, False)
+                try:
+                    for lote in _lotes_validados(ler_registros_csv(nome_arquivo), rejeitados, tamanho_lote):
+                        if lote:
+                            _inserir_lote_staging(cursor, lote, range(total + 1, total + len(lote) + 1))
+                            conn.commit()
+                            total += len(lote)
+                            for e in lote:
+                                delta.adicionar(e)
+                finally:
+                    # Desfaz um lote interrompido: no SQLite o PRAGMA só vale fora de transação
+                    _desfazer(conn)
+                    backend.checar_chaves_estrangeiras(cursor, True)
+
+                delta.gravar(cursor, SUFIXO_STAGING)
+                conn.commit()
+
+                problemas = _validar_staging(cursor, total)
+                if problemas:
+                    logging.error(f"Recarga de '{nome_arquivo}' cancelada: {'; '.join(problemas)}")
+                    print("Recarga cancelada; as tabelas atuais não foram alteradas:")
+                    for problema in problemas:
+                        print(f"  {problema}")
+                    return
+
+                with metricas.cronometrar("carga.staging.promover"):
+                    _promover_tabelas(cursor, SUFIXO_STAGING)
+                    conn.commit()
+                promovidas = True
+    except ErroBanco + (OSError,) as err:
+        print()
+        logging.error(f"Erro na recarga de '{nome_arquivo}' após {total} registros: {err}")
+        print(f"Erro na recarga: {err}")
+        print("As tabelas atuais não foram alteradas.")
+        return
+    finally:
+        # Depois da troca saem as tabelas antigas; sem ela, o staging incompleto
+        _descartar_em_segundo_plano(_nomes_troca(SUFIXO_ANTIGA if promovidas else SUFIXO_STAGING))
+
+    _relatar_carga(nome_arquivo, total, inicio)
+    _relatar_rejeitados(nome_arquivo, rejeitados)
+
+
+# Aplica funcao uma vez por valor distinto da coluna e espalha o resultado pelas linhas
+def _mapear_distintos(serie, funcao):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, distintos = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        codigos, distintos = pd.factorize(serie)
+    resultados = pd.Index([funcao(valor) for valor in distintos], dtype=object)
+    return pd.Series(resultados.take(codigos), index=serie.index, dtype=object)
+
+
+def _quadro_para_elementos(quadro, rejeitados):
+    """
+    Converte um bloco lido pelo pandas nas listas de elementos de inserir_lote com
+    operações por coluna: normalização, valores padrão, Sim/Não, descarte das linhas
+    sem Sexo ou Modalidade e validação de referência. As linhas recusadas vão para
+    rejeitados, numeradas como em _lotes_validados.
+    """
+    quadro = quadro.rename(columns=lambda coluna: normalizar_celula(coluna) or '')
+    vazia = pd.Series('', index=quadro.index, dtype=object)
+    dados = pd.DataFrame({
+        campo: _mapear_distintos(quadro[coluna], lambda v: (normalizar_celula(v) or '').strip())
+        if coluna in quadro else vazia
+        for campo, coluna in COLUNAS_CSV.items()
+    })
+
+    # Mesmas regras de _linha_para_elementos
+    dados = dados[(dados["sexo"] != '') & (dados["modalidade"] != '')]
+    for campo in ("estado", "cidade"):
+        dados[campo] = dados[campo].mask(dados[campo] == '', "N/A")
+    for campo in ("possui_medalha", "possui_bolsa", "paar"):
+        dados[campo] = dados[campo].eq("Sim").map({True: "Sim", False: "Não"}).astype(object)
+
+    originais = dados.copy()
+    recusadas = pd.Series(False, index=dados.index)
+    for campo in referencia.CANONICOS:
+        dados[campo] = _mapear_distintos(dados[campo], lambda v, campo=campo: referencia.canonizar(campo, v))
+        recusadas |= dados[campo].isna()
+
+    if recusadas.any():
+        for indice in dados.index[recusadas]:
+            erros = {campo: originais.at[indice, campo] for campo in referencia.CANONICOS
+                     if pd.isna(dados.at[indice, campo])}
+            rejeitados.append((indice + 1, erros))
+
+    return dados.loc[~recusadas, list(CAMPOS_ELEMENTO)].values.tolist()
+
+
+@metricas.cronometrado("carga.pandas")
+@_invalida_cache
+def carregar_csv_pandas(nome_arquivo, tamanho_lote=TAMANHO_LOTE_PADRAO, tamanho_bloco=TAMANHO_BLOCO_PANDAS):
+    """
+    Carga vetorizada: lê o CSV em blocos de tamanho_bloco linhas com pandas.read_csv
+    (colunas categóricas, que já chegam com os valores distintos separados), trata cada
+    bloco com operações por coluna (_quadro_para_elementos) e grava o resultado com
+    inserir_lote, tamanho_lote linhas por commit. Sem pandas instalado, segue pelo
+    caminho de carregar_csv_para_banco.
+    """
+    if pd is None:
+        print("pandas não está instalado; carregando em lotes.")
+        carregar_csv_para_banco(nome_arquivo, tamanho_lote)
+        return
+
+    total = 0
+    rejeitados = []
+    inicio = time.perf_counter()
+
+    try:
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                blocos = pd.read_csv(nome_arquivo, sep=';', encoding='latin-1', dtype="category",
+                                     keep_default_na=False, chunksize=tamanho_bloco)
+                for bloco in blocos:
+                    elementos = _quadro_para_elementos(bloco, rejeitados)
+                    for i in range(0, len(elementos), tamanho_lote):
+                        lote = elementos[i:i + tamanho_lote]
+                        inserir_lote(cursor, lote)
+                        conn.commit()
+                        total += len(lote)
+
+        _relatar_carga(nome_arquivo, total, inicio)
+        _relatar_rejeitados(nome_arquivo, rejeitados)
+    except ErroBanco as err:
+        print()
+        logging.error(f"Erro ao carregar CSV após {total} registros: {err}")
+        print(f"Erro ao carregar CSV: {err}")
+        print(f"Registros confirmados antes do erro: {total}")
+
+
+# SHA-256 do conteúdo do arquivo, lido em blocos
+def _checksum_arquivo(nome_arquivo):
+    soma = hashlib.sha256()
+    with open(nome_arquivo, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            soma.update(bloco)
+    return soma.hexdigest()
+
+
+# Impressão estável de uma linha normalizada. Linhas idênticas no mesmo arquivo
+# são atletas distintos, então a ordem de ocorrência entra no cálculo.
+def _impressao_linha(elementos, ocorrencias):
+    base = "\x1f".join(elementos)
+    n = ocorrencias[base]
+    ocorrencias[base] += 1
+    return hashlib.sha1(f"{base}\x1e{n}".encode("utf-8")).digest()
+
+
+# Insere um lote novo e registra a impressão de cada linha
+def _inserir_lote_sincronizado(cursor, arquivo, lote, impressoes):
+    ids = inserir_lote(cursor, lote)
+    obter_backend().inserir_em_massa(cursor, "Carga_impressao", ("arquivo", "impressao", "pessoa_id"),
+                                     [(arquivo, i, p) for i, p in zip(impressoes, ids)])
+
+
+@metricas.cronometrado("carga.sincronizar")
+@_invalida_cache
+def sincronizar_csv(nome_arquivo, tamanho_lote=TAMANHO_LOTE_PADRAO, marcar_ausentes=False, forcar=False):
+    """
+    Recarga incremental: insere apenas as linhas que ainda não foram carregadas deste
+    arquivo e exclui as que sumiram dele, descontando-as dos resumos. Com marcar_ausentes,
+    as que sumiram só recebem Carga_impressao.ausente: continuam nas tabelas, nas views
+    e nos resumos. Um arquivo com o mesmo checksum da última sincronização é ignorado.
+    Retorna um dicionário com inseridos, mantidos e ausentes, ou None se nada mudou.
+    """
+    # Chave da origem: o caminho absoluto (arquivos de mesmo nome em pastas diferentes são origens diferentes)
+    arquivo = os.path.abspath(nome_arquivo)
+    checksum = _checksum_arquivo(nome_arquivo)
+    inseridos = mantidos = 0
+    rejeitados = []
+    inicio = time.perf_counter()
+
+    try:
+        with conectar() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT checksum FROM Carga_arquivo WHERE arquivo = %s", (arquivo,))
+                manifesto = cursor.fetchone()
+                if manifesto and manifesto[0] == checksum and not forcar:
+                    print(f"'{arquivo}' não mudou desde a última sincronização; nada a fazer.")
+                    return None
+
+                cursor.execute("SELECT impressao, pessoa_id FROM Carga_impressao WHERE arquivo = %s", (arquivo,))
+                existentes = {bytes(impressao): pessoa_id for impressao, pessoa_id in cursor.fetchall()}
+
+                if not existentes:
+                    # Só os registros que nenhuma sincronização conhece (os de outros arquivos têm impressão)
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM Pessoa
+                        LEFT JOIN Carga_impressao ON Carga_impressao.pessoa_id = Pessoa.id
+                        WHERE Carga_impressao.pessoa_id IS NULL
+                    """)
+                    sem_impressao = cursor.fetchone()[0]
+                    if sem_impressao:
+                        print(f"Aviso: há {sem_impressao} registros sem impressão (carregados fora da sincronização); "
+                              "eles não serão reconhecidos. Limpe as tabelas para partir de uma base sincronizada.")
+
+                ocorrencias = collections.Counter()
+                lote, impressoes = [], []
+                validados = _lotes_validados(ler_registros_csv(nome_arquivo), rejeitados, tamanho_lote)
+                for elementos in itertools.chain.from_iterable(validados):
+                    impressao = _impressao_linha(elementos, ocorrencias)
+                    if existentes.pop(impressao, None) is not None:
+                        mantidos += 1
+                        continue
+
+                    lote.append(elementos)
+                    impressoes.append(impressao)
+                    if len(lote) >= tamanho_lote:
+                        _inserir_lote_sincronizado(cursor, arquivo, lote, impressoes)
+                        conn.commit()
+                        inseridos += len(lote)
+                        lote, impressoes = [], []
+
+                if lote:
+                    _inserir_lote_sincronizado(cursor, arquivo, lote, impressoes)
+                    inseridos += len(lote)
+
+                # O que sobrou em existentes não aparece mais no arquivo
+                ausentes = list(existentes.values())
+                if marcar_ausentes:
+                    cursor.execute("UPDATE Carga_impressao SET ausente = FALSE WHERE arquivo = %s", (arquivo,))
+                for i in range(0, len(ausentes), tamanho_lote):
+                    parte = ausentes[i:i + tamanho_lote]
+                    if marcar_ausentes:
+                        marcadores = ", ".join(["%s"] * len(parte))
+                        cursor.execute(f"UPDATE Carga_impressao SET ausente = TRUE WHERE pessoa_id IN ({marcadores})",
+                                       tuple(parte))
+                    else:
+                        _remover_pessoas(cursor, parte)
+
+                obter_backend().substituir(cursor, "Carga_arquivo", ("arquivo",),
+                                           ("arquivo", "checksum", "registros", "carregado_em"),
+                                           [(arquivo, checksum, inseridos + mantidos,
+                                             time.strftime("%Y-%m-%d %H:%M:%S"))])
+                conn.commit()
+
+        duracao = time.perf_counter() - inicio
+        acao = "marcados como ausentes" if marcar_ausentes else "excluídos"
+        logging.info(f"Sincronização de '{arquivo}': {inseridos} inseridos, {mantidos} mantidos, "
+                     f"{len(ausentes)} {acao} em {duracao:.2f}s.")
+        print()
+        print("Sincronização concluída.")
+        print(f"{inseridos} inseridos, {mantidos} mantidos, {len(ausentes)} {acao} em {duracao:.2f}s.")
+        _relatar_rejeitados(nome_arquivo, rejeitados)
+        return {"inseridos": inseridos, "mantidos": mantidos, "ausentes": len(ausentes)}
+    except ErroBanco as err:
+        print()
+        logging.error(f"Erro ao sincronizar CSV após {inseridos} inserções: {err}")
+        print(f"Erro ao sincronizar CSV: {err}")
+        print(f"Inserções confirmadas antes do erro: {inseridos}")
+
+
+# Grava as linhas do CSV em um arquivo temporário por tabela, com ids de Pessoa relativos
+# (1 a n): a faixa real só é reservada depois, e o LOAD DATA soma o deslocamento
+def _gravar_arquivos_load_data(nome_arquivo, pasta, delta, rejeitados):
+    caminhos = {tabela: os.path.join(pasta, f"{tabela}.tsv") for tabela in COLUNAS_LOAD_DATA}
+    total = 0
+
+    with contextlib.ExitStack() as pilha:
+        escritores = {
+            tabela: csv.writer(pilha.enter_context(open(caminho, mode='w', encoding='utf-8', newline='')),
+                               delimiter='\t', lineterminator='\n')
+            for tabela, caminho in caminhos.items()
+        }
+
+        for e in itertools.chain.from_iterable(_lotes_validados(ler_registros_csv(nome_arquivo), rejeitados)):
+            pessoa_id = total + 1
+            escritores["Pessoa"].writerow((pessoa_id, e[0], e[1], e[2]))
+            escritores["Localizacao"].writerow((pessoa_id, e[3], e[4]))
+            escritores["Esporte"].writerow((pessoa_id, e[5], e[6], e[7], e[8]))
+            delta.adicionar(e)
+            total += 1
+
+    return caminhos, total
+
+
+@metricas.cronometrado("carga.load_data")
+@_invalida_cache
+def carregar_csv_load_data(nome_arquivo, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    """
+    Carga rápida para arquivos muito grandes: grava as linhas normalizadas em um
+    arquivo por tabela e envia cada um com LOAD DATA LOCAL INFILE, tudo em uma única
+    transação, com as verificações de unicidade e de chave estrangeira suspensas
+    durante a carga. Se o servidor ou o cliente não permitirem local infile, a carga
+    segue pelo caminho em lotes de carregar_csv_para_banco.
+    """
+    backend = obter_backend()
+    if backend.nome != "mysql":
+        print(f"LOAD DATA LOCAL INFILE não existe no backend {backend.nome}; carregando em lotes.")
+        carregar_csv_para_banco(nome_arquivo, tamanho_lote)
+        return
+
+    if SCHEMA_COMPACTO:
+        # Os arquivos de carga trazem valores textuais, não os códigos dos dicionários
+        print("LOAD DATA LOCAL INFILE não se aplica ao esquema compacto; carregando em lotes.")
+        carregar_csv_para_banco(nome_arquivo, tamanho_lote)
+        return
+
+    inicio = time.perf_counter()
+    rejeitados = []
+
+    try:
+        # O pool não habilita local infile, então esta carga usa uma conexão própria
+        conn = backend.conectar(allow_local_infile=True)
+    except ErroBanco as err:
+        logging.error(f"Erro ao conectar ao banco de dados: {err}")
+        print(f"Erro ao conectar ao banco de dados: {err}")
+        return
+
+    try:
+        with conn.cursor() as cursor, tempfile.TemporaryDirectory(prefix="paar_") as pasta:
+            delta = DeltaResumos()
+            caminhos, total = _gravar_arquivos_load_data(nome_arquivo, pasta, delta, rejeitados)
+
+            # A faixa de ids só é reservada com os arquivos prontos, logo antes do LOAD DATA
+            deslocamento = _reservar_ids_pessoa(cursor, total).start - 1
+
+            cursor.execute("SET unique_checks = 0")
+            cursor.execute("SET foreign_key_checks = 0")
+            try:
+                for tabela, (chave, *colunas) in COLUNAS_LOAD_DATA.items():
+                    cursor.execute(f"""
+                        LOAD DATA LOCAL INFILE %s INTO TABLE {tabela}
+                        CHARACTER SET utf8mb4
+                        FIELDS TERMINATED BY '\\t' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                        LINES TERMINATED BY '\\n'
+                        (@{chave}, {", ".join(colunas)})
+                        SET {chave} = @{chave} + %s
+                    """, (caminhos[tabela], deslocamento))
+            finally:
+                cursor.execute("SET foreign_key_checks = 1")
+                cursor.execute("SET unique_checks = 1")
+
+            delta.gravar(cursor)
+            conn.commit()
+
+        _relatar_carga(nome_arquivo, total, inicio)
+        _relatar_rejeitados(nome_arquivo, rejeitados)
+    except ErroBanco as err:
+        _desfazer(conn)
+        if getattr(err, "errno", None) not in ERROS_LOCAL_INFILE:
+            print()
+            logging.error(f"Erro ao carregar CSV com LOAD DATA: {err}")
+            print(f"Erro ao carregar CSV com LOAD DATA: {err}")
+            return
+
+        print()
+        print("LOAD DATA LOCAL INFILE não permitido; carregando em lotes.")
+        logging.info(f"LOAD DATA LOCAL INFILE indisponível ({err}); usando a carga em lotes.")
+    else:
+        return
+    finally:
+        conn.close()
+
+    carregar_csv_para_banco(nome_arquivo, tamanho_lote)
+
+
+def _normalizar_bloco(cabecalho, linhas, primeiro_numero=1):
+    """
+    Executada nos processos do pool de ingestão: normaliza e valida um bloco de linhas
+    cruas do CSV. Devolve os elementos prontos para inserir_lote e os registros
+    recusados, numerados a partir de primeiro_numero.
+    """
+    registros = (dict(zip(cabecalho, (normalizar_celula(cell) or '' for cell in row))) for row in linhas)
+    rejeitados = []
+    elementos = [e for lote in _lotes_validados(registros, rejeitados, len(linhas) or 1) for e in lote]
+    return elementos, [(primeiro_numero - 1 + numero, erros) for numero, erros in rejeitados]
+
+
+def _expandir_arquivos(padroes):
+    if isinstance(padroes, str):
+        padroes = [padroes]
+
+    arquivos = []
+    for padrao in padroes:
+        encontrados = sorted(glob.glob(padrao)) or ([padrao] if os.path.isfile(padrao) else [])
+        arquivos.extend(a for a in encontrados if a not in arquivos)
+    return arquivos
+
+
+@_invalida_cache
+def ingerir_arquivos(padroes, processos=None, escritores=2, tamanho_bloco=TAMANHO_LOTE_PADRAO, tamanho_fila=8):
+    """
+    Carrega vários CSVs (caminhos ou padrões glob, ex.: 'paar_set_*.csv'). Cada arquivo
+    é dividido em blocos de tamanho_bloco linhas, normalizados em paralelo por um
+    ProcessPoolExecutor; os blocos prontos passam por uma fila limitada a tamanho_fila
+    itens, consumida por threads escritoras que inserem cada bloco com inserir_lote em
+    conexões do pool. Ao final, exibe a vazão de cada arquivo e o tempo total.
+    """
+    arquivos = _expandir_arquivos(padroes)
+    if not arquivos:
+        print("Nenhum arquivo encontrado.")
+        return
+
+    inicio = time.perf_counter()
+    fila = queue.Queue(maxsize=tamanho_fila)
+    estatisticas = {arquivo: {"linhas": 0, "inicio": None, "fim": None} for arquivo in arquivos}
+    rejeitados = {arquivo: [] for arquivo in arquivos}
+    trava = threading.Lock()
+    erros = []
+
+    def escrever():
+        try:
+            with conectar() as conn:
+                with conn.cursor() as cursor:
+                    while (item := fila.get()) is not None:
+                        arquivo, lote = item
+                        if erros:
+                            continue  # Após um erro, apenas esvazia a fila
+
+                        try:
+                            inserir_lote(cursor, lote)
+                            conn.commit()
+                        except ErroBanco as err:
+                            _desfazer(conn)
+                            erros.append((arquivo, err))
+                            continue
+
+                        with trava:
+                            estatisticas[arquivo]["linhas"] += len(lote)
+                            estatisticas[arquivo]["fim"] = time.perf_counter()
+        except ErroBanco as err:
+            erros.append((None, err))
+            while fila.get() is not None:
+                pass
+
+    threads = [threading.Thread(target=escrever, daemon=True) for _ in range(escritores)]
+    for thread in threads:
+        thread.start()
+
+    # Limita os blocos em processamento para manter a memória constante
+    max_em_andamento = (processos or os.cpu_count() or 1) * 2
+    pendentes = collections.deque()
+
+    def enviar_mais_antigo():
+        arquivo, futuro = pendentes.popleft()
+        elementos, recusados = futuro.result()
+        rejeitados[arquivo].extend(recusados)
+        if elementos:
+            fila.put((arquivo, elementos))
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processos) as executor:
+            for arquivo in arquivos:
+                estatisticas[arquivo]["inicio"] = time.perf_counter()
+
+                with open(arquivo, mode='r', encoding='latin-1', newline='') as infile:
+                    reader = csv.reader(infile, delimiter=';')
+                    cabecalho = [normalizar_celula(c) or '' for c in next(reader, [])]
+
+                    numero = 1
+                    while bloco := list(itertools.islice(reader, tamanho_bloco)):
+                        pendentes.append((arquivo, executor.submit(_normalizar_bloco, cabecalho, bloco, numero)))
+                        numero += len(bloco)
+                        while len(pendentes) > max_em_andamento:
+                            enviar_mais_antigo()
+
+            while pendentes:
+                enviar_mais_antigo()
+    finally:
+        for _ in threads:
+            fila.put(None)
+        for thread in threads:
+            thread.join()
+
+    print()
+    for arquivo, dados in estatisticas.items():
+        duracao = (dados["fim"] or dados["inicio"] or inicio) - (dados["inicio"] or inicio)
+        taxa = dados["linhas"] / duracao if duracao > 0 else float(dados["linhas"])
+        print(f"{arquivo}: {dados['linhas']} registros em {duracao:.2f}s ({taxa:.0f} linhas/s)")
+
+    total = sum(dados["linhas"] for dados in estatisticas.values())
+    duracao = time.perf_counter() - inicio
+    logging.info(f"Ingestão paralela de {len(arquivos)} arquivo(s): {total} registros em {duracao:.2f}s.")
+    print(f"Total: {total} registros de {len(arquivos)} arquivo(s) em {duracao:.2f}s")
+
+    for arquivo, recusados in rejeitados.items():
+        _relatar_rejeitados(arquivo, recusados)
+
+    for arquivo, err in erros:
+        logging.error(f"Erro na ingestão paralela ({arquivo or 'conexão'}): {err}")
+        print(f"Erro na ingestão paralela ({arquivo or 'conexão'}): {err}")
+
+
+def _validar_identificador(nome):
+    if not IDENTIFICADOR_SQL.match(nome or ""):
+        raise ValueError(f"Identificador inválido: {nome!r}")
+    return nome
+
+
+@metricas.cronometrado("crud.consultar_tabela")
+def consultar_tabela(nome_tabela, colunas=None, tamanho_pagina=TAMANHO_PAGINA_PADRAO, paginar=False, chave=None):
+    """
+    Exibe as linhas de uma tabela ou view sem materializar o resultado inteiro na memória.
+    Por padrão as linhas vêm de um cursor não bufferizado, lidas em blocos com fetchmany,
+    e a primeira aparece assim que o servidor a envia. Com paginar=True, cada página é
+    uma consulta por faixa da coluna chave (WHERE chave > última exibida), e o usuário
+    avança com Enter. colunas restringe a projeção (None = todas). Sem chave, usa id
+    ou, nas views, a primeira coluna terminada em _id.
+    """
+    try:
+        _validar_identificador(nome_tabela)
+        if chave:
+            _validar_identificador(chave)
+        colunas = [_validar_identificador(c) for c in colunas] if colunas else None
+    except ValueError as err:
+        print(err)
+        return
+
+    projecao = ", ".join(colunas) if colunas else "*"
+
+    try:
+        with conectar() as conn:
+            if paginar:
+                _consultar_tabela_paginada(conn, nome_tabela, colunas, tamanho_pagina, chave)
+                return
+
+            with obter_backend().cursor_streaming(conn) as cursor:
+                cursor.execute(f"SELECT {projecao} FROM {nome_tabela}")
+
+                total = 0
+                while True:
+                    bloco = cursor.fetchmany(tamanho_pagina)
+                    if not bloco:
+                        break
+                    for linha in bloco:
+                        print(linha)
+                    total += len(bloco)
+
+                if total == 0:
+                    print("Tabela vazia.")
+    except ErroBanco as err:
+        logging.error(f"Erro ao consultar tabela {nome_tabela}: {err}")
+        print(f"Erro ao consultar tabela {nome_tabela}: {err}")
+
+
+# Paginação por faixa de chave: cada página custa uma busca no índice, não um OFFSET
+def _consultar_tabela_paginada(conn, nome_tabela, colunas, tamanho_pagina, chave):
+    with conn.cursor() as cursor:
+        # Colunas da tabela, para escolher a chave e saber de onde continuar
+        cursor.execute(f"SELECT * FROM {nome_tabela} LIMIT 0")
+        cursor.fetchall()
+        todas = [d[0] for d in cursor.description]
+        if chave is None:
+            chave = "id" if "id" in todas else next((c for c in todas if c.endswith("_id")), None)
+
+        if colunas and chave and chave not in colunas:
+            colunas = [chave] + colunas
+        projecao = ", ".join(colunas) if colunas else "*"
+        nomes = colunas or todas
+
+        if chave not in todas:
+            print(f"A tabela {nome_tabela} não possui a coluna {chave or 'id'} para paginação.")
+            return
+        posicao_chave = nomes.index(chave)
+
+        ultima = None
+        pagina = 1
+        while True:
+            if ultima is None:
+                cursor.execute(f"SELECT {projecao} FROM {nome_tabela} ORDER BY {chave} LIMIT %s",
+                               (tamanho_pagina,))
+            else:
+                cursor.execute(f"SELECT {projecao} FROM {nome_tabela} WHERE {chave} > %s ORDER BY {chave} LIMIT %s",
+                               (ultima, tamanho_pagina))
+            linhas = cursor.fetchall()
+
+            if not linhas:
+                if pagina == 1:
+                    print("Tabela vazia.")
+                break
+
+            print(f"--- Página {pagina} ---")
+            for linha in linhas:
+                print(linha)
+
+            if len(linhas) < tamanho_pagina:
+                break
+
+            ultima = linhas[-1][posicao_chave]
+            pagina += 1
+            if input("Enter para a próxima página, 'q' para sair: ").strip().lower() == "q":
+                break
+
+
+# Registros no layout do paar_set_2024.csv (mesma ordem de colunas), para exportar_tabela("paar_set", ...)
+CONSULTA_PAAR_SET = """
+    SELECT 
+        Pessoa.sexo, 
+        Localizacao.estado, 
+        Localizacao.cidade, 
+        Pessoa.forca, 
+        Pessoa.posto_graduacao, 
+        Esporte.possui_medalha, 
+        Esporte.modalidade, 
+        Esporte.possui_bolsa, 
+        Esporte.paar
+    FROM 
+        Pessoa
+    LEFT JOIN 
+        Esporte ON Esporte.pessoa_id = Pessoa.id
+    LEFT JOIN 
+        Localizacao ON Localizacao.pessoa_id = Pessoa.id
+    ORDER BY 
+        Pessoa.id
+"""
+
+# Cabeçalho original do paar_set_2024.csv, por campo
+CABECALHO_PAAR_SET = {
+    "sexo": "Sexo",
+    "estado": "Estado",
+    "cidade": "Cidade",
+    "forca": "Força",
+    "posto_graduacao": "Posto Graduação",
+    "possui_medalha": "Possui Medalha de <br /> Mérito Desportivo Militar",
+    "modalidade": "Modalidade",
+    "possui_bolsa": "Possui Bolsa Atleta",
+    "paar": "PAAR"
+}
+
+
+def _ler_filtros(filtros):
+    """Converte ["campo=v1,v2", ...] em {campo: [v1, v2]}."""
+    lidos = {}
+    for filtro in filtros:
+        campo, separador, valores = filtro.partition("=")
+        if not separador:
+            raise ValueError(f"Filtro inválido (use campo=valor[,valor]): {filtro!r}")
+        lidos[campo.strip()] = [v.strip() for v in valores.split(",")]
+    return lidos
+
+
+def _consulta_exportacao(nome_tabela, colunas, filtros):
+    """SQL e parâmetros da exportação: projeção de colunas e WHERE campo IN (...) para cada filtro."""
+    if nome_tabela == "paar_set":
+        origem = f"({CONSULTA_PAAR_SET}) AS paar_set"
+    else:
+        origem = _validar_identificador(nome_tabela)
+
+    projecao = ", ".join(_validar_identificador(c) for c in colunas) if colunas else "*"
+    condicoes, parametros = [], []
+    for campo, valores in (filtros or {}).items():
+        valores = [valores] if isinstance(valores, str) else list(valores)
+        condicoes.append(f"{_validar_identificador(campo)} IN ({', '.join(['%s'] * len(valores))})")
+        parametros.extend(valores)
+
+    consulta = f"SELECT {projecao} FROM {origem}"
+    if condicoes:
+        consulta += " WHERE " + " AND ".join(condicoes)
+    return consulta, tuple(parametros)
+
+
+# "Arquivo" do csv.writer que devolve a linha formatada em vez de gravá-la
+class _LinhaCSV:
+    def write(self, texto):
+        return texto
+
+
+@metricas.cronometrado("exportacao.tabela")
+def exportar_tabela(nome_tabela, arquivo, formato=None, colunas=None, filtros=None, compactar=None,
+                    tamanho_pagina=TAMANHO_BLOCO_PANDAS, codificacao=None):
+    """
+    Grava uma tabela ou view em arquivo, lendo tamanho_pagina linhas por fetchmany de um
+    cursor não bufferizado, de modo que a memória não cresce com a tabela. nome_tabela
+    "paar_set" exporta os registros no layout do paar_set_2024.csv.
+    - formato: "csv" (delimitador ';', latin-1, cabeçalho original do paar_set para os
+      campos do conjunto, como o arquivo oficial) ou "jsonl" (um objeto por linha, UTF-8);
+      sem formato, .jsonl/.json no nome do arquivo escolhe JSON Lines.
+    - colunas: projeção (None = todas); filtros: {coluna: valor ou lista de valores}.
+    - compactar: gzip; sem valor, segue a extensão .gz do arquivo.
+    - codificacao: substitui a padrão do formato (latin-1 no CSV, UTF-8 no JSON Lines);
+      caracteres que ela não representa viram "?" e as linhas afetadas geram um aviso.
+    O arquivo é escrito ao lado com sufixo .parcial e só substitui o destino no final.
+    Retorna a quantidade de linhas exportadas, ou None em caso de erro.
+    """
+    nome_base = arquivo[:-3] if arquivo.endswith(".gz") else arquivo
+    formato = formato or ("jsonl" if nome_base.endswith((".jsonl", ".json")) else "csv")
+    compactar = arquivo.endswith(".gz") if compactar is None else compactar
+    parcial = arquivo + ".parcial"
+    total = substituidas = 0
+    inicio = time.perf_counter()
+
+    try:
+        if formato not in ("csv", "jsonl"):
+            raise ValueError(f"Formato de exportação inválido: {formato!r} (use csv ou jsonl).")
+        consulta, parametros = _consulta_exportacao(nome_tabela, colunas, filtros)
+
+        codificacao = codificacao or ("latin-1" if formato == "csv" else "utf-8")
+        abrir = functools.partial(gzip.open, compresslevel=6) if compactar else open
+        with conectar() as conn, abrir(parcial, "wt", encoding=codificacao, newline="") as saida:
+            with obter_backend().cursor_streaming(conn) as cursor:
+                cursor.execute(consulta, parametros)
+                nomes = [d[0] for d in cursor.description]
+
+                if formato == "csv":
+                    linha_csv = _LinhaCSV()
+                    escritor = csv.writer(linha_csv, delimiter=";")
+                    saida.write(escritor.writerow([CABECALHO_PAAR_SET.get(n, n) for n in nomes]))
+                    formatar = escritor.writerow
+                else:
+                    def formatar(linha):
+                        return json.dumps(dict(zip(nomes, linha)), ensure_ascii=False, default=str) + "\n"
 
-                            lista_elementos = [sexo, forca, posto_graduacao, estado, cidade, modalidade, possui_medalha, possui_bolsa, paar]
-                            novo_elemento(lista_elementos)
+                def gravar(bloco):
+                    nonlocal substituidas
+                    textos = [formatar(linha) for linha in bloco]
+                    # O write codifica antes de gravar: um bloco recusado não deixa nada no arquivo
+                    try:
+                        saida.write("".join(textos))
+                    except UnicodeEncodeError:
+                        for texto in textos:
+                            try:
+                                saida.write(texto)
+                            except UnicodeEncodeError:
+                                saida.write(texto.encode(codificacao, "replace").decode(codificacao))
+                                substituidas += 1
 
-                    conn.commit()
-                    print()
-                    print("Dados carregados com sucesso.")
-    except Error as err:
-        print()
-        logging.error(f"Erro ao carregar CSV: {err}")
-        print(f"Erro ao carregar CSV: {err}")
+                while True:
+                    bloco = cursor.fetchmany(tamanho_pagina)
+                    if not bloco:
+                        break
+                    gravar(bloco)
+                    total += len(bloco)
 
+        os.replace(parcial, arquivo)
+    except ErroBanco + (OSError, ValueError, LookupError) as err:
+        with contextlib.suppress(OSError):
+            os.remove(parcial)
+        logging.error(f"Erro ao exportar {nome_tabela} para {arquivo}: {err}")
+        print(f"Erro ao exportar {nome_tabela}: {err}")
+        return None
 
-def consultar_tabela(nome_tabela):
-    try:
-        with conectar() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(f"SELECT * FROM {nome_tabela}")
-                resultados = cursor.fetchall()
+    duracao = time.perf_counter() - inicio
+    taxa = total / duracao if duracao > 0 else float(total)
+    tamanho = os.path.getsize(arquivo)
+    if substituidas:
+        logging.warning(f"{substituidas} linhas de {nome_tabela} com caracteres fora de {codificacao} "
+                        f"foram exportadas com '?' em '{arquivo}'.")
+        print(f"Aviso: {substituidas} linhas tinham caracteres que {codificacao} não representa (trocados por '?'); "
+              f"use --codificacao utf-8 para preservá-los.")
+    logging.info(f"{nome_tabela} exportada para '{arquivo}': {total} linhas, {tamanho} bytes em {duracao:.2f}s.")
+    print(f"{total} linhas exportadas para '{arquivo}' ({tamanho / 1048576:.1f} MiB) em {duracao:.2f}s "
+          f"({taxa:.0f} linhas/s).")
+    return total
 
-                if(resultados == []):
-                    print("Tabela vazia.")
 
-                for linha in resultados:
-                    print(linha)
-    except Error as err:
-        logging.error(f"Erro ao consultar tabela {nome_tabela}: {err}")
-        print(f"Erro ao consultar tabela {nome_tabela}: {err}")
+def _imprimir_tabelas(tabelas):
+    print("Tabelas disponíveis no banco de dados:")
+    for tabela in tabelas:
+        print(f"- {tabela}")
 
 
 def listar_tabelas():
     try:
         with conectar() as conn:
             with conn.cursor() as cursor:
-                cursor.execute("SHOW TABLES;")
-                tabelas = cursor.fetchall()
+                tabelas = _nomes_tabelas(cursor)
 
-                tabelas = [t for t in tabelas if not t[0].startswith('vw')]
-                
                 if tabelas:
-                    print("Tabelas disponíveis no banco de dados:")
-                    for tabela in tabelas:
-                        print(f"- {tabela[0]}")
+                    _imprimir_tabelas(tabelas)
                 else:
                     print("Nenhuma tabela encontrada no banco de dados.")
-    except Error as err:
+    except ErroBanco as err:
         logging.error(f"Erro ao listar tabelas: {err}")
         print(f"Erro ao listar tabelas: {err}")
 
 
-def consultar_elemento():
-    try:
+# Colunas do registro completo de uma Pessoa, na ordem usada por lista_elementos
+COLUNAS_ELEMENTO = """
+        Pessoa.sexo, 
+        Pessoa.forca, 
+        Pessoa.posto_graduacao, 
+        Localizacao.estado, 
+        Localizacao.cidade, 
+        Esporte.modalidade, 
+        Esporte.possui_medalha, 
+        Esporte.possui_bolsa, 
+        Esporte.paar"""
+
+# As mesmas, mais a versão de Pessoa e os ids das linhas dependentes
+# (None quando Localizacao ou Esporte não existem para essa Pessoa)
+COLUNAS_REGISTRO = COLUNAS_ELEMENTO + """,
+        Pessoa.versao,
+        Localizacao.id,
+        Esporte.id,
+        Pessoa.id"""
+
+
+# Consulta de colunas para o registro de um id (Pessoa.id = %s) ou, com quantidade,
+# para vários de uma vez (Pessoa.id IN (%s, ...))
+def _consulta_registros(colunas, quantidade=None):
+    condicao = "= %s" if quantidade is None else f"IN ({', '.join(['%s'] * quantidade)})"
+    return f"""
+    SELECT {colunas}
+    FROM 
+        Pessoa
+    LEFT JOIN 
+        Esporte ON Esporte.pessoa_id = Pessoa.id
+    LEFT JOIN 
+        Localizacao ON Localizacao.pessoa_id = Pessoa.id
+    WHERE 
+        Pessoa.id {condicao}
+"""
+
+
+CONSULTA_ELEMENTO = _consulta_registros(COLUNAS_ELEMENTO)
+CONSULTA_REGISTRO = _consulta_registros(COLUNAS_REGISTRO)
+
+
+@metricas.cronometrado("crud.buscar_elemento")
+def buscar_elemento(id):
+    """Retorna o registro (sexo, forca, ..., paar) com o id informado, ou None. Leituras repetidas vêm do cache."""
+    def carregar():
         with conectar() as conn:
             with conn.cursor() as cursor:
-                # Entrada do ID com tratamento de erro
-                id = input("Digite o ID do elemento que deseja consultar: ").strip()
+                cursor.execute(CONSULTA_ELEMENTO, (id,))
+                registro = cursor.fetchone()
+                return tuple(registro) if registro is not None else None
 
-                if not id.isdigit():  # Verificar se o ID é numérico
-                    print("ID inválido. Por favor, insira um ID numérico.")
-                    return
-                
-                # Consulta ajustada para evitar repetição do ID
-                cursor.execute("""
-                    SELECT 
-                        Pessoa.sexo, 
-                        Pessoa.forca, 
-                        Pessoa.posto_graduacao, 
-                        Localizacao.estado, 
-                        Localizacao.cidade, 
-                        Esporte.modalidade, 
-                        Esporte.possui_medalha, 
-                        Esporte.possui_bolsa, 
-                        Esporte.paar
-                    FROM 
-                        Pessoa
-                    LEFT JOIN 
-                        Esporte ON Pessoa.id = Esporte.id
-                    LEFT JOIN 
-                        Localizacao ON Pessoa.id = Localizacao.id
-                    WHERE 
-                        Pessoa.id = %s
-                """, (id,))
-                
-                resultado = cursor.fetchone()
+    return _cache_consultas.obter(("elemento", int(id)), carregar)
 
-                if resultado:
-                    print("Resultado encontrado:")
-                    # A ordem de exibição será a mesma do SELECT
-                    print(resultado)
 
-                else:
-                    print("Nenhum resultado encontrado para o ID fornecido.")
+@metricas.cronometrado("crud.buscar_registro")
+def buscar_registro(id):
+    """Retorna (lista_elementos, versao) do registro id, ou None. A conexão é devolvida ao pool logo em seguida."""
+    with conectar() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(CONSULTA_REGISTRO, (id,))
+            registro = cursor.fetchone()
+    if registro is None:
+        return None
+    return list(registro[:9]), registro[9]
+
+
+def consultar_elemento():
+    # Entrada do ID com tratamento de erro
+    id = input("Digite o ID do elemento que deseja consultar: ").strip()
+
+    if not id.isdigit():  # Verificar se o ID é numérico
+        print("ID inválido. Por favor, insira um ID numérico.")
+        return
+
+    try:
+        resultado = buscar_elemento(id)
+
+        if resultado:
+            print("Resultado encontrado:")
+            # A ordem de exibição será a mesma do SELECT
+            print(resultado)
+
+        else:
+            print("Nenhum resultado encontrado para o ID fornecido.")
                     
-    except Error as err:
+    except ErroBanco as err:
         logging.error(f"Erro ao consultar elementos: {err}")
         print(f"Erro ao consultar elementos: {err}")
 
@@ -335,18 +3273,12 @@ def excluir_tabelas():
     try:
         with conectar() as conn:
             with conn.cursor() as cursor:
-
-                listar_tabelas()
+                # Reaproveita a mesma conexão em vez de chamar listar_tabelas()
+                tabelas = _nomes_tabelas(cursor)
+                _imprimir_tabelas(tabelas)
 
                 tabela = input("Digite o nome da tabela que deseja excluir: ").strip()
 
-                cursor.execute("SHOW TABLES;")
-                tabelas = cursor.fetchall()
-
-                tabelas = [t[0] for t in tabelas if not t[0].startswith('vw')]
-
-                print (tabela, tabelas)
-
                 if tabela not in tabelas:
                     print()
                     print("Tabela não encontrada.")
@@ -357,11 +3289,13 @@ def excluir_tabelas():
                 if confirmar in ["sim", "s"]:
                     cursor.execute(f"DROP TABLE IF EXISTS {tabela}")
                     conn.commit()
+                    _dicionarios.limpar()
+                    _cache_consultas.invalidar()
                     print(f"Tabela '{tabela}' excluída com sucesso.")
                 else:
                     print("Operação cancelada.")     
                      
-    except Error as err:
+    except ErroBanco as err:
         logging.error(f"Erro ao excluir tabelas: {err}")
         print(f"Erro ao excluir tabelas: {err}")
 
@@ -376,7 +3310,11 @@ def menu():
         print("5. Limpar tabelas")
         print("6. Excluir tabelas")
         print("7. Fazer CRUD")
-        print("8. Sair")
+        print("8. Relatórios")
+        print("9. Consultor de índices")
+        print("10. Estatísticas de desempenho")
+        print("11. Snapshot colunar")
+        print("12. Sair")
 
         escolha = input("Escolha uma opção: ")
     
@@ -386,19 +3324,70 @@ def menu():
                     criar_tabelas()
                 case "2":
                     nome_arquivo = input("Digite o nome do arquivo CSV: ")
-                    carregar_csv_para_banco(nome_arquivo)
+                    modo = input("Modo de carga: 1. Lotes (padrão) 2. LOAD DATA LOCAL INFILE "
+                                 "3. Vários arquivos em paralelo 4. Sincronização incremental "
+                                 "5. Vetorizada (pandas) 6. Recarga completa em staging (troca atômica): ").strip()
+                    if modo == "6":
+                        recarregar_csv(nome_arquivo)
+                    elif modo == "2":
+                        carregar_csv_load_data(nome_arquivo)
+                    elif modo == "5":
+                        carregar_csv_pandas(nome_arquivo)
+                    elif modo == "4":
+                        sincronizar_csv(nome_arquivo)
+                    elif modo == "3":
+                        # Aceita vários caminhos/padrões glob separados por vírgula
+                        ingerir_arquivos([a.strip() for a in nome_arquivo.split(",") if a.strip()])
+                    else:
+                        carregar_csv_para_banco(nome_arquivo)
                 case "3":
-                    tabela = input("Digite o nome da tabela para consultar: ")
-                    consultar_tabela(tabela)
+                    tabela = input("Digite o nome da tabela para consultar: ").strip()
+                    colunas = input("Colunas separadas por vírgula (Enter para todas): ").strip()
+                    colunas = [c.strip() for c in colunas.split(",") if c.strip()] or None
+                    arquivo = input("Exportar para o arquivo (.csv, .jsonl, com .gz para compactar; "
+                                    "Enter para exibir): ").strip()
+                    if arquivo:
+                        exportar_tabela(tabela, arquivo, colunas=colunas)
+                    else:
+                        paginar = input("Paginar o resultado? (Sim/Não): ").strip().lower() in ["sim", "s"]
+                        consultar_tabela(tabela, colunas=colunas, paginar=paginar)
                 case "4":
                     listar_tabelas()
                 case "5":
-                    limpar_tabelas()
+                    modo = input("Modo de limpeza: 1. Com estimativa de registros (padrão) 2. Rápido, sem contagem "
+                                 "3. Troca por tabelas vazias (sem bloqueio longo): ").strip()
+                    limpar_tabelas({"2": "rapido", "3": "troca"}.get(modo, "estatisticas"))
                 case "6":
                     excluir_tabelas()
                 case "7":
                     fazer_crud()
                 case "8":
+                    nome = input(f"Relatório ({', '.join(RELATORIOS)}): ").strip()
+                    pasta = input("Pasta do snapshot colunar (Enter para ler o banco): ").strip()
+                    if nome not in RELATORIOS:
+                        print("Relatório inválido.")
+                    elif pasta:
+                        exibir_relatorio(nome, "snapshot", pasta)
+                    else:
+                        exibir_relatorio(nome)
+                case "9":
+                    consultor_indices()
+                case "10":
+                    metricas.exibir()
+                    print()
+                    _cache_consultas.exibir()
+                    if input("Zerar as estatísticas? (Sim/Não): ").strip().lower() in ["sim", "s"]:
+                        metricas.metricas.zerar()
+                case "11":
+                    acao = input("1. Exportar o banco para um snapshot 2. Importar um snapshot para o banco: ").strip()
+                    pasta = input("Pasta do snapshot: ").strip()
+                    if acao == "1":
+                        exportar_snapshot(pasta)
+                    elif acao == "2":
+                        importar_snapshot(pasta)
+                    else:
+                        print("Opção inválida!")
+                case "12":
                     print("Saindo...")
                     break
                 case _:
@@ -411,37 +3400,18 @@ def menu():
 
 
 
+@metricas.cronometrado("crud.novo_elemento")
 def novo_elemento(lista_elementos):
 
-    sexo, forca, posto_graduacao, estado, cidade, modalidade, possui_medalha, possui_bolsa, paar = lista_elementos
-
     try:
         with conectar() as conn:
             with conn.cursor() as cursor:
-
-                # if table vazio, then id = 1
-
-                # Inserir em Pessoa
-                cursor.execute("""
-                    INSERT INTO Pessoa (sexo, forca, posto_graduacao)
-                    VALUES (%s, %s, %s)
-                """, (sexo, forca, posto_graduacao))
-
-                # Inserir em Localizacao
-                cursor.execute("""
-                    INSERT INTO Localizacao (estado, cidade)
-                    VALUES (%s, %s)
-                """, (estado, cidade))
-
-                # Inserir em Esporte
-                cursor.execute("""
-                    INSERT INTO Esporte (modalidade, possui_medalha, possui_bolsa, paar)
-                    VALUES (%s, %s, %s, %s)
-                """, (modalidade, possui_medalha, possui_bolsa, paar))
-
+                ids = inserir_lote(cursor, [lista_elementos])
                 conn.commit()
+                _cache_consultas.invalidar(ids=())
+                return ids[0]
 
-    except Error as err:
+    except ErroBanco as err:
         print()
         logging.error(f"Erro ao tentar incluir novo elemento: {err}")
         print(f"Erro ao tentar incluir novo elemento: {err}")
@@ -469,23 +3439,16 @@ def incluir_elemento():
         else:
             print("Sexo inválido. Digite novamente.")
     
-    forcas = ["MB", "FAB", "EB"]
     while(True):
-        forca = input("Força: ").upper()
-        forca = remover_acentos(forca)
-        if forca in forcas:
+        forca = referencia.CANONICOS["forca"].get(referencia.chave(input("Força: ")))
+        if forca:
             break
         else:
             print("Força inválida. Digite novamente.")
 
-    postos_de_graduacao = ["soldado", "cabo", "sargento", "primeiro sargento", "primeiro tenente", "primeiro sargente",
-                            "segundo sargento", "capitao de mar e guerra", 
-                           "subtenente", "tenente", "suboficial", "suboficial r/1", "tenete-coronel r/1",
-                           "capitao", "terceiro sargento", "terceiro sargento r/1", "tenente-coronel", "coronel"]
     while(True):
-        posto_graduacao = input("Posto/Graduação: ").lower()
-        posto_graduacao = remover_acentos(posto_graduacao)
-        if posto_graduacao in postos_de_graduacao:
+        posto_graduacao = referencia.CANONICOS["posto_graduacao"].get(referencia.chave(input("Posto/Graduação: ")))
+        if posto_graduacao:
             break
         else:
             print("Posto/Graduação inválido. Digite novamente.")
@@ -498,19 +3461,9 @@ def incluir_elemento():
     if not cidade:
         cidade = "N/A"
     
-    lista_modalidades = ["apneia", "atletismo", "basquete", "boxe", "canoagem slalom", 
-                             "canoagem velocidade", "ciclismo mtb", "escalada esportiva", "esgrima", 
-                             "futebol", "ginastica artistica", "golfe", "judo", "levantamento de peso", 
-                             "lifesaving", "lutas associadas (wrestling)", "maratona", "maratonas aquaticas",
-                             "nado sincronizado", "natacao", "orientacao", "paraquedismo", "pentatlo militar", 
-                             "pentatlo moderno", "pentatlo naval", "pesca submarina", "taekwondo", "tiro", "tiro com arco",
-                             "triatlo", "vela", "voleibol", "volei de praia"]
-
     while(True):
-        modalidade = input("Digite uma modalidade: ").strip().lower()
-        modalidade = remover_acentos(modalidade)
-
-        if modalidade in [m.lower() for m in lista_modalidades]:
+        modalidade = referencia.CANONICOS["modalidade"].get(referencia.chave(input("Digite uma modalidade: ")))
+        if modalidade:
             break 
         else:
             print("Modalidade inválida. Digite novamente.")
@@ -597,175 +3550,255 @@ def tratar_input(lista_elementos):
 def alterar_elemento():
     id = input("Digite o ID do elemento que deseja alterar: ")
 
+    # Leitura única; nenhuma conexão fica presa enquanto o operador digita
     try:
-        with conectar() as conn:
-            with conn.cursor() as cursor:
-                # Verificar se o ID existe nas tabelas
-                cursor.execute("SELECT * FROM Pessoa WHERE id = %s", (id,))
-                pessoa = cursor.fetchone()
-                
-                if not pessoa:
-                    print("Registro não encontrado.")
-                    return
-
-                # Coletar dados existentes
-                cursor.execute("SELECT * FROM Localizacao WHERE id = %s", (id,))
-                localizacao = cursor.fetchone()
-
-                cursor.execute("SELECT * FROM Esporte WHERE id = %s", (id,))
-                esporte = cursor.fetchone()
+        registro = buscar_registro(id)
+    except ErroBanco as err:
+        logging.error(f"Erro ao alterar registro: {err}")
+        print(f"Erro ao alterar registro: {err}")
+        return
 
-                if not localizacao:
-                    localizacao = ["", "N/A", "N/A"] 
+    if not registro:
+        print("Registro não encontrado.")
+        return
 
+    elementos, versao = registro
 
-                print("\nDigite os novos valores ou pressione Enter para manter os atuais.")
+    # Localizacao ou Esporte ausentes aparecem como None no LEFT JOIN
+    atual = [valor if valor is not None else padrao for valor, padrao in zip(elementos, PADROES_ELEMENTO)]
 
-                # Coletar e validar as entradas para os campos
-                while True:
-                    sexo = input(f"Sexo [{pessoa[1]}]: ").strip() or pessoa[1]
-                    if sexo in ["masculino", "Masculino", "M", "m"]:
-                        sexo = "Masculino"
-                        break
-                    elif sexo in ["feminino", "Feminino", "F", "f"]:
-                        sexo = "Feminino"
-                        break
-                    elif sexo == pessoa[1]:  # Caso o usuário queira manter o valor
-                        break
-                    else:
-                        print("Sexo inválido. Digite novamente.")
+    print("\nDigite os novos valores ou pressione Enter para manter os atuais.")
 
-                forcas = ["MB", "FAB", "EB"]
-                while True:
-                    forca = input(f"Força [{pessoa[2]}]: ").upper().strip() or pessoa[2]
-                    forca = remover_acentos(forca)
-                    if forca in forcas:
-                        break
-                    elif forca == pessoa[2]:  # Caso o usuário queira manter o valor
-                        break
-                    else:
-                        print("Força inválida. Digite novamente.")
+    # Coletar e validar as entradas para os campos
+    while True:
+        sexo = input(f"Sexo [{atual[0]}]: ").strip() or atual[0]
+        if sexo in ["masculino", "Masculino", "M", "m"]:
+            sexo = "Masculino"
+            break
+        elif sexo in ["feminino", "Feminino", "F", "f"]:
+            sexo = "Feminino"
+            break
+        elif sexo == atual[0]:  # Caso o usuário queira manter o valor
+            break
+        else:
+            print("Sexo inválido. Digite novamente.")
 
-                postos_de_graduacao = ["soldado", "cabo", "sargento", "primeiro sargento", "primeiro tenente", "primeiro sargente",
-                                       "segundo sargento", "capitao de mar e guerra", "subtenente", "tenente", "suboficial", 
-                                       "suboficial r/1", "tenete-coronel r/1", "capitao", "terceiro sargento", 
-                                       "terceiro sargento r/1", "tenente-coronel", "coronel"]
-                while True:
-                    posto_graduacao = input(f"Posto/Graduação [{pessoa[3]}]: ").lower().strip() or pessoa[3]
-                    posto_graduacao = remover_acentos(posto_graduacao)
-                    if posto_graduacao in postos_de_graduacao:
-                        break
-                    elif posto_graduacao == pessoa[3]:  # Caso o usuário queira manter o valor
-                        break
-                    else:
-                        print("Posto/Graduação inválido. Digite novamente.")
+    while True:
+        forca = input(f"Força [{atual[1]}]: ").strip() or atual[1]
+        if forca == atual[1]:  # Caso o usuário queira manter o valor
+            break
+        forca = referencia.canonizar("forca", forca)
+        if forca:
+            break
+        else:
+            print("Força inválida. Digite novamente.")
 
-                estado = input(f"Estado [{localizacao[1]}]: ").strip() or (localizacao[1] if localizacao[1] else "N/A")
-                cidade = input(f"Cidade [{localizacao[2]}]: ").strip() or (localizacao[2] if localizacao[2] else "N/A")
-                
-                lista_modalidades = ["apneia", "atletismo", "basquete", "boxe", "canoagem slalom", "canoagem velocidade", 
-                                     "ciclismo mtb", "escalada esportiva", "esgrima", "futebol", "ginastica artistica", 
-                                     "golfe", "judo", "levantamento de peso", "lifesaving", "lutas associadas (wrestling)", 
-                                     "maratona", "maratonas aquaticas", "nado sincronizado", "natacao", "orientacao", 
-                                     "paraquedismo", "pentatlo militar", "pentatlo moderno", "pentatlo naval", 
-                                     "pesca submarina", "taekwondo", "tiro", "tiro com arco", "triatlo", "vela", 
-                                     "voleibol", "volei de praia"]
+    while True:
+        posto_graduacao = input(f"Posto/Graduação [{atual[2]}]: ").strip() or atual[2]
+        if posto_graduacao == atual[2]:  # Caso o usuário queira manter o valor
+            break
+        posto_graduacao = referencia.canonizar("posto_graduacao", posto_graduacao)
+        if posto_graduacao:
+            break
+        else:
+            print("Posto/Graduação inválido. Digite novamente.")
 
-                while True:
-                    modalidade = input(f"Modalidade [{esporte[1]}]: ").strip().lower() or esporte[1]
-                    modalidade = remover_acentos(modalidade)
-                    if modalidade in [m.lower() for m in lista_modalidades] or modalidade == esporte[1]:
-                        break
-                    else:
-                        print("Modalidade inválida. Digite novamente.")
+    estado = input(f"Estado [{atual[3]}]: ").strip() or atual[3]
+    cidade = input(f"Cidade [{atual[4]}]: ").strip() or atual[4]
+    
+    while True:
+        modalidade = input(f"Modalidade [{atual[5]}]: ").strip() or atual[5]
+        if modalidade == atual[5]:  # Caso o usuário queira manter o valor
+            break
+        modalidade = referencia.canonizar("modalidade", modalidade)
+        if modalidade:
+            break
+        else:
+            print("Modalidade inválida. Digite novamente.")
 
-                while True:
-                    possui_medalha = input(f"Possui medalha de mérito desportivo militar (Sim/Não) [{esporte[2]}]: ").strip() or esporte[2]
-                    if possui_medalha in ["Sim", "sim", "S", "s"]:
-                        possui_medalha = "Sim"
-                        break
-                    elif possui_medalha in ["Não", "não", "N", "n"]:
-                        possui_medalha = "Não"
-                        break
-                    elif possui_medalha == esporte[2]:  # Caso o usuário queira manter o valor
-                        break
-                    else:
-                        print("Opção inválida. Digite novamente.")
+    while True:
+        possui_medalha = input(f"Possui medalha de mérito desportivo militar (Sim/Não) [{atual[6]}]: ").strip() or atual[6]
+        if possui_medalha in ["Sim", "sim", "S", "s"]:
+            possui_medalha = "Sim"
+            break
+        elif possui_medalha in ["Não", "não", "N", "n"]:
+            possui_medalha = "Não"
+            break
+        elif possui_medalha == atual[6]:  # Caso o usuário queira manter o valor
+            break
+        else:
+            print("Opção inválida. Digite novamente.")
 
-                while True:
-                    possui_bolsa = input(f"Possui bolsa atleta (Sim/Não) [{esporte[3]}]: ").strip() or esporte[3]
-                    if possui_bolsa in ["Sim", "sim", "S", "s"]:
-                        possui_bolsa = "Sim"
-                        break
-                    elif possui_bolsa in ["Não", "não", "N", "n"]:
-                        possui_bolsa = "Não"
-                        break
-                    elif possui_bolsa == esporte[3]:  # Caso o usuário queira manter o valor
-                        break
-                    else:
-                        print("Opção inválida. Digite novamente.")
+    while True:
+        possui_bolsa = input(f"Possui bolsa atleta (Sim/Não) [{atual[7]}]: ").strip() or atual[7]
+        if possui_bolsa in ["Sim", "sim", "S", "s"]:
+            possui_bolsa = "Sim"
+            break
+        elif possui_bolsa in ["Não", "não", "N", "n"]:
+            possui_bolsa = "Não"
+            break
+        elif possui_bolsa == atual[7]:  # Caso o usuário queira manter o valor
+            break
+        else:
+            print("Opção inválida. Digite novamente.")
 
-                while True:
-                    paar = input(f"PAAR (Sim/Não) [{esporte[4]}]: ").strip() or esporte[4]
-                    if paar in ["Sim", "sim", "S", "s"]:
-                        paar = "Sim"
-                        break
-                    elif paar in ["Não", "não", "N", "n"]:
-                        paar = "Não"
-                        break
-                    elif paar == esporte[4]:  # Caso o usuário queira manter o valor
-                        break
-                    else:
-                        print("Opção inválida. Digite novamente.")
-
-                # Atualizar os valores no banco
-                cursor.execute("""
-                    UPDATE Pessoa
-                    SET sexo = %s, forca = %s, posto_graduacao = %s
-                    WHERE id = %s
-                """, (sexo, forca, posto_graduacao, id))
-
-                print(estado, cidade)
-         
-                cursor.execute("""
-                    UPDATE Localizacao
-                    SET estado = %s, cidade = %s
-                    WHERE id = %s       
-                """, (estado, cidade, id))
-
-                cursor.execute("""
-                    UPDATE Esporte
-                    SET modalidade = %s, possui_medalha = %s, possui_bolsa = %s, paar = %s
-                    WHERE id = %s
-                """, (modalidade, possui_medalha, possui_bolsa, paar, id))
+    while True:
+        paar = input(f"PAAR (Sim/Não) [{atual[8]}]: ").strip() or atual[8]
+        if paar in ["Sim", "sim", "S", "s"]:
+            paar = "Sim"
+            break
+        elif paar in ["Não", "não", "N", "n"]:
+            paar = "Não"
+            break
+        elif paar == atual[8]:  # Caso o usuário queira manter o valor
+            break
+        else:
+            print("Opção inválida. Digite novamente.")
 
-                conn.commit()
-                print()
-                print("Registro atualizado com sucesso.")
-    
-    except Error as err:
+    # Grava em uma transação curta, desde que ninguém tenha alterado o registro nesse meio tempo
+    try:
+        if atualizar_elemento(id, [sexo, forca, posto_graduacao, estado, cidade,
+                                   modalidade, possui_medalha, possui_bolsa, paar], versao):
+            print()
+            print("Registro atualizado com sucesso.")
+        else:
+            print()
+            print("O registro foi alterado ou excluído por outro usuário durante a edição. "
+                  "Nenhuma alteração foi gravada; consulte-o novamente.")
+    except ErroBanco + (ValueError,) as err:
         logging.error(f"Erro ao alterar registro: {err}")
         print(f"Erro ao alterar registro: {err}")
 
 
-def excluir_elemento():
-    id = input("ID do registro a ser excluído: ")
+# Valida os campos de lista_elementos que mudaram em relação ao registro gravado. Valores
+# mantidos passam como estão, inclusive os de PADROES_ELEMENTO de uma Localizacao ou Esporte
+# ausente e valores antigos fora da forma canônica; os alterados são canonizados.
+def _validar_alteracao(anterior, lista_elementos):
+    elementos = list(lista_elementos)
+    recusados = {}
+    for i, campo in enumerate(CAMPOS_ELEMENTO):
+        mantido = elementos[i] == (anterior[i] if anterior[i] is not None else PADROES_ELEMENTO[i])
+        if campo in referencia.CANONICOS and not mantido:
+            canonico = referencia.canonizar(campo, elementos[i])
+            if canonico is None:
+                recusados[campo] = elementos[i]
+            else:
+                elementos[i] = canonico
 
-    try:
-        with conectar() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("DELETE FROM Pessoa WHERE id = %s", (id,))
-                cursor.execute("DELETE FROM Localizacao WHERE id = %s", (id,))
-                cursor.execute("DELETE FROM Esporte WHERE id = %s", (id,))
+    if recusados:
+        raise ValueError(f"Valores inválidos: {recusados}")
+    return elementos
 
-                # Atualiza os IDs das tabelas relacionadas
-                cursor.execute("UPDATE Pessoa SET id = id - 1 WHERE id > %s", (id,))
-                cursor.execute("UPDATE Localizacao SET id = id - 1 WHERE id > %s", (id,))
-                cursor.execute("UPDATE Esporte SET id = id - 1 WHERE id > %s", (id,))
 
-                conn.commit()
-                print("Registro excluído com sucesso.")
-    except Error as err:
+def _atualizar_registro(cursor, id, lista_elementos, versao=None):
+    """
+    Grava lista_elementos no registro id com controle otimista de concorrência: a
+    versão de Pessoa só avança se ainda for a lida (ou a informada em versao).
+    Retorna False, sem alterar nada, se o registro sumiu ou mudou nesse meio tempo;
+    ValueError se um campo alterado for inválido (_validar_alteracao).
+    """
+    # Valores anteriores, para ajustar as tabelas de resumo
+    cursor.execute(CONSULTA_REGISTRO, (id,))
+    registro = cursor.fetchone()
+    if registro is None:
+        return False
+
+    anterior = registro[:9]
+    esperada = registro[9] if versao is None else versao
+    existentes = (True, registro[10] is not None, registro[11] is not None)
+
+    lista_elementos = _validar_alteracao(anterior, lista_elementos)
+    valores = _valores_fisicos(cursor, [lista_elementos])[0]
+    (tabela_pessoa, colunas, posicoes), *dependentes = _tabelas_registro()
+
+    atribuicoes = ", ".join(f"{c} = %s" for c in colunas)
+    cursor.execute(f"""
+        UPDATE {tabela_pessoa}
+        SET {atribuicoes}, versao = versao + 1
+        WHERE id = %s AND versao = %s
+    """, tuple(valores[p] for p in posicoes) + (id, esperada))
+    if cursor.rowcount == 0:
+        return False
+
+    for (tabela, colunas, posicoes), existe in zip(dependentes, existentes[1:]):
+        dados = tuple(valores[p] for p in posicoes)
+        if existe:
+            atribuicoes = ", ".join(f"{c} = %s" for c in colunas)
+            cursor.execute(f"UPDATE {tabela} SET {atribuicoes} WHERE pessoa_id = %s", dados + (id,))
+        else:
+            # Registros antigos sem Localizacao/Esporte ganham a linha que faltava
+            marcadores = ", ".join(["%s"] * (len(colunas) + 1))
+            cursor.execute(f"INSERT INTO {tabela} (pessoa_id, {', '.join(colunas)}) VALUES ({marcadores})",
+                           (id,) + dados)
+
+    delta = DeltaResumos()
+    delta.adicionar(anterior, -1)
+    delta.adicionar(lista_elementos)
+    delta.gravar(cursor)
+    return True
+
+
+@metricas.cronometrado("crud.atualizar_elemento")
+def atualizar_elemento(id, lista_elementos, versao=None):
+    """
+    Grava os valores de lista_elementos no registro id, sem interação com o usuário.
+    Com versao, só grava se o registro ainda estiver nessa versão. Retorna True se gravou.
+    Os campos alterados são validados (ValueError se algum for recusado).
+    """
+    with conectar() as conn:
+        with conn.cursor() as cursor:
+            if not _atualizar_registro(cursor, id, lista_elementos, versao):
+                _desfazer(conn)
+                return False
+            conn.commit()
+            _cache_consultas.invalidar([id])
+            return True
+
+
+@metricas.cronometrado("crud.remover_elemento")
+def remover_elemento(id):
+    """Exclui o registro id; retorna False se ele não existir."""
+    with conectar() as conn:
+        with conn.cursor() as cursor:
+            removidos = _remover_pessoas(cursor, [id])
+            conn.commit()
+            _cache_consultas.invalidar([id])
+            return removidos > 0
+
+
+# Exclui os registros de Pessoa informados e desconta-os das tabelas de resumo
+def _remover_pessoas(cursor, ids):
+    marcadores = ", ".join(["%s"] * len(ids))
+    cursor.execute(_consulta_registros(COLUNAS_ELEMENTO, len(ids)), tuple(ids))
+    anteriores = cursor.fetchall()
+    if not anteriores:
+        return 0
+
+    # Localizacao e Esporte são removidos pelo ON DELETE CASCADE;
+    # os ids dos demais registros não mudam
+    cursor.execute(f"DELETE FROM {_tabela_pessoa()} WHERE id IN ({marcadores})", tuple(ids))
+
+    delta = DeltaResumos()
+    for anterior in anteriores:
+        delta.adicionar(anterior, -1)
+    delta.gravar(cursor)
+
+    return len(anteriores)
+
+
+def excluir_elemento():
+    id = input("ID do registro a ser excluído: ").strip()
+
+    if not id.isdigit():
+        print("ID inválido. Por favor, insira um ID numérico.")
+        return
+
+    try:
+        if remover_elemento(id):
+            print("Registro excluído com sucesso.")
+        else:
+            print("Registro não encontrado.")
+    except ErroBanco as err:
         print()
         logging.error(f"Erro ao excluir registro: {err}")
         print(f"Erro ao excluir registro: {err}")
@@ -773,5 +3806,394 @@ def excluir_elemento():
 
 
 
+class ConflitoVersao(Exception):
+    """Registros de um lote que foram alterados por outro usuário depois de lidos."""
+
+    def __init__(self, ids):
+        self.ids = sorted(ids)
+        super().__init__(f"versão divergente nos registros {self.ids}")
+
+
+class AlteracaoRecusada(ValueError):
+    """Inclusões e alterações de um lote com valores fora do padrão de referência."""
+
+    def __init__(self, recusas):
+        self.recusas = recusas
+        super().__init__("valores inválidos:\n  " + "\n  ".join(recusas))
+
+
+# Canoniza os valores de inclusões e alterações; AlteracaoRecusada lista cada linha ou id recusado
+def _validar_alteracoes(alteracoes):
+    incluir, invalidos = referencia.validar_lote(alteracoes["incluir"])
+    recusas = [f"inclusão {posicao + 1}: {campos}" for posicao, campos in invalidos]
+
+    alterar = []
+    for id, campos, versao in alteracoes["alterar"]:
+        campos = dict(campos)
+        recusados = {}
+        for campo, valor in campos.items():
+            if campo in referencia.CANONICOS:
+                campos[campo] = referencia.canonizar(campo, valor)
+                if campos[campo] is None:
+                    recusados[campo] = valor
+        if recusados:
+            recusas.append(f"alteração do id {id}: {recusados}")
+        alterar.append((id, campos, versao))
+
+    if recusas:
+        raise AlteracaoRecusada(recusas)
+    return dict(alteracoes, incluir=incluir, alterar=alterar)
+
+
+# Registros atuais (CONSULTA_REGISTRO) dos ids informados, indexados por id
+def _buscar_registros(cursor, ids, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    registros = {}
+    ids = list(ids)
+    for i in range(0, len(ids), tamanho_lote):
+        parte = ids[i:i + tamanho_lote]
+        cursor.execute(_consulta_registros(COLUNAS_REGISTRO, len(parte)), tuple(parte))
+        for registro in cursor.fetchall():
+            registros[registro[12]] = registro
+    return registros
+
+
+# Atualiza vários registros com um UPDATE por tabela a partir de uma tabela temporária
+def _atualizar_registros(cursor, alteracoes, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    backend = obter_backend()
+    atuais = _buscar_registros(cursor, [id for id, _, _ in alteracoes], tamanho_lote)
+
+    ausentes = [id for id, _, _ in alteracoes if id not in atuais]
+    if ausentes:
+        raise ConflitoVersao(ausentes)
+
+    novos, esperadas = {}, {}
+    for id, campos, versao in alteracoes:
+        # Campos não informados mantêm o valor atual
+        elementos = [v if v is not None else p for v, p in zip(atuais[id][:9], PADROES_ELEMENTO)]
+        for campo, valor in campos.items():
+            elementos[CAMPOS_ELEMENTO.index(campo)] = valor
+        novos[id] = elementos
+        esperadas[id] = atuais[id][9] if versao is None else versao
+
+    ids = list(novos)
+    valores = dict(zip(ids, _valores_fisicos(cursor, [novos[id] for id in ids])))
+    (tabela_pessoa, colunas, posicoes), *dependentes = _tabelas_registro()
+
+    backend.tabela_temporaria(cursor, "tmp_alteracao", tabela_pessoa, ("id",) + colunas + ("versao",))
+    backend.inserir_em_massa(cursor, "tmp_alteracao", ("id",) + colunas + ("versao",),
+                             [(id,) + tuple(valores[id][p] for p in posicoes) + (esperadas[id],) for id in ids])
+
+    # As versões são conferidas antes de qualquer UPDATE: um conflito não deixa escrita a desfazer
+    cursor.execute(f"""
+        SELECT s.id FROM tmp_alteracao s JOIN {tabela_pessoa} t ON t.id = s.id
+        WHERE t.versao <> s.versao
+    """)
+    divergentes = [linha[0] for linha in cursor.fetchall()]
+    if divergentes:
+        backend.descartar_temporaria(cursor, "tmp_alteracao")
+        raise ConflitoVersao(divergentes)
+
+    backend.atualizar_de(cursor, tabela_pessoa, "tmp_alteracao", "id", colunas, "t.versao = s.versao")
+
+    # Comparar e trocar em lote: toda versão que ainda bate avança de uma unidade (a conferência
+    # abaixo pega quem alterou o registro entre a leitura acima e o UPDATE)
+    cursor.execute(f"""
+        UPDATE {tabela_pessoa} SET versao = versao + 1
+        WHERE id IN (SELECT id FROM tmp_alteracao)
+    """)
+    cursor.execute(f"""
+        SELECT s.id FROM tmp_alteracao s JOIN {tabela_pessoa} t ON t.id = s.id
+        WHERE t.versao <> s.versao + 1
+    """)
+    divergentes = [linha[0] for linha in cursor.fetchall()]
+    backend.descartar_temporaria(cursor, "tmp_alteracao")
+    if divergentes:
+        raise ConflitoVersao(divergentes)
+
+    for indice, (tabela, colunas, posicoes) in enumerate(dependentes, start=1):
+        existentes = [id for id in ids if atuais[id][9 + indice] is not None]
+        faltantes = [id for id in ids if atuais[id][9 + indice] is None]
+
+        if existentes:
+            backend.tabela_temporaria(cursor, "tmp_alteracao", tabela, ("pessoa_id",) + colunas)
+            backend.inserir_em_massa(cursor, "tmp_alteracao", ("pessoa_id",) + colunas,
+                                     [(id,) + tuple(valores[id][p] for p in posicoes) for id in existentes])
+            backend.atualizar_de(cursor, tabela, "tmp_alteracao", "pessoa_id", colunas)
+            backend.descartar_temporaria(cursor, "tmp_alteracao")
+
+        if faltantes:
+            # Registros antigos sem Localizacao/Esporte ganham a linha que faltava
+            backend.inserir_em_massa(cursor, tabela, ("pessoa_id",) + colunas,
+                                     [(id,) + tuple(valores[id][p] for p in posicoes) for id in faltantes])
+
+    delta = DeltaResumos()
+    for id in ids:
+        delta.adicionar(atuais[id][:9], -1)
+        delta.adicionar(novos[id])
+    delta.gravar(cursor)
+    return len(ids)
+
+
+@metricas.cronometrado("lote.aplicar_alteracoes")
+@_invalida_cache
+def aplicar_alteracoes(alteracoes, tamanho_lote=TAMANHO_LOTE_PADRAO, simular=False):
+    """
+    Aplica um conjunto de alterações em uma única transação, com SQL em lote para cada
+    tipo de operação. alteracoes é o dicionário devolvido por ler_alteracoes:
+    incluir (listas de elementos), alterar ((id, campos, versao)), excluir (ids) e
+    consultar (ids). Com simular=True tudo é executado e desfeito no final.
+    Os valores são validados antes de qualquer escrita: AlteracaoRecusada traz cada
+    inclusão ou alteração recusada. Se algum registro alterado não existir ou estiver
+    em outra versão, ConflitoVersao é levantada e a transação é desfeita quando a
+    conexão volta ao pool.
+    """
+    alteracoes = _validar_alteracoes(alteracoes)
+    resultado = {"incluidos": [], "alterados": 0, "excluidos": 0, "registros": {}}
+
+    with conectar() as conn:
+        with conn.cursor() as cursor:
+            if alteracoes["alterar"]:
+                resultado["alterados"] = _atualizar_registros(cursor, alteracoes["alterar"], tamanho_lote)
+
+            excluir = alteracoes["excluir"]
+            for i in range(0, len(excluir), tamanho_lote):
+                resultado["excluidos"] += _remover_pessoas(cursor, excluir[i:i + tamanho_lote])
+
+            incluir = alteracoes["incluir"]
+            for i in range(0, len(incluir), tamanho_lote):
+                resultado["incluidos"] += inserir_lote(cursor, incluir[i:i + tamanho_lote])
+
+            # As consultas enxergam o resultado das operações acima
+            registros = _buscar_registros(cursor, alteracoes["consultar"], tamanho_lote)
+            resultado["registros"] = {
+                id: dict(zip(CAMPOS_ELEMENTO + ("versao",), registros[id][:10])) if id in registros else None
+                for id in alteracoes["consultar"]
+            }
+
+            if simular:
+                _desfazer(conn)
+            else:
+                conn.commit()
+
+    return resultado
+
+
+# Converte um registro do arquivo de alterações nos campos informados (vazios são ignorados)
+def _campos_alteracao(registro):
+    campos = {}
+    for campo in CAMPOS_ELEMENTO:
+        valor = registro.get(campo)
+        if valor is not None and str(valor).strip() != "":
+            campos[campo] = str(valor).strip()
+    return campos
+
+
+def _ids_alteracao(valores, origem):
+    try:
+        return [int(v) for v in valores]
+    except (TypeError, ValueError):
+        raise ValueError(f"id inválido em {origem}: {valores!r}")
+
+
+def ler_alteracoes(caminho):
+    """
+    Lê um arquivo de alterações em JSON ou CSV (pela extensão).
+
+    JSON: {"incluir": [{campo: valor}], "alterar": [{"id": 1, "versao": 0, campo: valor}],
+           "excluir": [ids], "consultar": [ids]}
+    CSV (delimitador ';'): colunas operacao, id, versao e os campos de CAMPOS_ELEMENTO,
+    com operacao igual a incluir, alterar, excluir ou consultar.
+    """
+    if caminho.lower().endswith(".csv"):
+        with open(caminho, mode="r", encoding="utf-8", newline="") as f:
+            operacoes = {"incluir": [], "alterar": [], "excluir": [], "consultar": []}
+            for numero, linha in enumerate(csv.DictReader(f, delimiter=";"), start=2):
+                operacao = (linha.get("operacao") or "").strip().lower()
+                if operacao not in operacoes:
+                    raise ValueError(f"linha {numero}: operação inválida {operacao!r}")
+                if operacao in ("excluir", "consultar"):
+                    operacoes[operacao].append(linha.get("id"))
+                else:
+                    operacoes[operacao].append(linha)
+    else:
+        with open(caminho, mode="r", encoding="utf-8") as f:
+            operacoes = json.load(f)
+
+    alteracoes = {"incluir": [], "alterar": [], "excluir": [], "consultar": []}
+
+    for registro in operacoes.get("incluir", []):
+        campos = _campos_alteracao(registro)
+        if not (campos.get("sexo") and campos.get("modalidade")):
+            raise ValueError(f"inclusão sem sexo ou modalidade: {registro!r}")
+        campos.setdefault("possui_medalha", "Não")
+        campos.setdefault("possui_bolsa", "Não")
+        campos.setdefault("paar", "Não")
+        alteracoes["incluir"].append(tratar_input([campos.get(c, "") for c in CAMPOS_ELEMENTO]))
+
+    # Os valores só são validados por aplicar_alteracoes; aqui se confere a estrutura
+    for registro in operacoes.get("alterar", []):
+        id = _ids_alteracao([registro.get("id")], "alterar")[0]
+        versao = registro.get("versao")
+        try:
+            versao = None if versao in (None, "") else int(versao)
+        except (TypeError, ValueError):
+            raise ValueError(f"versão inválida no id {id}: {versao!r}")
+        alteracoes["alterar"].append((id, _campos_alteracao(registro), versao))
+
+    alteracoes["excluir"] = _ids_alteracao(operacoes.get("excluir", []), "excluir")
+    alteracoes["consultar"] = _ids_alteracao(operacoes.get("consultar", []), "consultar")
+    return alteracoes
+
+
+def executar_lote(arquivo, simular=False, saida=None, tamanho_lote=TAMANHO_LOTE_PADRAO):
+    try:
+        alteracoes = ler_alteracoes(arquivo)
+    except (OSError, ValueError) as err:
+        print(f"Arquivo de alterações inválido: {err}")
+        return
+
+    try:
+        inicio = time.perf_counter()
+        resultado = aplicar_alteracoes(alteracoes, tamanho_lote, simular)
+        duracao = time.perf_counter() - inicio
+    except AlteracaoRecusada as err:
+        logging.error(f"Lote '{arquivo}' recusado: {err}")
+        print(f"Lote recusado, nenhuma alteração gravada: {err}")
+        return
+    except ConflitoVersao as err:
+        logging.error(f"Lote '{arquivo}' não aplicado: {err}")
+        print(f"Nenhuma alteração gravada: {err}")
+        return
+    except ErroBanco as err:
+        logging.error(f"Erro ao aplicar lote '{arquivo}': {err}")
+        print(f"Erro ao aplicar lote: {err}")
+        return
+
+    situacao = "simulado (nada gravado)" if simular else "aplicado"
+    logging.info(f"Lote '{arquivo}' {situacao}: {len(resultado['incluidos'])} incluídos, "
+                 f"{resultado['alterados']} alterados, {resultado['excluidos']} excluídos em {duracao:.2f}s.")
+    print(f"Lote {situacao} em {duracao:.2f}s: {len(resultado['incluidos'])} incluídos, "
+          f"{resultado['alterados']} alterados, {resultado['excluidos']} excluídos.")
+
+    if saida:
+        with open(saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"Resultado gravado em {saida}.")
+    else:
+        for id, registro in resultado["registros"].items():
+            print(f"{id}: {registro if registro else 'não encontrado'}")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Sistema de gestão do PAAR. Sem subcomando, abre o menu interativo.")
+    parser.add_argument("--estatisticas", action="store_true",
+                        help="exibe latências (p50/p95/p99), linhas por operação e o uso do cache ao terminar")
+    subcomandos = parser.add_subparsers(dest="comando")
+
+    parser_relatorio = subcomandos.add_parser("relatorio", help="exibe relatórios agregados")
+    parser_relatorio.add_argument("nome", choices=list(RELATORIOS) + ["todos"])
+    parser_relatorio.add_argument("--origem", choices=("resumo", "views", "snapshot"), default="resumo",
+                                  help="ler as tabelas de resumo (padrão), agregar as views na hora "
+                                       "ou agregar um snapshot colunar (--snapshot)")
+    parser_relatorio.add_argument("--snapshot", metavar="PASTA", help="pasta do snapshot colunar")
+    parser_relatorio.add_argument("--filtro", action="append", default=[], metavar="CAMPO=VALOR[,VALOR]",
+                                  help="restringe o relatório sobre o snapshot (pode ser repetido)")
+    parser_relatorio.add_argument("--recalcular", action="store_true",
+                                  help="reconstrói as tabelas de resumo antes de exibir")
+
+    subcomandos.add_parser("indices", help="executa o consultor de índices (EXPLAIN das consultas padrão)")
+
+    parser_sincronizar = subcomandos.add_parser("sincronizar",
+                                                help="recarga incremental: insere só as linhas novas de cada CSV")
+    parser_sincronizar.add_argument("arquivos", nargs="+")
+    parser_sincronizar.add_argument("--marcar-ausentes", action="store_true",
+                                    help="marca as linhas que sumiram do arquivo (Carga_impressao.ausente) em vez de "
+                                         "excluí-las; elas continuam nas consultas e nos resumos")
+    parser_sincronizar.add_argument("--forcar", action="store_true",
+                                    help="sincroniza mesmo que o checksum do arquivo não tenha mudado")
+    parser_sincronizar.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE_PADRAO)
+
+    parser_exportar = subcomandos.add_parser("exportar", help="exporta uma tabela ou view para CSV ou JSON Lines")
+    parser_exportar.add_argument("tabela", help="tabela, view (vw_*) ou paar_set (layout do CSV oficial)")
+    parser_exportar.add_argument("arquivo", help="arquivo de saída; .gz compacta e .jsonl escolhe JSON Lines")
+    parser_exportar.add_argument("--formato", choices=("csv", "jsonl"))
+    parser_exportar.add_argument("--colunas", help="colunas separadas por vírgula (padrão: todas)")
+    parser_exportar.add_argument("--filtro", action="append", default=[], metavar="COLUNA=VALOR[,VALOR]",
+                                 help="mantém só as linhas com um dos valores (pode ser repetido)")
+    parser_exportar.add_argument("--gzip", action="store_true", default=None, help="compacta com gzip")
+    parser_exportar.add_argument("--tamanho-pagina", type=int, default=TAMANHO_BLOCO_PANDAS)
+    parser_exportar.add_argument("--codificacao", help="codificação do arquivo (padrão: latin-1 no CSV, utf-8 no JSON Lines)")
+
+    parser_snapshot = subcomandos.add_parser("snapshot", help="exporta ou importa o snapshot colunar (requer numpy)")
+    parser_snapshot.add_argument("acao", choices=("exportar", "importar"))
+    parser_snapshot.add_argument("pasta")
+    parser_snapshot.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE_PADRAO,
+                                 help="linhas por commit na importação")
+
+    parser_recarregar = subcomandos.add_parser("recarregar",
+                                               help="substitui todos os dados pelos do CSV, carregado em tabelas "
+                                                    "de staging e promovido com uma troca atômica")
+    parser_recarregar.add_argument("arquivo")
+    parser_recarregar.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE_PADRAO)
+
+    parser_limpar = subcomandos.add_parser("limpar", help="esvazia as tabelas (os dados de referência são mantidos)")
+    parser_limpar.add_argument("--modo", choices=list(MODOS_LIMPEZA), default="estatisticas",
+                               help="; ".join(f"{modo}: {descricao}" for modo, descricao in MODOS_LIMPEZA.items()))
+
+    parser_lote = subcomandos.add_parser("lote",
+                                         help="aplica um arquivo de alterações (JSON ou CSV) em uma transação")
+    parser_lote.add_argument("arquivo", help="inclusões, alterações, exclusões e consultas por id")
+    parser_lote.add_argument("--simular", action="store_true", help="executa tudo e desfaz no final")
+    parser_lote.add_argument("--saida", help="grava o resultado (ids incluídos e registros consultados) em JSON")
+    parser_lote.add_argument("--tamanho-lote", type=int, default=TAMANHO_LOTE_PADRAO)
+
+    args = parser.parse_args(argv)
+
+    match args.comando:
+        case None:
+            menu()
+        case "relatorio":
+            if args.recalcular:
+                recalcular_resumos()
+            origem = "snapshot" if args.snapshot else args.origem
+            try:
+                filtros = _ler_filtros(args.filtro)
+            except ValueError as err:
+                parser.error(str(err))
+            for nome in (RELATORIOS if args.nome == "todos" else [args.nome]):
+                exibir_relatorio(nome, origem, args.snapshot, filtros)
+                print()
+        case "indices":
+            consultor_indices()
+        case "sincronizar":
+            for nome_arquivo in args.arquivos:
+                sincronizar_csv(nome_arquivo, args.tamanho_lote, args.marcar_ausentes, args.forcar)
+        case "exportar":
+            colunas = [c.strip() for c in args.colunas.split(",") if c.strip()] if args.colunas else None
+            try:
+                filtros = _ler_filtros(args.filtro)
+            except ValueError as err:
+                parser.error(str(err))
+            exportar_tabela(args.tabela, args.arquivo, args.formato, colunas, filtros, args.gzip, args.tamanho_pagina,
+                            args.codificacao)
+        case "snapshot":
+            if args.acao == "exportar":
+                exportar_snapshot(args.pasta)
+            else:
+                importar_snapshot(args.pasta, args.tamanho_lote)
+        case "recarregar":
+            recarregar_csv(args.arquivo, args.tamanho_lote)
+        case "limpar":
+            limpar_tabelas(args.modo)
+        case "lote":
+            executar_lote(args.arquivo, args.simular, args.saida, args.tamanho_lote)
+
+    if args.estatisticas:
+        print()
+        metricas.exibir()
+        print()
+        _cache_consultas.exibir()
+
+
 if __name__ == "__main__":
-    menu()
+    main_cli()
@@ -0,0 +1,240 @@
+"""
+Instrumentação leve das operações do sistema PAAR.
+
+Cada operação medida (conexão, execute, fetch, commit, fases da carga do CSV e as
+funções de CRUD) acumula contagem, linhas, tempo total, máximo e um histograma de
+latência com faixas fixas, de onde saem os percentis p50/p95/p99 sem guardar as
+amostras. Comandos SQL acima de LIMIAR_LENTO_MS vão para o log como consulta lenta.
+
+DB_METRICS=0 desliga a coleta; DB_SLOW_QUERY_MS ajusta o limiar da consulta lenta.
+"""
+
+import bisect
+import contextlib
+import functools
+import logging
+import os
+import re
+import threading
+import time
+
+ATIVO = os.environ.get("DB_METRICS", "1") != "0"
+
+# Comandos SQL mais lentos que isso são registrados no log
+LIMIAR_LENTO_MS = float(os.environ.get("DB_SLOW_QUERY_MS", 200))
+
+# Limites superiores (ms) das faixas do histograma; a última faixa é aberta
+FAIXAS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_ESPACOS = re.compile(r"\s+")
+
+
+class _Operacao:
+    __slots__ = ("contagem", "linhas", "total", "minimo", "maximo", "faixas")
+
+    def __init__(self):
+        self.contagem = 0
+        self.linhas = 0
+        self.total = 0.0
+        self.minimo = float("inf")
+        self.maximo = 0.0
+        self.faixas = [0] * (len(FAIXAS_MS) + 1)
+
+    def percentil(self, fracao):
+        """Estimativa por interpolação linear dentro da faixa do histograma, limitada ao mínimo e ao máximo observados."""
+        alvo = fracao * self.contagem
+        acumulado = 0
+        for i, quantidade in enumerate(self.faixas):
+            if quantidade and acumulado + quantidade >= alvo:
+                inferior = FAIXAS_MS[i - 1] if i else 0.0
+                superior = FAIXAS_MS[i] if i < len(FAIXAS_MS) else self.maximo
+                estimativa = inferior + (superior - inferior) * (alvo - acumulado) / quantidade
+                return min(max(estimativa, self.minimo), self.maximo)
+            acumulado += quantidade
+        return self.maximo
+
+
+class Metricas:
+    """Contadores e histogramas por operação, seguros para várias threads."""
+
+    def __init__(self):
+        self._operacoes = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, operacao, duracao, linhas=0):
+        ms = duracao * 1000
+        with self._trava:
+            dados = self._operacoes.get(operacao)
+            if dados is None:
+                dados = self._operacoes[operacao] = _Operacao()
+            dados.contagem += 1
+            dados.linhas += linhas
+            dados.total += ms
+            if ms < dados.minimo:
+                dados.minimo = ms
+            if ms > dados.maximo:
+                dados.maximo = ms
+            dados.faixas[bisect.bisect_left(FAIXAS_MS, ms)] += 1
+
+    def zerar(self):
+        with self._trava:
+            self._operacoes = {}
+
+    def resumo(self):
+        """Lista de dicionários por operação, da que consumiu mais tempo total para a que consumiu menos."""
+        with self._trava:
+            itens = list(self._operacoes.items())
+            linhas = [{
+                "operacao": nome,
+                "contagem": dados.contagem,
+                "linhas": dados.linhas,
+                "total_ms": round(dados.total, 2),
+                "media_ms": round(dados.total / dados.contagem, 3),
+                "p50_ms": round(dados.percentil(0.50), 3),
+                "p95_ms": round(dados.percentil(0.95), 3),
+                "p99_ms": round(dados.percentil(0.99), 3),
+                "max_ms": round(dados.maximo, 3)
+            } for nome, dados in itens]
+        return sorted(linhas, key=lambda linha: linha["total_ms"], reverse=True)
+
+
+metricas = Metricas()
+
+
+def registrar(operacao, duracao, linhas=0):
+    """Registra uma medição feita pelo chamador (duracao em segundos)."""
+    if ATIVO:
+        metricas.registrar(operacao, duracao, linhas)
+
+
+@contextlib.contextmanager
+def cronometrar(operacao, linhas=0):
+    """Mede o bloco with como uma ocorrência de operacao."""
+    if not ATIVO:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        metricas.registrar(operacao, time.perf_counter() - inicio, linhas)
+
+
+def cronometrado(operacao):
+    """Decorador: cada chamada da função conta como uma ocorrência de operacao."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not ATIVO:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                metricas.registrar(operacao, time.perf_counter() - inicio)
+        return medida
+    return decorador
+
+
+def _comando(sql):
+    """Primeira palavra do SQL (SELECT, INSERT, ...), usada como nome da operação."""
+    partes = sql.lstrip().split(None, 1)
+    return partes[0].upper() if partes else "?"
+
+
+class CursorMedido:
+    """Cursor que mede execute/executemany e os fetch, contando as linhas."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _medir_sql(self, metodo, sql, parametros, linhas_lote=0):
+        inicio = time.perf_counter()
+        try:
+            return metodo(sql) if parametros is None else metodo(sql, parametros)
+        finally:
+            duracao = time.perf_counter() - inicio
+            linhas = linhas_lote or max(getattr(self._cursor, "rowcount", 0) or 0, 0)
+            metricas.registrar(f"sql.{_comando(sql)}", duracao, linhas)
+            if duracao * 1000 >= LIMIAR_LENTO_MS:
+                texto = _ESPACOS.sub(" ", sql).strip()
+                logging.warning(f"Consulta lenta ({duracao * 1000:.1f} ms, {linhas} linha(s)): {texto[:500]}")
+
+    def execute(self, sql, parametros=None):
+        return self._medir_sql(self._cursor.execute, sql, parametros)
+
+    def executemany(self, sql, parametros):
+        parametros = parametros if isinstance(parametros, (list, tuple)) else list(parametros)
+        return self._medir_sql(self._cursor.executemany, sql, parametros, len(parametros))
+
+    def _medir_fetch(self, operacao, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(*args)
+        if operacao == "fetch.um":
+            linhas = int(resultado is not None)
+        else:
+            linhas = len(resultado)
+        metricas.registrar(operacao, time.perf_counter() - inicio, linhas)
+        return resultado
+
+    def fetchone(self):
+        return self._medir_fetch("fetch.um", self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._medir_fetch("fetch.varios", self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._medir_fetch("fetch.todos", self._cursor.fetchall)
+
+
+class ConexaoMedida:
+    """Conexão que entrega cursores medidos e mede commit e rollback."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def cursor(self, **opcoes):
+        return CursorMedido(self._conn.cursor(**opcoes))
+
+    def commit(self):
+        with cronometrar("conexao.commit"):
+            return self._conn.commit()
+
+    def rollback(self):
+        with cronometrar("conexao.rollback"):
+            return self._conn.rollback()
+
+
+def medir_conexao(conn):
+    """Envolve conn para medição, se a coleta estiver ativa."""
+    return ConexaoMedida(conn) if ATIVO else conn
+
+
+def exibir():
+    """Imprime a tabela de estatísticas acumuladas neste processo."""
+    linhas = metricas.resumo()
+    if not linhas:
+        print("Nenhuma operação medida ainda." if ATIVO else "Coleta de métricas desligada (DB_METRICS=0).")
+        return
+
+    cabecalho = ("operacao", "contagem", "linhas", "total_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+    larguras = [max(len(c), *(len(str(linha[c])) for linha in linhas)) for c in cabecalho]
+    print("  ".join(c.ljust(l) for c, l in zip(cabecalho, larguras)))
+    for linha in linhas:
+        print("  ".join(str(linha[c]).ljust(l) for c, l in zip(cabecalho, larguras)))
+    print(f"(consultas acima de {LIMIAR_LENTO_MS:g} ms são registradas no log como lentas)")
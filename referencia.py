@@ -0,0 +1,119 @@
+"""
+Dados de referência do sistema PAAR: valores válidos de sexo, força, posto/graduação,
+modalidade e das opções Sim/Não.
+
+É a fonte única usada pela carga do CSV, pelo CRUD (interativo e em lote) e pelo
+gatilho trg_validate_modalidade do Paar.sql, que consulta as tabelas Ref_* gravadas
+por criar_tabelas a partir de TABELAS_REFERENCIA. As tabelas de busca são montadas
+uma única vez, na importação do módulo.
+"""
+
+import re
+import unicodedata
+
+# Valor gravado quando força ou posto/graduação não foram informados
+NAO_INFORMADO = "N/A"
+
+FORCAS = ("MB", "FAB", "EB")
+
+POSTOS_GRADUACAO = (
+    "Soldado", "Cabo", "Sargento", "Terceiro Sargento", "Terceiro Sargento R/1", "Segundo Sargento",
+    "Primeiro Sargento", "Subtenente", "Suboficial", "Suboficial R/1", "Tenente", "Segundo-Tenente R/1",
+    "Primeiro-Tenente", "Capitao", "Capitao de Mar e Guerra", "Capitao de Mar e Guerra RM1",
+    "Tenente Coronel", "Tenente Coronel R/1", "Coronel"
+)
+
+# "Volei" e "Paradesporto" aparecem no paar_set_2024.csv oficial
+MODALIDADES = (
+    "Apneia", "Atletismo", "Basquete", "Boxe", "Canoagem Slalom", "Canoagem Velocidade", "Ciclismo MTB",
+    "Escalada Esportiva", "Esgrima", "Futebol", "Ginastica Artistica", "Golfe", "Judo",
+    "Levantamento de Peso", "Lifesaving", "Lutas Associadas (Wrestling)", "Maratona", "Maratonas Aquaticas",
+    "Nado Sincronizado", "Natacao", "Orientacao", "Paradesporto", "Paraquedismo", "Pentatlo Militar",
+    "Pentatlo Moderno", "Pentatlo Naval", "Pesca Submarina", "Taekwondo", "Tiro", "Tiro com Arco", "Triatlo",
+    "Vela", "Volei", "Voleibol", "Volei de Praia"
+)
+
+# Tabelas do banco que espelham as listas acima (lidas pelo gatilho do Paar.sql)
+TABELAS_REFERENCIA = {
+    "Ref_forca": FORCAS,
+    "Ref_posto_graduacao": POSTOS_GRADUACAO,
+    "Ref_modalidade": MODALIDADES
+}
+
+_ESPACOS = re.compile(r"[\s\-]+")
+
+
+def chave(valor):
+    """Forma de comparação: sem acentos, minúscula, com hífens e espaços repetidos unificados."""
+    sem_acentos = ''.join(
+        c for c in unicodedata.normalize('NFD', str(valor))
+        if unicodedata.category(c) != 'Mn'
+    )
+    return _ESPACOS.sub(" ", sem_acentos).strip().lower()
+
+
+_SIM_NAO = {"sim": "Sim", "s": "Sim", "nao": "Não", "n": "Não"}
+
+# Campo -> {chave: valor canônico}
+CANONICOS = {
+    "sexo": {"masculino": "Masculino", "m": "Masculino", "feminino": "Feminino", "f": "Feminino"},
+    "forca": {chave(v): v for v in FORCAS},
+    "posto_graduacao": {chave(v): v for v in POSTOS_GRADUACAO},
+    "modalidade": {chave(v): v for v in MODALIDADES},
+    "possui_medalha": _SIM_NAO,
+    "possui_bolsa": _SIM_NAO,
+    "paar": _SIM_NAO
+}
+
+# Valores canônicos de cada campo, para testes de pertinência
+VALIDOS = {campo: frozenset(mapa.values()) for campo, mapa in CANONICOS.items()}
+
+# Campos que aceitam NAO_INFORMADO (ou vazio)
+OPCIONAIS = frozenset({"forca", "posto_graduacao"})
+
+# Ordem dos campos em lista_elementos (igual a CAMPOS_ELEMENTO do main)
+CAMPOS = ("sexo", "forca", "posto_graduacao", "estado", "cidade",
+          "modalidade", "possui_medalha", "possui_bolsa", "paar")
+
+
+def canonizar(campo, valor):
+    """Valor canônico de campo, ou None se o valor não for válido."""
+    if valor is None:
+        return None
+    if valor in VALIDOS[campo]:
+        return valor
+    if campo in OPCIONAIS and str(valor).strip() in ("", NAO_INFORMADO):
+        return NAO_INFORMADO
+    return CANONICOS[campo].get(chave(valor))
+
+
+def validar_lote(lote):
+    """
+    Valida um lote de listas de elementos de uma vez. Cada campo é resolvido uma única
+    vez por valor distinto do lote e o resultado é aplicado às linhas por busca em
+    dicionário. Retorna (validos, invalidos): validos são as linhas aceitas, já com os
+    valores canônicos; invalidos traz (posição no lote, {campo: valor recusado}) de
+    todas as linhas recusadas.
+    """
+    resolvidos = []
+    for i, campo in enumerate(CAMPOS):
+        if campo in CANONICOS:
+            resolvidos.append((i, campo, {v: canonizar(campo, v) for v in {e[i] for e in lote}}))
+
+    validos, invalidos = [], []
+    for posicao, elementos in enumerate(lote):
+        linha = list(elementos)
+        erros = {}
+        for i, campo, mapa in resolvidos:
+            canonico = mapa[elementos[i]]
+            if canonico is None:
+                erros[campo] = elementos[i]
+            else:
+                linha[i] = canonico
+
+        if erros:
+            invalidos.append((posicao, erros))
+        else:
+            validos.append(linha)
+
+    return validos, invalidos
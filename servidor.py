@@ -0,0 +1,184 @@
+"""
+Servidor HTTP/JSON local, só de leitura, sobre a camada assíncrona (assincrono.py).
+
+Rotas (GET):
+    /elemento/<id>
+    /modalidade/<nome>?apos=<id>&limite=<n>
+    /estado/<uf>?apos=<id>&limite=<n>
+    /relatorio/<modalidade|forca_posto|estado>
+    /estatisticas   (latências por operação e uso do cache)
+
+Um único event loop atende todas as conexões (HTTP/1.1 com keep-alive), então o
+servidor usa um núcleo; com taskset -c 0 a medição de teste_carga.py fica restrita a ele.
+
+Uso:
+    DB_BACKEND=sqlite python servidor.py --porta 8080
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import urllib.parse
+
+import assincrono
+import main
+import metricas
+
+ROTAS = (
+    (re.compile(r"^/elemento/(\d+)$"), "elemento"),
+    (re.compile(r"^/modalidade/([^/]+)$"), "modalidade"),
+    (re.compile(r"^/estado/([^/]+)$"), "estado"),
+    (re.compile(r"^/relatorio/([^/]+)$"), "relatorio"),
+    (re.compile(r"^/estatisticas$"), "estatisticas")
+)
+
+MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+# Tamanho máximo da linha de requisição e de cada cabeçalho
+LIMITE_LINHA = 8192
+
+
+def _inteiro(parametros, nome, padrao):
+    try:
+        return int(parametros.get(nome, padrao))
+    except ValueError:
+        raise ValueError(f"Parâmetro {nome!r} deve ser um número inteiro.") from None
+
+
+async def _responder_rota(caminho, parametros):
+    """(status, corpo) da rota de caminho."""
+    for padrao, rota in ROTAS:
+        achado = padrao.match(caminho)
+        if achado is None:
+            continue
+        valor = urllib.parse.unquote(achado.group(1)) if padrao.groups else None
+
+        match rota:
+            case "elemento":
+                registro = await assincrono.buscar_elemento(int(valor))
+                if registro is None:
+                    return 404, {"erro": f"Registro {valor} não encontrado."}
+                return 200, dict(zip(main.CAMPOS_ELEMENTO, registro), id=int(valor))
+            case "modalidade" | "estado":
+                listar, colunas = ((assincrono.listar_modalidade, assincrono.COLUNAS_MODALIDADE) if rota == "modalidade"
+                                   else (assincrono.listar_estado, assincrono.COLUNAS_ESTADO))
+                linhas = await listar(valor, _inteiro(parametros, "apos", 0), _inteiro(parametros, "limite", 100))
+                registros = [dict(zip(colunas, linha)) for linha in linhas]
+                proximo = registros[-1]["id"] if registros else None
+                return 200, {"registros": registros, "proximo_apos": proximo}
+            case "relatorio":
+                if valor not in main.RELATORIOS:
+                    return 404, {"erro": f"Relatório desconhecido: {valor}", "disponiveis": list(main.RELATORIOS)}
+                colunas, linhas = await assincrono.gerar_relatorio(valor)
+                return 200, {"colunas": colunas, "linhas": linhas}
+            case "estatisticas":
+                return 200, {"operacoes": metricas.metricas.resumo(),
+                             "cache": main._cache_consultas.estatisticas()}
+
+    return 404, {"erro": f"Rota desconhecida: {caminho}"}
+
+
+async def _ler_requisicao(leitor):
+    """(método, alvo, cabeçalhos) da próxima requisição, ou None se o cliente fechou a conexão."""
+    linha = await leitor.readline()
+    if not linha:
+        return None
+    if len(linha) > LIMITE_LINHA:
+        raise ValueError("Linha de requisição longa demais.")
+    metodo, alvo, _ = linha.decode("latin-1").split(" ", 2)
+
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b"\n", b""):
+            break
+        if len(linha) > LIMITE_LINHA:
+            raise ValueError("Cabeçalho longo demais.")
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    # Corpo ignorado (só há rotas GET), mas consumido para não quebrar o keep-alive
+    tamanho = int(cabecalhos.get("content-length", 0) or 0)
+    if tamanho:
+        await leitor.readexactly(tamanho)
+    return metodo, alvo, cabecalhos
+
+
+async def _processar(metodo, alvo):
+    """(status, corpo) da requisição; erros viram respostas JSON com o status adequado."""
+    if metodo != "GET":
+        return 405, {"erro": "Apenas GET é aceito."}
+
+    url = urllib.parse.urlsplit(alvo)
+    try:
+        with metricas.cronometrar("http.requisicao"):
+            return await _responder_rota(url.path, dict(urllib.parse.parse_qsl(url.query)))
+    except ValueError as err:
+        return 400, {"erro": str(err)}
+    except main.ErroConexao as err:
+        return 503, {"erro": str(err)}
+    except Exception as err:
+        logging.error(f"Erro ao atender {alvo}: {err}")
+        return 500, {"erro": "Erro interno."}
+
+
+async def _enviar(escritor, status, corpo, fechar):
+    dados = json.dumps(corpo, ensure_ascii=False, default=str).encode("utf-8")
+    escritor.write(f"HTTP/1.1 {status} {MOTIVOS[status]}\r\n"
+                   f"Content-Type: application/json; charset=utf-8\r\n"
+                   f"Content-Length: {len(dados)}\r\n"
+                   f"Connection: {'close' if fechar else 'keep-alive'}\r\n\r\n".encode("latin-1") + dados)
+    await escritor.drain()
+
+
+async def atender(leitor, escritor):
+    """Atende as requisições de uma conexão até o cliente fechá-la ou pedir Connection: close."""
+    try:
+        while True:
+            try:
+                requisicao = await _ler_requisicao(leitor)
+            except (ValueError, asyncio.IncompleteReadError):
+                await _enviar(escritor, 400, {"erro": "Requisição inválida."}, fechar=True)
+                break
+            if requisicao is None:
+                break
+
+            metodo, alvo, cabecalhos = requisicao
+            status, corpo = await _processar(metodo, alvo)
+            fechar = cabecalhos.get("connection", "").lower() == "close"
+            await _enviar(escritor, status, corpo, fechar)
+            if fechar:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(host, porta):
+    servidor = await asyncio.start_server(atender, host, porta, limit=LIMITE_LINHA * 2)
+    print(f"Servindo consultas do PAAR em http://{host}:{porta} (backend {main.DB_BACKEND}). Ctrl+C encerra.")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await assincrono.fechar_pool()
+
+
+def main_servidor():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON de consultas do PAAR (assíncrono).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        print("Servidor encerrado.")
+
+
+if __name__ == "__main__":
+    main_servidor()
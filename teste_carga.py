@@ -0,0 +1,131 @@
+"""
+Teste de carga do servidor HTTP de consultas (servidor.py).
+
+Abre --conexoes conexões keep-alive e, em cada uma, envia requisições em sequência
+durante --duracao segundos, sorteando entre consultas por id, listagens por
+modalidade e por estado e relatórios (pesos em --mistura). Ao final, exibe a vazão
+total e as latências p50/p95/p99 por tipo de consulta.
+
+Para medir um único núcleo, prenda o servidor a ele:
+    DB_BACKEND=sqlite taskset -c 0 python servidor.py --porta 8080
+    python teste_carga.py --url http://127.0.0.1:8080 --conexoes 64 --duracao 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.parse
+
+import benchmark
+import referencia
+
+TIPOS = ("elemento", "modalidade", "estado", "relatorio")
+
+ESTADOS = ("SP", "RJ", "MG", "RS", "PR", "BA", "PE", "DF", "SC", "CE")
+
+
+def _gerar_caminho(tipo, aleatorio, maior_id):
+    if tipo == "elemento":
+        return f"/elemento/{aleatorio.randint(1, maior_id)}"
+    if tipo == "modalidade":
+        return f"/modalidade/{urllib.parse.quote(aleatorio.choice(referencia.MODALIDADES))}?limite=20"
+    if tipo == "estado":
+        return f"/estado/{aleatorio.choice(ESTADOS)}?limite=20"
+    return f"/relatorio/{aleatorio.choice(('modalidade', 'forca_posto', 'estado'))}"
+
+
+async def _cliente(host, porta, fim, mistura, maior_id, semente, amostras, erros):
+    aleatorio = random.Random(semente)
+    tipos, pesos = zip(*mistura.items())
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    try:
+        while time.perf_counter() < fim:
+            tipo = aleatorio.choices(tipos, pesos)[0]
+            caminho = _gerar_caminho(tipo, aleatorio, maior_id)
+
+            inicio = time.perf_counter()
+            escritor.write(f"GET {caminho} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            await escritor.drain()
+
+            status = int((await leitor.readline()).split()[1])
+            tamanho = 0
+            while True:
+                linha = await leitor.readline()
+                if linha in (b"\r\n", b""):
+                    break
+                nome, _, valor = linha.decode("latin-1").partition(":")
+                if nome.lower() == "content-length":
+                    tamanho = int(valor)
+            await leitor.readexactly(tamanho)
+            amostras[tipo].append(time.perf_counter() - inicio)
+
+            # 404 em /elemento é esperado para ids excluídos
+            if status >= 500 or (status >= 400 and tipo != "elemento"):
+                erros[status] = erros.get(status, 0) + 1
+    finally:
+        escritor.close()
+
+
+async def executar(url, conexoes, duracao, mistura, maior_id, semente):
+    destino = urllib.parse.urlsplit(url)
+    amostras = {tipo: [] for tipo in mistura}
+    erros = {}
+
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    await asyncio.gather(*(_cliente(destino.hostname, destino.port or 80, fim, mistura, maior_id,
+                                    semente + i, amostras, erros) for i in range(conexoes)))
+    decorrido = time.perf_counter() - inicio
+
+    total = sum(len(a) for a in amostras.values())
+    return {
+        "conexoes": conexoes,
+        "duracao_s": round(decorrido, 2),
+        "requisicoes": total,
+        "requisicoes_por_s": round(total / decorrido, 1),
+        "erros": erros,
+        "latencias": {tipo: benchmark.percentis(a) for tipo, a in amostras.items()}
+    }
+
+
+def main_teste():
+    parser = argparse.ArgumentParser(description="Teste de carga do servidor HTTP de consultas do PAAR.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--conexoes", type=int, default=32, help="clientes concorrentes (padrão: 32)")
+    parser.add_argument("--duracao", type=float, default=10, help="segundos de medição (padrão: 10)")
+    parser.add_argument("--maior-id", type=int, default=1000,
+                        help="ids consultados em /elemento são sorteados entre 1 e este valor")
+    parser.add_argument("--mistura", default="elemento=70,modalidade=15,estado=10,relatorio=5",
+                        help="peso de cada tipo de consulta")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    mistura = {}
+    for item in args.mistura.split(","):
+        tipo, _, peso = item.partition("=")
+        if tipo.strip() not in TIPOS:
+            parser.error(f"Tipo de consulta desconhecido em --mistura: {tipo!r} (use {', '.join(TIPOS)})")
+        mistura[tipo.strip()] = float(peso)
+
+    resultado = asyncio.run(executar(args.url, args.conexoes, args.duracao, mistura, args.maior_id, args.semente))
+
+    print(f"{resultado['requisicoes']} requisições em {resultado['duracao_s']}s com {args.conexoes} conexões: "
+          f"{resultado['requisicoes_por_s']} req/s")
+    if resultado["erros"]:
+        print(f"Respostas com erro por status: {resultado['erros']}")
+    print("| Consulta | Amostras | p50 (ms) | p95 (ms) | p99 (ms) | máx (ms) |")
+    print("|---|---|---|---|---|---|")
+    for tipo, p in resultado["latencias"].items():
+        if p:
+            print(f"| {tipo} | {p['amostras']} | {p['p50_ms']} | {p['p95_ms']} | {p['p99_ms']} | {p['max_ms']} |")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main_teste()
@@ -0,0 +1,76 @@
+"""
+Fixtures dos testes: banco SQLite temporário (esquema textual ou compacto) e CSVs no
+layout do paar_set_2024.csv.
+"""
+
+import csv
+import os
+import random
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+import referencia  # noqa: E402
+
+ESTADOS = {"SP": ("Sao Paulo", "Santos"), "RJ": ("Rio de Janeiro", "Niteroi"), "RS": ("Porto Alegre",)}
+
+
+@pytest.fixture
+def banco(request, tmp_path, monkeypatch):
+    """
+    Banco SQLite novo, com as tabelas criadas. Parametrize com indirect=True para
+    escolher o esquema (True: compacto); o padrão é o textual.
+    """
+    caminho = tmp_path / "paar.db"
+    monkeypatch.setattr(main, "SCHEMA_COMPACTO", getattr(request, "param", False))
+    monkeypatch.setitem(main.SQLITE_CONFIG, "caminho", str(caminho))
+    main.definir_backend("sqlite")
+    main.criar_tabelas()
+    yield caminho
+    main._aguardar_descarte()
+    main.definir_backend("sqlite")
+
+
+def gerar_registros(n, semente=0):
+    """n listas de elementos válidas (ordem de CAMPOS_ELEMENTO)."""
+    aleatorio = random.Random(semente)
+    registros = []
+    for _ in range(n):
+        estado = aleatorio.choice(list(ESTADOS))
+        registros.append([
+            aleatorio.choice(("Masculino", "Feminino")),
+            aleatorio.choice(referencia.FORCAS),
+            aleatorio.choice(referencia.POSTOS_GRADUACAO[:6]),
+            estado,
+            aleatorio.choice(ESTADOS[estado]),
+            aleatorio.choice(referencia.MODALIDADES[:8]),
+            aleatorio.choice(("Sim", "Não")),
+            aleatorio.choice(("Sim", "Não")),
+            aleatorio.choice(("Sim", "Não"))
+        ])
+    return registros
+
+
+def gravar_csv(caminho, registros):
+    """Grava os registros com o cabeçalho e a codificação do CSV oficial."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    campos = list(main.CABECALHO_PAAR_SET)
+    with open(caminho, "w", encoding="latin-1", newline="") as f:
+        escritor = csv.writer(f, delimiter=";")
+        escritor.writerow(main.CABECALHO_PAAR_SET.values())
+        for registro in registros:
+            escritor.writerow([registro[main.CAMPOS_ELEMENTO.index(campo)] for campo in campos])
+    return str(caminho)
+
+
+def linhas(banco, consulta):
+    """Resultado de consulta lido por uma conexão própria, fora do pool do main."""
+    conn = sqlite3.connect(banco)
+    try:
+        return conn.execute(consulta).fetchall()
+    finally:
+        conn.close()
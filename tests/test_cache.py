@@ -0,0 +1,53 @@
+import main
+from conftest import gerar_registros
+
+
+def test_leitura_que_cruza_uma_invalidacao_nao_e_guardada():
+    cache = main.CacheConsultas(capacidade=10, validade=60)
+
+    def carregar_durante_escrita():
+        # Uma escrita termina enquanto a leitura ainda está em andamento
+        cache.invalidar([1])
+        return "valor antigo"
+
+    assert cache.obter(("elemento", 1), carregar_durante_escrita) == "valor antigo"
+    assert cache.obter(("elemento", 1), lambda: "valor novo") == "valor novo"
+    assert cache.obter(("elemento", 1), lambda: "não deveria ler") == "valor novo"
+
+
+def test_invalidar_ids_remove_registros_e_consultas():
+    cache = main.CacheConsultas(capacidade=10, validade=60)
+    cache.obter(("elemento", 1), lambda: "um")
+    cache.obter(("elemento", 2), lambda: "dois")
+    cache.obter(("consulta", "SELECT 1", ()), lambda: "relatório")
+
+    cache.invalidar([1])
+
+    assert cache.obter(("elemento", 1), lambda: "um relido") == "um relido"
+    assert cache.obter(("elemento", 2), lambda: "não deveria ler") == "dois"
+    assert cache.obter(("consulta", "SELECT 1", ()), lambda: "relatório relido") == "relatório relido"
+
+
+def test_capacidade_descarta_a_entrada_menos_usada():
+    cache = main.CacheConsultas(capacidade=2, validade=60)
+    cache.obter(("elemento", 1), lambda: "um")
+    cache.obter(("elemento", 2), lambda: "dois")
+    cache.obter(("elemento", 1), lambda: "não deveria ler")
+    cache.obter(("elemento", 3), lambda: "três")
+
+    assert cache.estatisticas()["entradas"] == 2
+    assert cache.obter(("elemento", 2), lambda: "dois relido") == "dois relido"
+
+
+def test_escrita_invalida_o_registro_em_cache(banco):
+    registro = gerar_registros(1, semente=9)[0]
+    id = main.novo_elemento(registro)
+    assert main.buscar_elemento(id)[0] == registro[0]
+
+    alterado = list(registro)
+    alterado[0] = "Feminino" if registro[0] == "Masculino" else "Masculino"
+    assert main.atualizar_elemento(id, alterado)
+    assert main.buscar_elemento(id)[0] == alterado[0]
+
+    assert main.remover_elemento(id)
+    assert main.buscar_elemento(id) is None
@@ -0,0 +1,42 @@
+import pytest
+
+import main
+from conftest import gerar_registros, gravar_csv, linhas
+
+pytest.importorskip("pandas")
+
+
+def _registros_sujos():
+    """Registros com grafias que a normalização precisa tratar e uma linha inválida."""
+    registros = gerar_registros(80, semente=12)
+    registros[0][0] = "m"
+    registros[1][0] = "FEMININO"
+    registros[2][5] = registros[2][5].upper()
+    registros[3][6:9] = ["s", "n", "S"]
+    registros[4][1] = ""
+    registros[5][5] = "Xadrez"
+    return registros
+
+
+def _conteudo(banco):
+    return {
+        "registros": linhas(banco, main.CONSULTA_SNAPSHOT),
+        "resumos": {tabela: sorted(linhas(banco, f"SELECT * FROM {tabela}")) for tabela in main.RESUMOS}
+    }
+
+
+@pytest.mark.parametrize("banco", [False, True], indirect=True, ids=["textual", "compacto"])
+def test_carga_pandas_grava_o_mesmo_que_a_carga_em_lotes(banco, tmp_path, monkeypatch):
+    arquivo = gravar_csv(tmp_path / "paar_set.csv", _registros_sujos())
+
+    main.carregar_csv_para_banco(arquivo, tamanho_lote=16)
+    em_lotes = _conteudo(banco)
+
+    outro = tmp_path / "pandas.db"
+    monkeypatch.setitem(main.SQLITE_CONFIG, "caminho", str(outro))
+    main.definir_backend("sqlite")
+    main.criar_tabelas()
+    main.carregar_csv_pandas(arquivo, tamanho_lote=16, tamanho_bloco=25)
+
+    assert len(em_lotes["registros"]) == 79
+    assert _conteudo(outro) == em_lotes
@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+import main
+from conftest import gerar_registros, linhas
+
+
+def test_atualizar_elemento_valida_e_canoniza(banco):
+    registro = gerar_registros(1, semente=5)[0]
+    id = main.novo_elemento(registro)
+
+    recusado = list(registro)
+    recusado[5] = "Xadrez"
+    with pytest.raises(ValueError):
+        main.atualizar_elemento(id, recusado)
+    assert linhas(banco, f"SELECT modalidade FROM Esporte WHERE pessoa_id = {id}") == [(registro[5],)]
+
+    # Valores aceitos são gravados na forma canônica
+    alterado = list(registro)
+    alterado[0] = "f"
+    assert main.atualizar_elemento(id, alterado)
+    assert linhas(banco, f"SELECT sexo FROM Pessoa WHERE id = {id}") == [("Feminino",)]
+
+
+def test_atualizar_registro_sem_esporte_mantendo_os_padroes(banco):
+    registro = gerar_registros(1, semente=25)[0]
+    id = main.novo_elemento(registro)
+    with sqlite3.connect(banco) as conn:
+        conn.execute(f"DELETE FROM Esporte WHERE pessoa_id = {id}")
+    conn.close()
+
+    # O editor mostra PADROES_ELEMENTO no lugar do Esporte ausente; Enter mantém esses valores
+    elementos, versao = main.buscar_registro(id)
+    atual = [v if v is not None else p for v, p in zip(elementos, main.PADROES_ELEMENTO)]
+    atual[4] = "Campinas"
+    assert main.atualizar_elemento(id, atual, versao)
+
+    assert linhas(banco, f"SELECT cidade FROM Localizacao WHERE pessoa_id = {id}") == [("Campinas",)]
+    assert linhas(banco, f"SELECT modalidade, possui_medalha FROM Esporte WHERE pessoa_id = {id}") == [("N/A", "Não")]
+
+
+def test_atualizar_mantendo_valor_antigo_fora_da_forma_canonica(banco):
+    registro = gerar_registros(1, semente=26)[0]
+    id = main.novo_elemento(registro)
+    with sqlite3.connect(banco) as conn:
+        conn.execute(f"UPDATE Esporte SET modalidade = 'futebol de campo' WHERE pessoa_id = {id}")
+    conn.close()
+
+    elementos, versao = main.buscar_registro(id)
+    alterado = list(elementos)
+    alterado[3:5] = ["RJ", "Niteroi"]
+    assert main.atualizar_elemento(id, alterado, versao)
+    assert linhas(banco, f"SELECT modalidade FROM Esporte WHERE pessoa_id = {id}") == [("futebol de campo",)]
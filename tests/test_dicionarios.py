@@ -0,0 +1,50 @@
+import pytest
+
+import main
+from conftest import gerar_registros, gravar_csv, linhas
+
+
+@pytest.mark.parametrize("banco", [True], indirect=True)
+def test_carga_compacta_com_uma_conexao_no_pool(banco, tmp_path, monkeypatch):
+    # Os valores novos dos dicionários entram pela conexão da própria carga
+    monkeypatch.setitem(main.POOL_CONFIG, "tamanho", 1)
+    monkeypatch.setitem(main.POOL_CONFIG, "tempo_espera", 1)
+    main.definir_backend("sqlite")
+    arquivo = gravar_csv(tmp_path / "paar_set.csv", gerar_registros(40, semente=2))
+
+    main.carregar_csv_para_banco(arquivo, tamanho_lote=10)
+    assert linhas(banco, "SELECT COUNT(*) FROM Pessoa") == [(40,)]
+    assert linhas(banco, "SELECT COUNT(*) FROM Localizacao WHERE cidade IS NULL") == [(0,)]
+
+
+@pytest.mark.parametrize("banco", [True], indirect=True)
+def test_grafias_diferentes_tem_codigos_diferentes(banco):
+    registros = gerar_registros(2, semente=3)
+    registros[0][3:5] = ["RJ", "Rio de Janeiro"]
+    registros[1][3:5] = ["RJ", "RIO DE JANEIRO"]
+
+    with main.conectar() as conn:
+        cursor = conn.cursor()
+        main.inserir_lote(cursor, registros)
+        conn.commit()
+
+    assert linhas(banco, "SELECT cidade FROM Localizacao ORDER BY pessoa_id") == [("Rio de Janeiro",), ("RIO DE JANEIRO",)]
+
+
+@pytest.mark.parametrize("banco", [True], indirect=True)
+def test_rollback_invalida_codigos_do_cache(banco):
+    registros = gerar_registros(1, semente=4)
+    registros[0][5] = "Modalidade desfeita"
+
+    with main.conectar() as conn:
+        cursor = conn.cursor()
+        main.inserir_lote(cursor, registros)
+        main._desfazer(conn)
+
+    # O código gravado na transação desfeita não é reaproveitado
+    with main.conectar() as conn:
+        cursor = conn.cursor()
+        main.inserir_lote(cursor, registros)
+        conn.commit()
+
+    assert linhas(banco, "SELECT modalidade FROM Esporte") == [("Modalidade desfeita",)]
@@ -0,0 +1,31 @@
+import csv
+import json
+
+import main
+from conftest import gerar_registros
+
+
+def test_cidade_fora_do_latin1_nao_interrompe_a_exportacao(banco, tmp_path, capsys):
+    registros = gerar_registros(3, semente=29)
+    registros[1][4] = "Łódź"
+    for registro in registros:
+        main.novo_elemento(registro)
+
+    # CSV em latin-1 (padrão): o caractere sem representação vira "?" e há aviso
+    padrao = str(tmp_path / "cidades.csv")
+    assert main.exportar_tabela("Localizacao", padrao, colunas=["cidade"]) == 3
+    assert "Aviso: 1 linhas" in capsys.readouterr().out
+    with open(padrao, encoding="latin-1", newline="") as f:
+        cidades = [linha[0] for linha in list(csv.reader(f, delimiter=";"))[1:]]
+    assert cidades == [registros[0][4], "?ód?", registros[2][4]]
+
+    # Com outra codificação o valor é preservado
+    utf8 = str(tmp_path / "cidades_utf8.csv")
+    assert main.exportar_tabela("Localizacao", utf8, colunas=["cidade"], codificacao="utf-8") == 3
+    with open(utf8, encoding="utf-8", newline="") as f:
+        assert list(csv.reader(f, delimiter=";"))[2][0] == "Łódź"
+
+    jsonl = str(tmp_path / "cidades.jsonl")
+    assert main.exportar_tabela("Localizacao", jsonl, colunas=["cidade"], codificacao="latin-1") == 3
+    with open(jsonl, encoding="latin-1") as f:
+        assert [json.loads(linha)["cidade"] for linha in f][1] == "?ód?"
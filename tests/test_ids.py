@@ -0,0 +1,45 @@
+import sqlite3
+
+import pytest
+
+import main
+from conftest import gerar_registros, linhas
+
+
+@pytest.mark.parametrize("banco", [False, True], indirect=True, ids=["textual", "compacto"])
+def test_id_excluido_nao_e_reaproveitado(banco):
+    ids = [main.novo_elemento(registro) for registro in gerar_registros(3, semente=27)]
+    assert main.remover_elemento(ids[-1])
+
+    assert main.novo_elemento(gerar_registros(1, semente=28)[0]) == ids[-1] + 1
+
+
+def test_banco_antigo_ganha_autoincremento(tmp_path, monkeypatch):
+    caminho = tmp_path / "antigo.db"
+    with sqlite3.connect(caminho) as conn:
+        conn.executescript("""
+            CREATE TABLE Pessoa (id INTEGER PRIMARY KEY, sexo TEXT, forca TEXT, posto_graduacao TEXT);
+            CREATE TABLE Localizacao (id INTEGER PRIMARY KEY,
+                pessoa_id INTEGER NOT NULL UNIQUE REFERENCES Pessoa(id) ON DELETE CASCADE, estado TEXT, cidade TEXT);
+            INSERT INTO Pessoa VALUES (1, 'Masculino', 'Exercito', 'Cabo'), (2, 'Feminino', 'Marinha', 'Cabo');
+            INSERT INTO Localizacao (pessoa_id, estado, cidade) VALUES (1, 'SP', 'Santos'), (2, 'RJ', 'Niteroi');
+        """)
+    conn.close()
+
+    monkeypatch.setattr(main, "SCHEMA_COMPACTO", False)
+    monkeypatch.setitem(main.SQLITE_CONFIG, "caminho", str(caminho))
+    main.definir_backend("sqlite")
+    try:
+        main.criar_tabelas()
+
+        assert "AUTOINCREMENT" in linhas(caminho, "SELECT sql FROM sqlite_master WHERE name = 'Pessoa'")[0][0]
+        assert linhas(caminho, "SELECT pessoa_id, cidade FROM Localizacao ORDER BY pessoa_id") == \
+            [(1, "Santos"), (2, "Niteroi")]
+        with main.conectar() as conn:
+            assert conn.cursor().execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+        assert main.remover_elemento(2)
+        assert main.novo_elemento(gerar_registros(1, semente=29)[0]) == 3
+    finally:
+        main._aguardar_descarte()
+        main.definir_backend("sqlite")
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import main
+from conftest import gerar_registros, linhas
+
+
+def _alteracoes(alterar=(), incluir=(), excluir=(), consultar=()):
+    return {"alterar": list(alterar), "incluir": list(incluir), "excluir": list(excluir), "consultar": list(consultar)}
+
+
+def test_versao_divergente_nao_grava_nada(banco):
+    ids = main.aplicar_alteracoes(_alteracoes(incluir=gerar_registros(3, semente=6)))["incluidos"]
+    main.aplicar_alteracoes(_alteracoes(alterar=[(ids[0], {"cidade": "Santos"}, None)]))
+    antes = linhas(banco, "SELECT * FROM Pessoa ORDER BY id"), linhas(banco, "SELECT * FROM Localizacao ORDER BY id")
+
+    # ids[0] já passou da versão 0; o lote inteiro é recusado, inclusive a inclusão
+    with pytest.raises(main.ConflitoVersao) as erro:
+        main.aplicar_alteracoes(_alteracoes(alterar=[(ids[0], {"cidade": "Niteroi"}, 0),
+                                                     (ids[1], {"cidade": "Niteroi"}, 0)],
+                                            incluir=gerar_registros(1, semente=7)))
+
+    assert erro.value.ids == [ids[0]]
+    assert (linhas(banco, "SELECT * FROM Pessoa ORDER BY id"), linhas(banco, "SELECT * FROM Localizacao ORDER BY id")) == antes
+
+
+def test_registro_inexistente_e_conflito(banco):
+    with pytest.raises(main.ConflitoVersao) as erro:
+        main.aplicar_alteracoes(_alteracoes(alterar=[(999, {"cidade": "Santos"}, None)]))
+    assert erro.value.ids == [999]
+
+
+def test_simular_desfaz_o_lote(banco):
+    resultado = main.aplicar_alteracoes(_alteracoes(incluir=gerar_registros(2, semente=8)), simular=True)
+    assert len(resultado["incluidos"]) == 2
+    assert linhas(banco, "SELECT COUNT(*) FROM Pessoa") == [(0,)]
+
+
+def test_valores_recusados_indicam_a_linha_e_o_id(banco, tmp_path, capsys):
+    id = main.aplicar_alteracoes(_alteracoes(incluir=gerar_registros(1, semente=27)))["incluidos"][0]
+    inclusoes = gerar_registros(2, semente=28)
+    inclusoes[1][5] = "Xadrez"
+
+    with pytest.raises(main.AlteracaoRecusada) as erro:
+        main.aplicar_alteracoes(_alteracoes(alterar=[(id, {"sexo": "X"}, None)], incluir=inclusoes))
+    assert erro.value.recusas == ["inclusão 2: {'modalidade': 'Xadrez'}", f"alteração do id {id}: {{'sexo': 'X'}}"]
+    assert linhas(banco, "SELECT COUNT(*) FROM Pessoa") == [(1,)]
+
+    # O arquivo é lido sem erro; a recusa vem da aplicação e diz o que foi recusado
+    arquivo = tmp_path / "alteracoes.json"
+    arquivo.write_text(json.dumps({"alterar": [{"id": id, "sexo": "X"}]}), encoding="utf-8")
+    main.executar_lote(str(arquivo))
+    saida = capsys.readouterr().out
+    assert "Arquivo de alterações inválido" not in saida
+    assert f"Lote recusado, nenhuma alteração gravada: valores inválidos:\n  alteração do id {id}" in saida
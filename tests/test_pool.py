@@ -0,0 +1,19 @@
+import pytest
+
+import main
+
+
+def test_conexao_de_bloco_que_falhou_nao_volta_ao_pool(banco):
+    with main.conectar() as conn:
+        pass
+    assert len(main.obter_pool()._livres) == 1
+
+    with pytest.raises(main.ErroConexao):
+        with main.conectar() as conn:
+            conn.cursor().execute("PRAGMA foreign_keys = OFF")
+            raise main.ErroConexao("falha no meio do bloco")
+
+    # A conexão com o PRAGMA pela metade foi fechada, não reaproveitada
+    assert not main.obter_pool()._livres
+    with main.conectar() as conn:
+        assert conn.cursor().execute("PRAGMA foreign_keys").fetchone()[0] == 1
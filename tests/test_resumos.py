@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+import main
+from conftest import gerar_registros
+
+
+def _alteracoes(alterar=(), incluir=(), excluir=()):
+    return {"alterar": list(alterar), "incluir": list(incluir), "excluir": list(excluir), "consultar": []}
+
+
+@pytest.mark.parametrize("banco", [False, True], indirect=True, ids=["textual", "compacto"])
+def test_resumos_acompanham_as_views(banco):
+    ids = main.aplicar_alteracoes(_alteracoes(incluir=gerar_registros(60, semente=10)))["incluidos"]
+    main.aplicar_alteracoes(_alteracoes(
+        alterar=[(id, {"modalidade": "Futebol", "possui_medalha": "Sim"}, None) for id in ids[:10]],
+        excluir=ids[10:20]
+    ))
+    main.remover_elemento(ids[20])
+
+    for nome in main.RELATORIOS:
+        assert main.gerar_relatorio(nome, "resumo") == main.gerar_relatorio(nome, "views"), nome
+
+
+def test_recalcular_resumos_reconstroi_as_contagens(banco):
+    main.aplicar_alteracoes(_alteracoes(incluir=gerar_registros(30, semente=11)))
+    esperados = {nome: main.gerar_relatorio(nome, "views") for nome in main.RELATORIOS}
+
+    # Resumos desencontrados das views (ex.: escritas feitas fora do sistema)
+    with sqlite3.connect(banco) as conn:
+        for tabela in main.RESUMOS:
+            conn.execute(f"UPDATE {tabela} SET atletas = atletas + 5")
+
+    main.recalcular_resumos()
+
+    for nome in main.RELATORIOS:
+        assert main.gerar_relatorio(nome, "resumo") == esperados[nome], nome
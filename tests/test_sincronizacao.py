@@ -0,0 +1,79 @@
+import main
+from conftest import gerar_registros, gravar_csv, linhas
+
+
+def test_arquivos_de_mesmo_nome_em_pastas_diferentes_sao_origens_distintas(banco, tmp_path):
+    registros = gerar_registros(50, semente=1)
+    arquivo_2023 = gravar_csv(tmp_path / "2023" / "paar_set.csv", registros[:30])
+    arquivo_2024 = gravar_csv(tmp_path / "2024" / "paar_set.csv", registros[30:])
+
+    assert main.sincronizar_csv(arquivo_2023) == {"inseridos": 30, "mantidos": 0, "ausentes": 0}
+    assert main.sincronizar_csv(arquivo_2024) == {"inseridos": 20, "mantidos": 0, "ausentes": 0}
+    assert linhas(banco, "SELECT COUNT(*) FROM Pessoa") == [(50,)]
+
+    # Ressincronizar o primeiro não enxerga as linhas do segundo como ausentes
+    assert main.sincronizar_csv(arquivo_2023, forcar=True) == {"inseridos": 0, "mantidos": 30, "ausentes": 0}
+    assert linhas(banco, "SELECT COUNT(*) FROM Pessoa") == [(50,)]
+    assert linhas(banco, "SELECT COUNT(*) FROM Carga_arquivo") == [(2,)]
+
+
+def test_ressincronizar_arquivo_sem_mudancas_nao_faz_nada(banco, tmp_path):
+    arquivo = gravar_csv(tmp_path / "paar_set.csv", gerar_registros(20, semente=21))
+    main.sincronizar_csv(arquivo)
+
+    assert main.sincronizar_csv(arquivo) is None
+    assert linhas(banco, "SELECT COUNT(*) FROM Pessoa") == [(20,)]
+
+
+def test_ressincronizar_insere_novas_e_exclui_as_que_sumiram(banco, tmp_path):
+    registros = gerar_registros(40, semente=22)
+    caminho = tmp_path / "paar_set.csv"
+    main.sincronizar_csv(gravar_csv(caminho, registros[:30]))
+    mantidos = linhas(banco, "SELECT id FROM Pessoa ORDER BY id")[5:]
+
+    # Saem as 5 primeiras linhas e entram 10 novas
+    assert main.sincronizar_csv(gravar_csv(caminho, registros[5:])) == {"inseridos": 10, "mantidos": 25, "ausentes": 5}
+
+    assert linhas(banco, "SELECT id FROM Pessoa ORDER BY id")[:25] == mantidos
+    assert [list(linha[1:]) for linha in linhas(banco, main.CONSULTA_SNAPSHOT)] == registros[5:]
+    for nome in main.RELATORIOS:
+        assert main.gerar_relatorio(nome, "resumo") == main.gerar_relatorio(nome, "views"), nome
+
+
+def test_linhas_repetidas_sao_contadas_pela_ocorrencia(banco, tmp_path):
+    registro = gerar_registros(1, semente=23)[0]
+    caminho = tmp_path / "paar_set.csv"
+    main.sincronizar_csv(gravar_csv(caminho, [registro] * 3))
+
+    assert main.sincronizar_csv(gravar_csv(caminho, [registro] * 2)) == {"inseridos": 0, "mantidos": 2, "ausentes": 1}
+    assert linhas(banco, "SELECT COUNT(*) FROM Pessoa") == [(2,)]
+
+
+def test_marcar_ausentes_mantem_os_registros(banco, tmp_path):
+    registros = gerar_registros(10, semente=24)
+    caminho = tmp_path / "paar_set.csv"
+    main.sincronizar_csv(gravar_csv(caminho, registros))
+
+    assert main.sincronizar_csv(gravar_csv(caminho, registros[3:]), marcar_ausentes=True) == \
+        {"inseridos": 0, "mantidos": 7, "ausentes": 3}
+    assert linhas(banco, "SELECT COUNT(*) FROM Pessoa") == [(10,)]
+    assert linhas(banco, "SELECT COUNT(*) FROM Carga_impressao WHERE ausente") == [(3,)]
+
+    # Quando voltam ao arquivo, deixam de estar marcados
+    main.sincronizar_csv(gravar_csv(caminho, registros), marcar_ausentes=True)
+    assert linhas(banco, "SELECT COUNT(*) FROM Carga_impressao WHERE ausente") == [(0,)]
+
+
+def test_aviso_so_para_registros_fora_da_sincronizacao(banco, tmp_path, capsys):
+    registros = gerar_registros(30, semente=30)
+    main.sincronizar_csv(gravar_csv(tmp_path / "a.csv", registros[:10]))
+    capsys.readouterr()
+
+    # Pessoa só tem linhas de outro arquivo sincronizado: nada a avisar
+    main.sincronizar_csv(gravar_csv(tmp_path / "b.csv", registros[10:20]))
+    assert "sem impressão" not in capsys.readouterr().out
+
+    main.carregar_csv_para_banco(gravar_csv(tmp_path / "c.csv", registros[20:]))
+    capsys.readouterr()
+    main.sincronizar_csv(gravar_csv(tmp_path / "d.csv", registros[:5]))
+    assert "há 10 registros sem impressão" in capsys.readouterr().out
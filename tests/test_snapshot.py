@@ -0,0 +1,41 @@
+import pytest
+
+import main
+from conftest import gerar_registros, gravar_csv, linhas
+
+pytest.importorskip("numpy")
+
+
+@pytest.mark.parametrize("banco", [False, True], indirect=True, ids=["textual", "compacto"])
+def test_relatorios_do_snapshot_iguais_aos_das_views(banco, tmp_path):
+    main.carregar_csv_para_banco(gravar_csv(tmp_path / "paar_set.csv", gerar_registros(120, semente=13)))
+    pasta = str(tmp_path / "snapshot")
+
+    assert main.exportar_snapshot(pasta, tamanho_pagina=50) == 120
+    for nome in main.RELATORIOS:
+        assert main.gerar_relatorio(nome, "snapshot", pasta) == main.gerar_relatorio(nome, "views"), nome
+
+
+def test_filtros_do_snapshot(banco, tmp_path):
+    registros = gerar_registros(90, semente=14)
+    main.carregar_csv_para_banco(gravar_csv(tmp_path / "paar_set.csv", registros))
+    pasta = str(tmp_path / "snapshot")
+    main.exportar_snapshot(pasta)
+
+    _, linhas_sp = main.gerar_relatorio("estado", "snapshot", pasta, {"estado": "SP"})
+    assert [linha[:2] for linha in linhas_sp] == [["SP", sum(r[3] == "SP" for r in registros)]]
+
+    _, medalhistas = main.gerar_relatorio("modalidade", "snapshot", pasta, {"possui_medalha": "Sim"})
+    assert sum(linha[1] for linha in medalhistas) == sum(r[6] == "Sim" for r in registros)
+
+
+def test_importar_snapshot_recria_os_registros(banco, tmp_path):
+    main.carregar_csv_para_banco(gravar_csv(tmp_path / "paar_set.csv", gerar_registros(40, semente=15)))
+    pasta = str(tmp_path / "snapshot")
+    main.exportar_snapshot(pasta)
+    antes = [linha[1:] for linha in linhas(banco, main.CONSULTA_SNAPSHOT)]
+
+    main.limpar_tabelas("rapido")
+    main.importar_snapshot(pasta)
+
+    assert [linha[1:] for linha in linhas(banco, main.CONSULTA_SNAPSHOT)] == antes
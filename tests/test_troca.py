@@ -0,0 +1,66 @@
+import pytest
+
+import main
+from conftest import gerar_registros, gravar_csv, linhas
+
+
+def _tabelas(banco):
+    return {nome for (nome,) in linhas(banco, "SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _indices(banco):
+    return {nome: tabela for nome, tabela in
+            linhas(banco, "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+
+
+def _sobras(banco):
+    """Tabelas paralelas que ficaram para trás depois de uma troca."""
+    main._aguardar_descarte()
+    sufixos = (main.SUFIXO_NOVA, main.SUFIXO_STAGING, main.SUFIXO_ANTIGA)
+    return sorted(t for t in _tabelas(banco) if t.endswith(sufixos))
+
+
+@pytest.mark.parametrize("banco", [False, True], indirect=True, ids=["textual", "compacto"])
+def test_limpar_por_troca(banco, tmp_path):
+    main.carregar_csv_para_banco(gravar_csv(tmp_path / "paar_set.csv", gerar_registros(30, semente=16)))
+    referencias = linhas(banco, "SELECT COUNT(*) FROM Ref_modalidade")
+    indices = _indices(banco)
+
+    main.limpar_tabelas("troca")
+
+    assert _sobras(banco) == []
+    for tabela in main._tabelas_troca():
+        assert linhas(banco, f"SELECT COUNT(*) FROM {tabela}") == [(0,)], tabela
+    assert linhas(banco, "SELECT COUNT(*) FROM Ref_modalidade") == referencias
+    assert _indices(banco) == indices
+
+    # As views e os resumos seguem as tabelas novas
+    id = main.novo_elemento(gerar_registros(1, semente=17)[0])
+    assert linhas(banco, "SELECT pessoa_id FROM vw_pessoa_esporte") == [(id,)]
+    for nome in main.RELATORIOS:
+        assert main.gerar_relatorio(nome, "resumo") == main.gerar_relatorio(nome, "views"), nome
+
+
+@pytest.mark.parametrize("banco", [False, True], indirect=True, ids=["textual", "compacto"])
+def test_recarga_promove_o_staging(banco, tmp_path):
+    main.carregar_csv_para_banco(gravar_csv(tmp_path / "antigo.csv", gerar_registros(30, semente=18)))
+    novos = gerar_registros(50, semente=19)
+    indices = _indices(banco)
+
+    main.recarregar_csv(gravar_csv(tmp_path / "novo.csv", novos), tamanho_lote=20)
+
+    assert _sobras(banco) == []
+    assert _indices(banco) == indices
+    assert [list(linha[1:]) for linha in linhas(banco, main.CONSULTA_SNAPSHOT)] == novos
+    for nome in main.RELATORIOS:
+        assert main.gerar_relatorio(nome, "resumo") == main.gerar_relatorio(nome, "views"), nome
+
+
+def test_recarga_que_falha_mantem_as_tabelas_atuais(banco, tmp_path):
+    main.carregar_csv_para_banco(gravar_csv(tmp_path / "paar_set.csv", gerar_registros(30, semente=20)))
+    antes = linhas(banco, main.CONSULTA_SNAPSHOT)
+
+    main.recarregar_csv(str(tmp_path / "inexistente.csv"))
+
+    assert _sobras(banco) == []
+    assert linhas(banco, main.CONSULTA_SNAPSHOT) == antes